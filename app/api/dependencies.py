@@ -1,26 +1,38 @@
 from fastapi import Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from typing import Optional, Dict
-from app.core.security import get_current_user
+from app.core.config import settings
+from app.core.security import get_current_user, get_current_user_async
 from app.modules.user.model import User
-from app.db.database import get_db
+from app.db.database import get_db, get_async_db
+from app.modules.tasks.cursor import decode_cursor, InvalidCursorError
+from app.modules.tasks.model import TaskStatus, TaskPriority
 
-def get_pagination(
+async def get_pagination(
     page: int = Query(1, ge=1, description="Número da Página"),
-    size: int = Query(10, ge=1, le=100, description="Itens por Página")
+    size: int = Query(10, ge=1, le=100, description="Itens por Página"),
+    cursor: Optional[str] = Query(None, description="Cursor opaco retornado em next_cursor")
 ):
     """
     Retorna os parâmetros de paginação.
     
     - page: Número da página (mínimo 1)
     - size: Tamanho da página (entre 1 e 100)
+    - cursor: Quando informado, usa paginação por cursor e ignora page
     """
-    return {"skip": (page - 1) * size, "limit": size}
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor)
+        except InvalidCursorError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
 
+    return {"skip": (page - 1) * size, "limit": size, "after": after}
 
-def get_task_filters(
-    status: Optional[str] = Query(None, description="Status da tarefa (ex: pending, completed)"),
-    priority: Optional[str] = Query(None, description="Prioridade da tarefa (ex: low, medium, high)")
+
+async def get_task_filters(
+    status: Optional[TaskStatus] = Query(None, description="Status da tarefa (ex: pending, in_progress, done)"),
+    priority: Optional[TaskPriority] = Query(None, description="Prioridade da tarefa (ex: low, medium, high)")
 ):
     """
     Retorna os filtros para as tarefas.
@@ -30,12 +42,24 @@ def get_task_filters(
     """
     return {"status": status, "priority": priority}
 
-def get_task_service(db: Session = Depends(get_db)):
+# Sessão e autenticação conforme o modo configurado (DB_ASYNC)
+get_session = get_async_db if settings.DB_ASYNC else get_db
+get_authenticated_user = get_current_user_async if settings.DB_ASYNC else get_current_user
+
+async def get_admin_user(current_user: User = Depends(get_authenticated_user)):
+    """
+    Usuário autenticado listado em ADMIN_USERS (403 caso contrário).
+    """
+    if current_user.user not in settings.ADMIN_USERS:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return current_user
+
+async def get_task_service(db = Depends(get_session)):
     """
-    Retorna uma instância do serviço de tarefas.
+    Retorna uma instância do serviço de tarefas (interface assíncrona).
     """
-    from app.modules.tasks.service import TaskService
-    return TaskService(db)
+    from app.modules.tasks.service import AsyncTaskService
+    return AsyncTaskService(db)
 
 def get_user_service(db: Session = Depends(get_db)):
     """
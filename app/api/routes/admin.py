@@ -0,0 +1,38 @@
+from fastapi import APIRouter, Depends, Query, status
+from app.core.rate_limit import admission_stats
+from app.core.security import auth_cache_stats
+from app.db.profiler import profiler_report, reset_profiler
+from app.modules.tasks.page_cache import page_cache_stats, stats_cache_stats
+from app.api.dependencies import get_admin_user
+
+router = APIRouter(dependencies=[Depends(get_admin_user)])
+
+@router.get("/queries")
+def get_query_stats(limit: int = Query(50, ge=1, le=1000, description="Máximo de statements retornados")):
+    """
+    Estatísticas do profiler de consultas (QUERY_PROFILER_ENABLED).
+
+    Retorna os statements normalizados com maior tempo total (chamadas,
+    tempo médio/máximo, execuções lentas e último plano capturado) e as
+    últimas requisições sinalizadas por excesso de statements ou N+1.
+    """
+    return profiler_report(limit)
+
+@router.delete("/queries", status_code=status.HTTP_204_NO_CONTENT)
+def reset_query_stats():
+    """Zera as estatísticas do profiler."""
+    reset_profiler()
+
+@router.get("/caches")
+def get_cache_stats():
+    """
+    Estado em memória deste processo: caches de autenticação, de páginas e
+    de estatísticas de tarefas, requisições em andamento e chaves de rate
+    limit por bucket.
+    """
+    return {
+        "auth_cache": auth_cache_stats(),
+        "task_page_cache": page_cache_stats(),
+        "task_stats_cache": stats_cache_stats(),
+        "admission": admission_stats(),
+    }
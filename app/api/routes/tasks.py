@@ -1,32 +1,166 @@
-from fastapi import APIRouter, Depends, status, HTTPException
-from app.core.security import get_current_user
-from app.modules.tasks.service import TaskService
-from app.modules.tasks.schema import TaskCreate, TaskResponse, TaskUpdate, PaginatedTaskResponse
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, Header, Query, Request, Response, status, HTTPException
+from fastapi.responses import StreamingResponse
+from app.core.config import settings
+from app.core.responses import ORJSONResponse
+from app.modules.tasks.cursor import InvalidCursorError, decode_changes_cursor
+from app.modules.tasks.service import AsyncTaskService
+from app.modules.tasks.export import EXPORT_FORMATS
+from app.modules.tasks.schema import (
+    TaskCreate, TaskResponse, TaskUpdate, PaginatedTaskResponse, TaskChangesResponse, TaskStatsResponse,
+    TaskBulkCreate, TaskBulkUpdate, TaskBulkDelete, TaskBulkResponse, TaskImportResponse
+)
 from app.modules.user.model import User
-from app.api.dependencies import get_task_service, get_pagination, get_task_filters
+from app.api.dependencies import get_task_service, get_pagination, get_task_filters, get_authenticated_user
 
 router = APIRouter()
 
-@router.get("/", response_model=PaginatedTaskResponse)  # ✅ CORRIGIDO
-def get_tasks(
-    task_service: TaskService = Depends(get_task_service),
+@router.get("/", response_model=PaginatedTaskResponse, response_class=ORJSONResponse)  # ✅ CORRIGIDO
+async def get_tasks(
+    task_service: AsyncTaskService = Depends(get_task_service),
     pagination: dict = Depends(get_pagination),
     filters: dict = Depends(get_task_filters),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_authenticated_user),
+    if_none_match: Optional[str] = Header(None),
+    include_archived: bool = Query(False, description="Incluir as tarefas concluídas já arquivadas")
 ):
-    return task_service.get_user_tasks(
+    """
+    Lista as tarefas do usuário.
+
+    Paginação por página (page/size) ou por cursor: envie o `next_cursor`
+    da resposta anterior em `cursor` para buscar a próxima página sem OFFSET.
+    Tarefas arquivadas só aparecem (e só contam no total) com `include_archived=true`.
+
+    A resposta traz um `ETag` que muda quando as tarefas do usuário mudam:
+    reenvie-o em `If-None-Match` para receber 304 se nada mudou.
+    """
+    etag, body = await task_service.get_user_tasks_page(
         current_user=current_user,
+        if_none_match=if_none_match,
+        skip=pagination['skip'],
+        limit=pagination['limit'],
+        status=filters.get('status'),
+        priority=filters.get('priority'),
+        after=pagination['after'],
+        include_archived=include_archived
+    )
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if body is None:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    # Corpo já serializado pelo orjson no formato do response_model
+    return Response(body, media_type="application/json", headers=headers)
+
+@router.get("/export")
+async def export_tasks(
+    format: Literal["ndjson", "csv"] = Query("ndjson", description="Formato do arquivo: ndjson ou csv"),
+    filters: dict = Depends(get_task_filters),
+    current_user: User = Depends(get_authenticated_user),
+    task_service: AsyncTaskService = Depends(get_task_service),
+    include_archived: bool = Query(False, description="Incluir as tarefas concluídas já arquivadas")
+):
+    """
+    Exporta todas as tarefas do usuário (com os mesmos filtros da listagem).
+
+    A resposta é enviada em streaming, lote a lote, sem carregar todas as
+    tarefas em memória. Com `include_archived=true`, as tarefas arquivadas
+    vêm depois das ativas.
+    """
+    content = task_service.export_tasks(
+        current_user,
+        format,
+        status=filters.get('status'),
+        priority=filters.get('priority'),
+        include_archived=include_archived
+    )
+    return StreamingResponse(
+        content,
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="tasks.{format}"'}
+    )
+
+@router.get("/search", response_model=PaginatedTaskResponse, response_class=ORJSONResponse)
+async def search_tasks(
+    q: str = Query(..., min_length=1, max_length=200, description="Texto buscado no título e na descrição"),
+    pagination: dict = Depends(get_pagination),
+    filters: dict = Depends(get_task_filters),
+    current_user: User = Depends(get_authenticated_user),
+    task_service: AsyncTaskService = Depends(get_task_service)
+):
+    """
+    Busca tarefas do usuário pelo título e pela descrição, ordenadas por relevância.
+
+    Todas as palavras de `q` precisam aparecer (a última também casa como
+    prefixo). Aceita os filtros de status/prioridade e a paginação por
+    página (page/size); paginação por cursor não é suportada.
+    """
+    if pagination['after'] is not None:
+        raise HTTPException(status_code=400, detail="Cursor pagination is not supported for search")
+
+    page = await task_service.search_tasks(
+        current_user,
+        q,
         skip=pagination['skip'],
         limit=pagination['limit'],
         status=filters.get('status'),
         priority=filters.get('priority')
     )
+    return ORJSONResponse(page)
+
+@router.get("/changes", response_model=TaskChangesResponse, response_class=ORJSONResponse)
+async def get_task_changes(
+    since: int = Query(0, ge=0, description="Revisão retornada pela sincronização anterior (0 = tudo)"),
+    cursor: Optional[str] = Query(None, description="Cursor retornado pela chamada anterior (substitui since)"),
+    limit: int = Query(
+        settings.TASK_CHANGES_MAX_ITEMS, ge=1, le=settings.TASK_CHANGES_MAX_ITEMS,
+        description="Máximo de alterações por chamada"
+    ),
+    current_user: User = Depends(get_authenticated_user),
+    task_service: AsyncTaskService = Depends(get_task_service)
+):
+    """
+    Sincronização incremental: tarefas criadas/alteradas e IDs deletados
+    desde a revisão `since`.
+
+    Enquanto `has_more` for true, chame de novo imediatamente com o `cursor`
+    da resposta; ao final, guarde o `revision` e envie-o como `since` na
+    próxima sincronização. Aplique `deleted` antes de `items`.
+    """
+    after = None
+    if cursor:
+        try:
+            after = decode_changes_cursor(cursor)
+        except InvalidCursorError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    return ORJSONResponse(await task_service.get_changes(current_user, since, limit, after))
+
+@router.get("/stats", response_model=TaskStatsResponse, response_class=ORJSONResponse)
+async def get_task_stats(
+    days: int = Query(
+        30, ge=1, le=settings.TASK_STATS_MAX_DAYS,
+        description="Dias (UTC) da série de tarefas criadas/concluídas, incluindo hoje"
+    ),
+    current_user: User = Depends(get_authenticated_user),
+    task_service: AsyncTaskService = Depends(get_task_service),
+    if_none_match: Optional[str] = Header(None)
+):
+    """
+    Resumo das tarefas do usuário para dashboards: totais por status,
+    por prioridade e por status × prioridade (todas as combinações, mesmo
+    vazias), mais tarefas criadas e concluídas por dia.
+
+    Suporta `If-None-Match` com o `ETag` da resposta, como GET /tasks.
+    """
+    etag, body = await task_service.get_stats_body(current_user, days, if_none_match)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if body is None:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
 
 @router.post("/", response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
-def create_task(
+async def create_task(
     task_data: TaskCreate,
-    current_user: User = Depends(get_current_user),
-    task_service: TaskService = Depends(get_task_service)
+    current_user: User = Depends(get_authenticated_user),
+    task_service: AsyncTaskService = Depends(get_task_service)
 ):
     """
     Cria uma nova tarefa.
@@ -39,14 +173,88 @@ def create_task(
     Retorna:
     - TaskResponse: Detalhes da tarefa criada
     """
-    return task_service.create_task(task_data, current_user)
+    return await task_service.create_task(task_data, current_user)
+
+@router.post("/bulk", response_model=TaskBulkResponse)
+async def bulk_create_tasks(
+    payload: TaskBulkCreate,
+    current_user: User = Depends(get_authenticated_user),
+    task_service: AsyncTaskService = Depends(get_task_service)
+):
+    """
+    Cria várias tarefas em uma única transação.
+
+    Retorna um resultado por item, na ordem enviada.
+    """
+    return await task_service.bulk_create_tasks(payload.items, current_user)
+
+@router.put("/bulk", response_model=TaskBulkResponse)
+async def bulk_update_tasks(
+    payload: TaskBulkUpdate,
+    current_user: User = Depends(get_authenticated_user),
+    task_service: AsyncTaskService = Depends(get_task_service)
+):
+    """
+    Atualiza várias tarefas em uma única transação.
+
+    A posse de todas as tarefas é verificada em uma consulta; itens
+    inexistentes (404) ou de outro usuário (403) são reportados
+    individualmente e os demais são atualizados.
+    """
+    return await task_service.bulk_update_tasks(payload.items, current_user)
+
+@router.post("/bulk/delete", response_model=TaskBulkResponse)
+async def bulk_delete_tasks(
+    payload: TaskBulkDelete,
+    current_user: User = Depends(get_authenticated_user),
+    task_service: AsyncTaskService = Depends(get_task_service)
+):
+    """
+    Deleta várias tarefas em uma única transação.
+
+    Retorna um resultado por ID (200, 403 ou 404).
+    """
+    return await task_service.bulk_delete_tasks(payload.ids, current_user)
+
+@router.post("/import", response_model=TaskImportResponse)
+async def import_tasks(
+    request: Request,
+    format: Literal["ndjson", "csv"] = Query("ndjson", description="Formato do arquivo: ndjson ou csv"),
+    current_user: User = Depends(get_authenticated_user),
+    task_service: AsyncTaskService = Depends(get_task_service)
+):
+    """
+    Importa tarefas de um arquivo NDJSON ou CSV enviado no corpo da requisição.
+
+    Cada linha é validada como TaskCreate (title, description, priority);
+    no CSV a primeira linha é o cabeçalho. O corpo é lido em streaming e
+    gravado em lotes, com um commit por lote.
+
+    Retorna o total importado, o total com erro e os erros por linha.
+    """
+    return await task_service.import_tasks(current_user, format, request.stream())
+
+@router.post("/{task_id}/restore", response_model=TaskResponse)
+async def restore_task(
+    task_id: int,
+    current_user: User = Depends(get_authenticated_user),
+    task_service: AsyncTaskService = Depends(get_task_service)
+):
+    """
+    Devolve uma tarefa arquivada às tarefas ativas (ela volta a aparecer
+    na listagem, nas estatísticas e em GET /tasks/changes).
+
+    Retorna:
+    - TaskResponse: a tarefa restaurada, com o mesmo ID
+    """
+    return await task_service.restore_task(task_id, current_user)
 
 @router.put("/{task_id}", response_model=TaskResponse)
-def update_task(
+async def update_task(
     task_id: int,
     task_data: TaskUpdate,
-    current_user: User = Depends(get_current_user),
-    task_service: TaskService = Depends(get_task_service)
+    current_user: User = Depends(get_authenticated_user),
+    task_service: AsyncTaskService = Depends(get_task_service)
 ):
     """
     Atualiza uma tarefa existente.
@@ -60,13 +268,13 @@ def update_task(
     Retorna:
     - TaskResponse: Detalhes da tarefa atualizada
     """
-    return task_service.update_task(task_id, task_data, current_user)
+    return await task_service.update_task(task_id, task_data, current_user)
 
 @router.delete("/{task_id}")
-def delete_task(
+async def delete_task(
     task_id: int,
-    current_user: User = Depends(get_current_user),
-    task_service: TaskService = Depends(get_task_service)
+    current_user: User = Depends(get_authenticated_user),
+    task_service: AsyncTaskService = Depends(get_task_service)
 ):
     """
     Deleta uma tarefa existente.
@@ -74,7 +282,7 @@ def delete_task(
     Retorna:
     - 200 OK: Tarefa deletada com sucesso
     """
-    if task_service.delete_task(task_id, current_user):
+    if await task_service.delete_task(task_id, current_user):
         return {"detail": "Task deleted successfully"}
     else:
         raise HTTPException(status_code=404, detail="Task not found")
\ No newline at end of file
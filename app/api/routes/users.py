@@ -1,7 +1,6 @@
 from fastapi import APIRouter, Depends, status
-from app.core.security import get_current_user
 from app.modules.user.schema import UserCreate, UserResponse, Token, UserLogin
-from app.api.dependencies import get_user_service
+from app.api.dependencies import get_user_service, get_authenticated_user
 
 router = APIRouter()
 
@@ -36,7 +35,7 @@ def login(
 
 
 @router.get("/me", response_model=UserResponse)
-def get_current_user_route(current_user: UserResponse = Depends(get_current_user)):
+async def get_current_user_route(current_user: UserResponse = Depends(get_authenticated_user)):
     """
     Obtém os dados do usuário autenticado.
     """
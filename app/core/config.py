@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Optional
 import os
 from pathlib import Path
 
@@ -9,6 +9,35 @@ BASE_DIR = Path(__file__).resolve().parent.parent.parent
 class Settings(BaseSettings):
     DATABASE_URL: str = "sqlite:///./tasks.db"
 
+    # Modo assíncrono: AsyncSession (aiosqlite/asyncmy) nas rotas de tarefas.
+    # Se ASYNC_DATABASE_URL não for informada, é derivada de DATABASE_URL.
+    DB_ASYNC: bool = False
+    ASYNC_DATABASE_URL: Optional[str] = None
+
+    # Leituras (GET/HEAD) em engine/pool próprio, separado das escritas. No
+    # SQLite, o engine de escrita tem uma única conexão e o de leitura abre o
+    # mesmo arquivo em query_only; no MySQL, as leituras vão para as réplicas
+    # (round-robin), sujeitas ao atraso de replicação. Sem réplicas, o MySQL
+    # usa um só engine.
+    DB_READ_WRITE_SPLIT: bool = True
+    DATABASE_REPLICA_URLS: List[str] = []
+
+    # Shards das tarefas (app/db/sharding.py): as tabelas de tarefas de cada
+    # usuário ficam em um destes bancos, escolhido pelo user_id; os usuários
+    # continuam em DATABASE_URL (que também pode ser um dos shards). Vazio:
+    # tudo em DATABASE_URL. Só acrescente shards no fim da lista e rode
+    # `python -m app.db.sharding rebalance` depois de alterá-la
+    DATABASE_SHARD_URLS: List[str] = []
+
+    # Perfil de produção do SQLite (PRAGMAs em cada conexão): WAL,
+    # synchronous, mmap, cache de páginas e espera por locks.
+    # SQLITE_TUNED=False mantém os padrões do SQLite.
+    SQLITE_TUNED: bool = True
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+    SQLITE_CACHE_SIZE_KB: int = 64 * 1024
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+
     # App Info
     VERSION: str = "0.1.0"
     PROJECT_NAME: str = "My FastAPI Project"
@@ -21,6 +50,106 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
+    # Cache de autenticação (tokens verificados e usuário atual)
+    AUTH_CACHE_ENABLED: bool = True
+    AUTH_CACHE_MAX_ENTRIES: int = 10000
+    AUTH_TOKEN_CACHE_TTL_SECONDS: int = 3600
+    AUTH_USER_CACHE_TTL_SECONDS: int = 60
+    # Tokens recusados ficam em cache negativo por este tempo
+    AUTH_INVALID_TOKEN_CACHE_TTL_SECONDS: int = 10
+
+    # Hash de senhas (bcrypt) em pool de processos; 0 workers = inline
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_QUEUE_SIZE: int = 16
+
+    # Login repetindo uma senha já recusada há pouco: 401 sem custo de bcrypt
+    # (guarda as últimas N senhas erradas de cada usuário, como HMAC)
+    LOGIN_FAILED_PASSWORDS_PER_USER: int = 5
+    LOGIN_FAILED_PASSWORD_TTL_SECONDS: int = 300
+
+    # Controle de admissão (app/core/rate_limit.py). Token buckets em memória
+    # por processo: taxa sustentada em req/s (0 = sem limite) e rajada. Rotas
+    # /auth limitadas por IP; /tasks por usuário (token) e por IP. Acima do
+    # limite, 429 com Retry-After; chaves ociosas saem sozinhas e no máximo
+    # RATE_LIMIT_MAX_KEYS ficam em memória por bucket
+    RATE_LIMIT_ENABLED: bool = False
+    RATE_LIMIT_AUTH_PER_IP: float = 5.0
+    RATE_LIMIT_AUTH_BURST: int = 20
+    RATE_LIMIT_TASKS_PER_USER: float = 20.0
+    RATE_LIMIT_TASKS_USER_BURST: int = 100
+    RATE_LIMIT_TASKS_PER_IP: float = 100.0
+    RATE_LIMIT_TASKS_IP_BURST: int = 500
+    RATE_LIMIT_MAX_KEYS: int = 50000
+
+    # Máximo de requisições da API em andamento no processo (0 = sem limite);
+    # acima disso, 503 com Retry-After em vez de enfileirar no threadpool e
+    # no pool de conexões. /health e /metrics não contam
+    MAX_IN_FLIGHT_REQUESTS: int = 0
+
+    # Limite de operações por requisição nos endpoints /tasks/bulk
+    TASK_BULK_MAX_ITEMS: int = 1000
+
+    # Group commit (app/modules/tasks/group_commit.py): POST/PUT /tasks que
+    # chegam em até MAX_DELAY_MS entram na mesma transação (até MAX_BATCH
+    # por commit); com QUEUE_SIZE operações aguardando, responde 503
+    TASK_GROUP_COMMIT_ENABLED: bool = False
+    TASK_GROUP_COMMIT_MAX_BATCH: int = 64
+    TASK_GROUP_COMMIT_MAX_DELAY_MS: float = 2.0
+    TASK_GROUP_COMMIT_QUEUE_SIZE: int = 1000
+
+    # Importação em streaming (/tasks/import): commit a cada lote de linhas
+    TASK_IMPORT_BATCH_SIZE: int = 5000
+    TASK_IMPORT_MAX_LINE_BYTES: int = 65536
+    TASK_IMPORT_MAX_ERRORS: int = 100
+
+    # Cache em memória das páginas de GET /tasks (chave inclui a versão dos
+    # dados do usuário); o ETag/304 funciona mesmo com o cache desligado
+    TASK_PAGE_CACHE_ENABLED: bool = False
+    TASK_PAGE_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+
+    # Máximo de alterações por chamada de GET /tasks/changes
+    TASK_CHANGES_MAX_ITEMS: int = 1000
+
+    # GET /tasks/stats: janela máxima da série diária e cache das respostas
+    # (sempre ligado: a chave inclui a versão dos dados do usuário)
+    TASK_STATS_MAX_DAYS: int = 365
+    TASK_STATS_CACHE_MAX_BYTES: int = 4 * 1024 * 1024
+
+    # Arquivamento (app/modules/tasks/archive.py): a cada INTERVAL_SECONDS,
+    # tarefas concluídas há mais de AFTER_DAYS dias saem de `tasks` para
+    # `tasks_archive`, em transações de até BATCH_SIZE tarefas com uma pausa
+    # de BATCH_PAUSE_MS entre elas. Com AFTER_DAYS >= TASK_STATS_MAX_DAYS, a
+    # série diária de GET /tasks/stats não perde tarefas arquivadas
+    TASK_ARCHIVE_ENABLED: bool = False
+    TASK_ARCHIVE_AFTER_DAYS: int = 365
+    TASK_ARCHIVE_INTERVAL_SECONDS: int = 3600
+    TASK_ARCHIVE_BATCH_SIZE: int = 500
+    TASK_ARCHIVE_BATCH_PAUSE_MS: float = 50.0
+
+    # Métricas em GET /metrics (formato Prometheus): middleware HTTP e
+    # eventos de SQL/pool nos engines
+    METRICS_ENABLED: bool = True
+
+    # Profiler de consultas (app/db/profiler.py): log de consultas lentas com
+    # EXPLAIN, requisições com statements demais ou repetidos (N+1) e
+    # estatísticas por statement em GET /api/v1/admin/queries
+    QUERY_PROFILER_ENABLED: bool = False
+    SLOW_QUERY_MS: float = 100.0
+    QUERY_PROFILER_MAX_STATEMENTS: int = 20
+    QUERY_PROFILER_MAX_REPEATS: int = 5
+    # Valores dos parâmetros no log de consultas lentas (sem e-mails e hashes
+    # de senha); desligado, só os tipos
+    QUERY_PROFILER_LOG_PARAMETERS: bool = False
+
+    # Usuários (campo `user`) com acesso às rotas /api/v1/admin
+    ADMIN_USERS: List[str] = []
+
+    # Subida do processo (lifespan): aplicar schema/migrações (o serve.py
+    # desliga nos workers, já aplicado no processo pai) e aquecer conexões,
+    # consultas e o bcrypt antes de aceitar tráfego (app/core/warmup.py)
+    DB_AUTO_MIGRATE: bool = True
+    STARTUP_WARM_UP: bool = False
+
     DEBUG: bool = True
 
     class Config:
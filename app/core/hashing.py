@@ -0,0 +1,115 @@
+"""
+Hash de senhas (bcrypt) fora do processo do servidor.
+
+O bcrypt é CPU puro: rodando inline, cada login/registro segura uma thread
+do threadpool e disputa o GIL com as rotas de tarefas. Aqui o trabalho vai
+para um ProcessPoolExecutor com fila limitada; quando a fila enche, a
+requisição falha na hora com 503 em vez de acumular threads esperando.
+"""
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from time import perf_counter
+from typing import Callable, Optional
+from passlib.context import CryptContext
+from app.core.metrics import password_hash_duration, password_hash_rejected
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+class HashingOverloadedError(RuntimeError):
+    """Fila de hashing cheia."""
+
+
+def hash_password(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def check_password(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+def _warm_up() -> None:
+    # Carrega o backend do bcrypt no worker antes da primeira requisição
+    pwd_context.hash("warm-up")
+
+
+def _ready() -> bool:
+    return True
+
+
+class PasswordHasher:
+    """
+    Executa hash/verify do bcrypt em um pool de processos.
+
+    - workers=0 executa inline (comportamento original).
+    - No máximo `workers + queue_size` operações em andamento; além disso,
+      HashingOverloadedError.
+    """
+
+    def __init__(self, workers: int, queue_size: int):
+        self.workers = workers
+        self.queue_size = queue_size
+        self._slots = threading.BoundedSemaphore(workers + queue_size) if workers > 0 else None
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    # spawn: não herda threads/conexões do servidor
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                        initializer=_warm_up,
+                    )
+        return self._executor
+
+    def submit(self, fn: Callable, *args) -> Future:
+        """Agenda `fn(*args)` no pool, ou levanta HashingOverloadedError se a fila estiver cheia."""
+        if not self._slots.acquire(blocking=False):
+            raise HashingOverloadedError("Password hashing queue is full")
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def run(self, fn: Callable, *args):
+        if self._slots is None:
+            return fn(*args)
+        return self.submit(fn, *args).result()
+
+    def _timed(self, operation: str, fn: Callable, *args):
+        start = perf_counter()
+        try:
+            result = self.run(fn, *args)
+        except HashingOverloadedError:
+            password_hash_rejected.inc()
+            raise
+        password_hash_duration.observe((operation,), perf_counter() - start)
+        return result
+
+    def hash(self, password: str) -> str:
+        return self._timed("hash", hash_password, password)
+
+    def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return self._timed("verify", check_password, plain_password, hashed_password)
+
+    def warm_up(self) -> None:
+        """Sobe todos os processos do pool (já com o bcrypt carregado) e espera ficarem prontos."""
+        if self._slots is None:
+            _warm_up()
+            return
+        executor = self._get_executor()
+        # Sem processo ocioso, cada submit sobe um processo novo (até `workers`)
+        for future in [executor.submit(_ready) for _ in range(self.workers)]:
+            future.result()
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,315 @@
+"""
+Métricas da aplicação no formato texto do Prometheus (GET /metrics).
+
+- HTTP: latência e total de requisições por rota (template, ex.:
+  /api/v1/tasks/{task_id}) e status, medidos por um middleware ASGI;
+- SQL: duração de cada statement e, por requisição, quantos statements e
+  quanto tempo no banco (eventos before/after_cursor_execute);
+- pool de conexões: tempo para obter uma conexão (espera + conexão nova),
+  conexões em uso e overflow;
+- bcrypt: duração de hash/verify, incluindo a fila do pool de processos.
+
+Implementação própria e mínima (contadores e histogramas em memória, por
+processo), sem dependência externa. Cada observação é um bisect e um
+incremento sob lock, barato o bastante para ficar sempre ligado.
+"""
+import threading
+from bisect import bisect_left
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Type
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import Pool
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Labels = Tuple[str, ...]
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50, 100)
+
+REGISTRY: List["_Metric"] = []
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Labels, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def lines(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.kind}"
+        yield from self.lines()
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, labels: Labels = (), amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def lines(self) -> Iterator[str]:
+        with self._lock:
+            values = list(self._values.items())
+        for labels, value in values:
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [contagem por bucket (o último é +Inf)..., soma]
+        self._values: Dict[Labels, list] = {}
+
+    def observe(self, labels: Labels, value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            state[index] += 1
+            state[-1] += value
+
+    def lines(self) -> Iterator[str]:
+        with self._lock:
+            values = [(labels, list(state)) for labels, state in self._values.items()]
+        bounds = [_format_value(bound) for bound in self.buckets] + ["+Inf"]
+        for labels, state in values:
+            cumulative = 0
+            for bound, count in zip(bounds, state):
+                cumulative += count
+                le = _format_labels(self.labelnames, labels, f'le="{bound}"')
+                yield f"{self.name}_bucket{le} {cumulative}"
+            formatted = _format_labels(self.labelnames, labels)
+            yield f"{self.name}_sum{formatted} {_format_value(state[-1])}"
+            yield f"{self.name}_count{formatted} {cumulative}"
+
+
+class Gauge(_Metric):
+    """Valor lido no momento da coleta: `collect` retorna labels -> valor."""
+    kind = "gauge"
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Sequence[str] = (),
+        collect: Optional[Callable[[], Dict[Labels, float]]] = None
+    ):
+        super().__init__(name, documentation, labelnames)
+        self._collectors: List[Callable[[], Dict[Labels, float]]] = [collect] if collect else []
+
+    def add_collector(self, collect: Callable[[], Dict[Labels, float]]) -> None:
+        self._collectors.append(collect)
+
+    def lines(self) -> Iterator[str]:
+        for collect in self._collectors:
+            for labels, value in collect().items():
+                yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+def render_metrics() -> bytes:
+    """Todas as métricas registradas, no formato texto do Prometheus."""
+    return ("\n".join(line for metric in REGISTRY for line in metric.render()) + "\n").encode()
+
+
+# --- HTTP ---
+
+http_requests = Counter("http_requests_total", "Requisições HTTP concluídas.", ("method", "route", "status"))
+http_duration = Histogram(
+    "http_request_duration_seconds", "Duração das requisições HTTP.", ("method", "route")
+)
+http_db_statements = Histogram(
+    "http_request_db_statements", "Statements SQL executados por requisição.", ("method", "route"), COUNT_BUCKETS
+)
+http_db_duration = Histogram(
+    "http_request_db_seconds", "Tempo em statements SQL por requisição.", ("method", "route")
+)
+_in_progress = [0]
+http_in_progress = Gauge(
+    "http_requests_in_progress", "Requisições HTTP em andamento.", collect=lambda: {(): _in_progress[0]}
+)
+
+# [statements, segundos] da requisição corrente (None fora de requisições)
+_request_db: ContextVar[Optional[list]] = ContextVar("request_db", default=None)
+
+
+def route_label(scope: dict) -> str:
+    """Template da rota (ex.: /api/v1/tasks/{task_id}); "unmatched" se nenhuma rota casou."""
+    route = scope.get("route")
+    if route is None:
+        return "unmatched"
+    template = getattr(route, "path_format", None) or getattr(route, "path", "")
+    # Rotas de routers incluídos podem ter só o caminho relativo ao prefixo:
+    # o prefixo é o que sobra do caminho requisitado
+    suffix = template
+    for name, value in (scope.get("path_params") or {}).items():
+        suffix = suffix.replace("{" + name + "}", str(value))
+    path = scope["path"]
+    if suffix != path and path.endswith(suffix):
+        return path[:len(path) - len(suffix)] + template
+    return template
+
+
+class MetricsMiddleware:
+    """Middleware ASGI puro: mede cada requisição HTTP e o SQL executado nela."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        db = [0, 0.0]
+        token = _request_db.set(db)
+        _in_progress[0] += 1
+        start = perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = perf_counter() - start
+            _in_progress[0] -= 1
+            _request_db.reset(token)
+            labels = (scope["method"], route_label(scope))
+            http_requests.inc(labels + (str(status),))
+            http_duration.observe(labels, elapsed)
+            http_db_statements.observe(labels, db[0])
+            http_db_duration.observe(labels, db[1])
+
+
+# --- Banco de dados ---
+
+db_statement_duration = Histogram(
+    "db_statement_duration_seconds", "Duração dos statements SQL.", ("engine",), STATEMENT_BUCKETS
+)
+db_pool_checkout = Histogram(
+    "db_pool_checkout_seconds",
+    "Tempo para obter uma conexão do pool (espera por conexão livre + abertura de conexão nova).",
+    ("engine",), STATEMENT_BUCKETS,
+)
+db_pool_size = Gauge("db_pool_size", "Tamanho configurado do pool de conexões.", ("engine",))
+db_pool_checked_out = Gauge("db_pool_checked_out", "Conexões do pool em uso.", ("engine",))
+db_pool_overflow = Gauge("db_pool_overflow", "Conexões abertas além do tamanho do pool (negativo: folga).", ("engine",))
+
+
+def timed_pool_class(url: str, name: str) -> Type[Pool]:
+    """
+    Classe de pool padrão do dialeto de `url`, medindo o tempo de cada
+    checkout (db_pool_checkout_seconds). Passe como `poolclass` no create_engine.
+    """
+    parsed = make_url(url)
+    base = parsed.get_dialect().get_pool_class(parsed)
+    labels = (name,)
+
+    def _do_get(self):
+        start = perf_counter()
+        try:
+            return base._do_get(self)
+        finally:
+            db_pool_checkout.observe(labels, perf_counter() - start)
+
+    return type(f"Timed{base.__name__}", (base,), {"_do_get": _do_get})
+
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    """Registra as métricas de SQL e do pool de `engine` (para AsyncEngine, use `.sync_engine`)."""
+    labels = (name,)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_start = perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = perf_counter() - context._metrics_start
+        db_statement_duration.observe(labels, elapsed)
+        db = _request_db.get()
+        if db is not None:
+            db[0] += 1
+            db[1] += elapsed
+
+    def pool_value(method: str) -> Callable[[], Dict[Labels, float]]:
+        # size()/checkedout()/overflow() só existem nos pools com fila (QueuePool)
+        def collect() -> Dict[Labels, float]:
+            fn = getattr(engine.pool, method, None)
+            return {labels: fn()} if fn else {}
+        return collect
+
+    db_pool_size.add_collector(pool_value("size"))
+    db_pool_checked_out.add_collector(pool_value("checkedout"))
+    db_pool_overflow.add_collector(pool_value("overflow"))
+
+
+# --- Group commit ---
+
+task_group_commit_batch_size = Histogram(
+    "task_group_commit_batch_size", "Operações por transação do group commit de tarefas.", (),
+    (1, 2, 4, 8, 16, 32, 64, 128, 256),
+)
+
+
+# --- Arquivamento ---
+
+tasks_archived = Counter("tasks_archived_total", "Tarefas concluídas movidas para tasks_archive.")
+
+
+# --- Senhas ---
+
+password_hash_duration = Histogram(
+    "password_hash_duration_seconds", "Duração do bcrypt (hash/verify), incluindo a fila do pool.", ("operation",),
+)
+password_hash_rejected = Counter(
+    "password_hash_rejected_total", "Operações de bcrypt recusadas com a fila de hashing cheia.",
+)
+
+
+# --- Controle de admissão ---
+
+http_requests_rejected = Counter(
+    "http_requests_rejected_total",
+    "Requisições recusadas antes da rota: limite por usuário/IP (429) ou processo cheio (503).",
+    ("group", "reason"),
+)
+rate_limit_keys = Gauge("rate_limit_keys", "Chaves (usuários/IPs) em memória por token bucket.", ("bucket",))
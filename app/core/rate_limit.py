@@ -0,0 +1,188 @@
+"""
+Controle de admissão das rotas da API (RATE_LIMIT_ENABLED, MAX_IN_FLIGHT_REQUESTS).
+
+- token buckets por grupo de rotas: /auth por IP (login e registro, antes
+  de qualquer bcrypt); /tasks por usuário (tirado do token, reaproveitando o
+  cache de tokens verificados e o cache negativo dos recusados) e por IP.
+  Sem ficha em algum dos buckets: 429 com Retry-After até a próxima ficha,
+  sem consumir as fichas dos outros;
+- limite de requisições da API em andamento no processo: acima dele, 503
+  com Retry-After, antes de a requisição ocupar uma thread ou esperar por
+  uma conexão do pool.
+
+O estado fica em memória, por processo: com N workers, o limite efetivo de
+cada chave é até N vezes o configurado. O IP é o cliente da conexão; atrás
+de um proxy, rode o uvicorn com --proxy-headers/--forwarded-allow-ips para
+valer o X-Forwarded-For.
+"""
+import math
+import threading
+from collections import OrderedDict
+from time import monotonic
+from typing import Dict, Hashable, List, Optional, Tuple
+from starlette.responses import JSONResponse
+from app.core.config import settings
+from app.core.metrics import http_requests_rejected, rate_limit_keys
+from app.core.security import user_id_from_authorization
+
+
+class TokenBucketLimiter:
+    """
+    Token buckets por chave: `rate` fichas por segundo, até `burst` acumuladas.
+
+    Thread-safe. Um bucket parado por burst/rate segundos já está cheio,
+    igual a um bucket novo: sai da memória na próxima chamada. Com mais de
+    `max_keys` chaves ativas, sai a usada há mais tempo (se voltar, volta
+    com o bucket cheio).
+    """
+
+    def __init__(self, rate: float, burst: int, max_keys: int):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.max_keys = max_keys
+        self._idle_after = self.burst / rate
+        # chave -> (fichas, instante da última atualização), em ordem de acesso
+        self._buckets: "OrderedDict[Hashable, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _tokens(self, key: Hashable, now: float) -> float:
+        entry = self._buckets.pop(key, None)
+        return self.burst if entry is None else min(self.burst, entry[0] + (now - entry[1]) * self.rate)
+
+    def _store(self, key: Hashable, tokens: float, now: float) -> None:
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+
+    def wait_time(self, key: Hashable) -> float:
+        """Segundos até `key` ter uma ficha (0 se já tem), sem consumir."""
+        with self._lock:
+            now = monotonic()
+            self._evict_idle(now)
+            tokens = self._tokens(key, now)
+            self._store(key, tokens, now)
+            return 0.0 if tokens >= 1 else (1 - tokens) / self.rate
+
+    def consume(self, key: Hashable) -> None:
+        """
+        Consome uma ficha de `key`. Chamado depois de wait_time: se outra
+        requisição consumiu no meio, o saldo fica negativo e a diferença é
+        paga em espera pelas próximas.
+        """
+        with self._lock:
+            now = monotonic()
+            self._store(key, self._tokens(key, now) - 1, now)
+
+    def _evict_idle(self, now: float) -> None:
+        # Em ordem de acesso, as chaves ociosas estão no começo
+        while self._buckets:
+            key, (_, last) = next(iter(self._buckets.items()))
+            if now - last < self._idle_after:
+                return
+            del self._buckets[key]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._buckets)
+
+
+def _limiter(rate: float, burst: int) -> Optional[TokenBucketLimiter]:
+    if not settings.RATE_LIMIT_ENABLED or rate <= 0:
+        return None
+    return TokenBucketLimiter(rate, burst, settings.RATE_LIMIT_MAX_KEYS)
+
+
+# Grupos de rotas: (prefixo, nome, [(tipo de chave, limiter)])
+ROUTE_GROUPS: List[Tuple[str, str, List[Tuple[str, TokenBucketLimiter]]]] = [
+    (prefix, name, [(kind, limiter) for kind, limiter in limiters if limiter is not None])
+    for prefix, name, limiters in (
+        (f"{settings.API_V1_STR}/auth", "auth", [
+            ("ip", _limiter(settings.RATE_LIMIT_AUTH_PER_IP, settings.RATE_LIMIT_AUTH_BURST)),
+        ]),
+        (f"{settings.API_V1_STR}/tasks", "tasks", [
+            ("user", _limiter(settings.RATE_LIMIT_TASKS_PER_USER, settings.RATE_LIMIT_TASKS_USER_BURST)),
+            ("ip", _limiter(settings.RATE_LIMIT_TASKS_PER_IP, settings.RATE_LIMIT_TASKS_IP_BURST)),
+        ]),
+    )
+]
+
+# Requisições da API em andamento no processo
+_in_flight = [0]
+
+
+def _route_group(path: str) -> Tuple[str, List[Tuple[str, TokenBucketLimiter]]]:
+    for prefix, name, limiters in ROUTE_GROUPS:
+        if path == prefix or path.startswith(prefix + "/"):
+            return name, limiters
+    return "other", []
+
+
+def _client_key(scope: dict, kind: str) -> Optional[Hashable]:
+    """Chave do bucket: o ID do usuário do token ("user") ou o IP do cliente ("ip")."""
+    if kind == "user":
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                return user_id_from_authorization(value.decode("latin-1"))
+        return None
+    client = scope.get("client")
+    return client[0] if client else None
+
+
+def _reject(status_code: int, detail: str, retry_after: float) -> JSONResponse:
+    return JSONResponse(
+        {"detail": detail}, status_code=status_code,
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+
+class AdmissionMiddleware:
+    """Middleware ASGI puro: token buckets por usuário/IP e limite de requisições em andamento."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(settings.API_V1_STR):
+            await self.app(scope, receive, send)
+            return
+
+        group, limiters = _route_group(scope["path"])
+        keyed = []
+        for kind, limiter in limiters:
+            key = _client_key(scope, kind)
+            if key is not None:
+                keyed.append((kind, limiter, key))
+        # Todos os buckets conferidos antes de consumir: uma recusa pelo
+        # bucket do IP não gasta a ficha do usuário (nem o contrário)
+        for kind, limiter, key in keyed:
+            wait = limiter.wait_time(key)
+            if wait:
+                http_requests_rejected.inc((group, f"rate_limit_{kind}"))
+                await _reject(429, "Too many requests, try again later", wait)(scope, receive, send)
+                return
+        for _, limiter, key in keyed:
+            limiter.consume(key)
+
+        if settings.MAX_IN_FLIGHT_REQUESTS and _in_flight[0] >= settings.MAX_IN_FLIGHT_REQUESTS:
+            http_requests_rejected.inc((group, "overloaded"))
+            await _reject(503, "Server busy, try again later", 1)(scope, receive, send)
+            return
+
+        _in_flight[0] += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _in_flight[0] -= 1
+
+
+def admission_stats() -> Dict[str, object]:
+    """Requisições em andamento e chaves em memória por bucket."""
+    return {
+        "in_flight": _in_flight[0],
+        "buckets": {f"{name}_{kind}": len(limiter) for _, name, limiters in ROUTE_GROUPS for kind, limiter in limiters},
+    }
+
+
+rate_limit_keys.add_collector(lambda: {
+    (f"{name}_{kind}",): len(limiter) for _, name, limiters in ROUTE_GROUPS for kind, limiter in limiters
+})
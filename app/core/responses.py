@@ -0,0 +1,19 @@
+"""
+Resposta JSON serializada com orjson.
+
+O orjson codifica Enum e datetime direto em C. Rotas que já montam o corpo
+como dicts simples retornam ORJSONResponse: o FastAPI não valida nem
+serializa o response_model de novo, que continua valendo para a documentação.
+"""
+import orjson
+from fastapi.responses import JSONResponse
+
+
+def dumps(content) -> bytes:
+    # OPT_UTC_Z: datetimes em UTC terminam em "Z", como na serialização do pydantic
+    return orjson.dumps(content, option=orjson.OPT_UTC_Z)
+
+
+class ORJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return dumps(content)
@@ -1,24 +1,111 @@
+import hashlib
+import hmac
+import threading
+import time
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from app.core.cache import TTLCache
+from app.core.hashing import HashingOverloadedError, PasswordHasher
 from app.core.config import settings
-from app.db.database import get_db
+from app.db.database import get_db, get_async_db
+from app.modules.user.model import User
 
 # Configuração de Segurança
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBearer()
+password_hasher = PasswordHasher(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_QUEUE_SIZE)
+
+
+@dataclass(frozen=True)
+class UserSnapshot:
+    """Dados do usuário autenticado, desacoplados da sessão do banco."""
+    id: int
+    user: str
+    email: str
+    created_at: datetime
+
+
+# Caches do caminho de autenticação (por processo):
+# - token_cache: token já verificado -> claims, até o "exp" do token
+# - user_cache: id do usuário -> UserSnapshot, invalidado quando o usuário muda
+# - invalid_token_cache: token recusado há pouco (assinatura, formato ou
+#   expiração), para que repeti-lo não custe outra verificação de assinatura
+token_cache = TTLCache(settings.AUTH_CACHE_MAX_ENTRIES, settings.AUTH_TOKEN_CACHE_TTL_SECONDS)
+invalid_token_cache = TTLCache(settings.AUTH_CACHE_MAX_ENTRIES, settings.AUTH_INVALID_TOKEN_CACHE_TTL_SECONDS)
+user_cache = TTLCache(settings.AUTH_CACHE_MAX_ENTRIES, settings.AUTH_USER_CACHE_TTL_SECONDS)
+
+
+def invalidate_user(user_id: int) -> None:
+    """Remove o usuário do cache de autenticação."""
+    user_cache.pop(user_id)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_cached_user(mapper, connection, target):
+    invalidate_user(target.id)
+    # Uma senha recusada antes pode ser a nova senha do usuário
+    reset_login_failures(target.user)
+
+
+def auth_cache_stats() -> dict:
+    """Contadores de acerto/erro dos caches de autenticação."""
+    return {"tokens": token_cache.stats(), "invalid_tokens": invalid_token_cache.stats(), "users": user_cache.stats()}
+
+def _hashing_busy_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Server busy, try again later",
+        headers={"Retry-After": "1"},
+    )
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verifica se a senha em texto simples corresponde à senha criptografada."""
-    return pwd_context.verify(plain_password, hashed_password)
+    try:
+        return password_hasher.verify(plain_password, hashed_password)
+    except HashingOverloadedError:
+        raise _hashing_busy_exception()
 
 def get_password_hash(password: str) -> str:
     """Gera uma senha criptografada a partir da senha em texto simples."""
-    return pwd_context.hash(password)
+    try:
+        return password_hasher.hash(password)
+    except HashingOverloadedError:
+        raise _hashing_busy_exception()
+
+
+# Senhas recusadas recentemente por usuário: username -> HMAC (SECRET_KEY) das
+# últimas LOGIN_FAILED_PASSWORDS_PER_USER senhas erradas. Repetir uma delas
+# é recusado sem rodar o bcrypt; senhas novas sempre passam pelo bcrypt, então
+# falhas de terceiros não bloqueiam o dono da conta.
+failed_logins = TTLCache(settings.AUTH_CACHE_MAX_ENTRIES, settings.LOGIN_FAILED_PASSWORD_TTL_SECONDS)
+_failed_logins_lock = threading.Lock()
+
+def _password_digest(username: str, password: str) -> bytes:
+    message = f"{username}\0{password}".encode()
+    return hmac.new(settings.SECRET_KEY.encode(), message, hashlib.sha256).digest()
+
+def is_known_bad_password(username: str, password: str) -> bool:
+    """True se a mesma senha já foi recusada para o usuário há pouco."""
+    digests = failed_logins.get(username)
+    return digests is not None and _password_digest(username, password) in digests
+
+def record_login_failure(username: str, password: str) -> None:
+    digest = _password_digest(username, password)
+    with _failed_logins_lock:
+        digests = [d for d in failed_logins.get(username) or () if d != digest]
+        digests.append(digest)
+        failed_logins.set(username, tuple(digests[-settings.LOGIN_FAILED_PASSWORDS_PER_USER:]))
+
+def reset_login_failures(username: str) -> None:
+    with _failed_logins_lock:
+        failed_logins.pop(username)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Função criar JWT"""
@@ -46,39 +133,85 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     # 5. Retornar o token pronto para uso
     return encoded_jwt
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
-    """Função para obter o usuário atual a partir do token JWT."""
-    
-    # 1. Pegar o token das credenciais
-    token = credentials.credentials
-    
-    # 2. Definir exceção padrão para credenciais inválidas
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Credenciais inválidas/e ou expiradas",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    
+
+
+def _user_id_from_token(token: str) -> int:
+    """Valida o token JWT (ou reaproveita as claims já verificadas) e retorna o ID do usuário."""
+    if settings.AUTH_CACHE_ENABLED and invalid_token_cache.get(token):
+        raise _credentials_exception()
     try:
-        # 3. Decodificar o token JWT
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        # 1. Decodificar o token JWT (ou reaproveitar as claims já verificadas)
+        payload = token_cache.get(token) if settings.AUTH_CACHE_ENABLED else None
+        if payload is None:
+            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+            if settings.AUTH_CACHE_ENABLED:
+                exp = payload.get("exp")
+                token_cache.set(token, payload, exp - time.time() if exp else None)
         
-        # 4. Extrair o ID do usuário do payload do token
-        user_id: int = payload.get("sub")
+        # 2. Extrair o ID do usuário do payload do token
+        user_id = payload.get("sub")
         if user_id is None:
-            raise credentials_exception
+            raise JWTError("token sem sub")
+        return int(user_id)
             
-    except JWTError:
-        # 5. Se der qualquer erro ao decodificar (token expirado, inválido, etc.)
-        raise credentials_exception
-    
-    # 6. Buscar o usuário no banco de dados
-    from app.modules.user.model import User
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    except (JWTError, ValueError):
+        # 3. Se der qualquer erro ao decodificar (token expirado, inválido, etc.)
+        if settings.AUTH_CACHE_ENABLED:
+            invalid_token_cache.set(token, True)
+        raise _credentials_exception()
+
+
+def user_id_from_authorization(authorization: Optional[str]) -> Optional[int]:
+    """ID do usuário de um cabeçalho `Authorization: Bearer <token>` válido; None se ausente ou inválido."""
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return _user_id_from_token(token.strip())
+    except HTTPException:
+        return None
+
+
+def _load_user_snapshot(db: Session, user_id: int) -> UserSnapshot:
+    """Busca o usuário no banco e guarda o snapshot no cache."""
+    user = db.query(User).filter(User.id == user_id).first()
     
-    # 7. Se usuário não existe no banco, credenciais inválidas
+    # Se usuário não existe no banco, credenciais inválidas
     if user is None:
-        raise credentials_exception
-        
-    # 8. Retornar o usuário autenticado
-    return user
\ No newline at end of file
+        raise _credentials_exception()
+
+    snapshot = UserSnapshot(id=user.id, user=user.user, email=user.email, created_at=user.created_at)
+    if settings.AUTH_CACHE_ENABLED:
+        user_cache.set(user_id, snapshot)
+    return snapshot
+
+
+def _cached_user(user_id: int) -> Optional[UserSnapshot]:
+    return user_cache.get(user_id) if settings.AUTH_CACHE_ENABLED else None
+
+
+def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)) -> UserSnapshot:
+    """Função para obter o usuário atual a partir do token JWT."""
+    user_id = _user_id_from_token(credentials.credentials)
+    snapshot = _cached_user(user_id)
+    if snapshot is None:
+        snapshot = _load_user_snapshot(db, user_id)
+        # Devolve a conexão ao pool antes de a rota esperar por outra thread
+        # (ver AsyncTaskService._run_and_release)
+        db.close()
+    return snapshot
+
+
+async def get_current_user_async(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+) -> UserSnapshot:
+    """Versão assíncrona de get_current_user (modo DB_ASYNC)."""
+    user_id = _user_id_from_token(credentials.credentials)
+    return _cached_user(user_id) or await db.run_sync(_load_user_snapshot, user_id)
@@ -0,0 +1,87 @@
+"""
+Aquecimento do worker antes de aceitar tráfego (STARTUP_WARM_UP).
+
+Num worker frio, as primeiras requisições pagam pela abertura das conexões
+(com os PRAGMAs do SQLite), pela compilação das consultas no SQLAlchemy (o
+cache de SQL compilado é por engine) e pela subida do pool de processos do
+bcrypt. Aqui tudo isso acontece no lifespan, antes de o uvicorn aceitar
+conexões.
+
+As consultas quentes (autenticação, listagem com e sem filtros/cursor,
+versão, stats e changes) rodam de verdade para um usuário inexistente:
+nada é escrito e nada entra nos caches de páginas.
+"""
+import logging
+from datetime import datetime
+from time import perf_counter
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from app.core.security import UserSnapshot, password_hasher
+from app.db import database
+from app.modules.tasks.model import TaskPriority, TaskStatus
+from app.modules.tasks.service import TaskService
+from app.modules.user.model import User
+
+logger = logging.getLogger(__name__)
+
+_NOBODY = UserSnapshot(id=0, user="", email="", created_at=datetime(1970, 1, 1))
+
+
+def _pool_size(engine: Engine) -> int:
+    # size() só existe nos pools com fila (QueuePool); nos demais, uma conexão
+    size = getattr(engine.pool, "size", None)
+    return size() if size else 1
+
+
+def _open_connections(engine: Engine) -> int:
+    """Abre as conexões do pool de `engine` (até o tamanho dele) e as devolve ao pool."""
+    connections = [engine.connect() for _ in range(_pool_size(engine))]
+    for connection in connections:
+        connection.close()
+    return len(connections)
+
+
+def _run_hot_queries(db: Session) -> None:
+    """Executa as consultas das rotas mais usadas, preenchendo o cache de SQL compilado do engine."""
+    db.query(User).filter(User.id == _NOBODY.id).first()
+    service = TaskService(db)
+    for status in (None, TaskStatus.PENDING):
+        for priority in (None, TaskPriority.MEDIUM):
+            service.get_user_tasks(_NOBODY, status=status, priority=priority)
+            service.get_user_tasks(_NOBODY, status=status, priority=priority, after=(datetime(1970, 1, 1), 0))
+    service.repo.get_version(_NOBODY.id)
+    service.get_stats(_NOBODY, days=30)
+    service.get_changes(_NOBODY, since=0, limit=100)
+
+
+async def warm_up() -> None:
+    """Aquece conexões e consultas de todos os engines e o pool do bcrypt."""
+    start = perf_counter()
+    connections = 0
+
+    for engine in [database.engine] + database.read_engines + database.shard_engines:
+        connections += _open_connections(engine)
+    with database.SessionLocal() as db:
+        _run_hot_queries(db)
+    # Sessões de leitura em round-robin: uma por engine de leitura
+    for _ in database.read_engines:
+        with database.ReadSessionLocal() as db:
+            _run_hot_queries(db)
+
+    if database.async_engine is not None:
+        for engine in [database.async_engine] + database.async_read_engines:
+            opened = [await engine.connect() for _ in range(_pool_size(engine.sync_engine))]
+            for connection in opened:
+                await connection.close()
+            connections += len(opened)
+        async with database.AsyncSessionLocal() as db:
+            await db.run_sync(_run_hot_queries)
+        for _ in database.async_read_engines:
+            async with database.AsyncReadSessionLocal() as db:
+                await db.run_sync(_run_hot_queries)
+
+    password_hasher.warm_up()
+    logger.info(
+        "Worker aquecido em %.0f ms (%d conexões, consultas compiladas, bcrypt pronto)",
+        (perf_counter() - start) * 1e3, connections,
+    )
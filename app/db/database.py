@@ -1,25 +1,251 @@
-from sqlalchemy import create_engine
+from itertools import cycle
+from typing import List, Optional
+from fastapi import Request
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.core.metrics import instrument_engine, timed_pool_class
+from app.db.profiler import install_profiler
+from app.db.sharding import RoutingSession
 
 #URL database
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
 
-#Engine
+# Métodos HTTP atendidos pelo engine de leitura (ver get_db)
+READ_METHODS = frozenset({"GET", "HEAD"})
+
+
+def _pool_options(url: str, name: str) -> dict:
+    # Com métricas ligadas, o pool padrão do dialeto mede o tempo de checkout
+    return {"poolclass": timed_pool_class(url, name)} if settings.METRICS_ENABLED else {}
+
+
+def _is_sqlite_file(url: str) -> bool:
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database not in (None, "", ":memory:")
+
+
+def _writer_options(url: str) -> dict:
+    # SQLite aceita um escritor por vez: com uma única conexão de escrita, as
+    # escritas esperam na fila do pool em vez de disputar o lock do arquivo
+    # (e falhar com "database is locked")
+    if settings.DB_READ_WRITE_SPLIT and _is_sqlite_file(url):
+        return {"pool_size": 1, "max_overflow": 0}
+    return {}
+
+
+def _reader_urls(url: str, replicas: List[str]) -> List[str]:
+    """
+    URLs dos engines de leitura: as réplicas informadas ou, no SQLite em
+    arquivo, o próprio banco. Lista vazia: leituras usam o engine de escrita.
+    """
+    if not settings.DB_READ_WRITE_SPLIT:
+        return []
+    if replicas:
+        return replicas
+    return [url] if _is_sqlite_file(url) else []
+
+
+def _install_sqlite_profile(engine: Engine, read_only: bool) -> None:
+    """
+    PRAGMAs do perfil de produção em cada conexão nova: WAL (leitores não
+    bloqueiam o escritor nem são bloqueados por ele), fsync só nos
+    checkpoints, mmap, cache de páginas maior e espera por locks em vez de
+    erro imediato. Conexões de leitura ficam em query_only.
+    """
+    pragmas = [
+        "PRAGMA journal_mode=WAL",
+        f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}",
+        f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE}",
+        # Negativo: tamanho em KiB, não em páginas
+        f"PRAGMA cache_size=-{settings.SQLITE_CACHE_SIZE_KB}",
+        f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}",
+    ]
+    if read_only:
+        pragmas.append("PRAGMA query_only=ON")
+
+    @event.listens_for(engine, "connect")
+    def _connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+
+def _setup_engine(engine: Engine, name: str, read_only: bool = False) -> None:
+    """Perfil do SQLite, métricas e profiler em `engine` (para AsyncEngine, use `.sync_engine`)."""
+    if engine.dialect.name == "sqlite" and settings.SQLITE_TUNED:
+        _install_sqlite_profile(engine, read_only)
+    if settings.METRICS_ENABLED:
+        instrument_engine(engine, name)
+    if settings.QUERY_PROFILER_ENABLED:
+        install_profiler(engine)
+
+
+def _reader_name(name: str, index: int, total: int) -> str:
+    return f"{name}_read" if total == 1 else f"{name}_read{index}"
+
+
+#Engine (escritas, migrações e leituras quando não há engine de leitura)
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
     pool_pre_ping=True,  # ✅ Para MySQL - testa conexão
-    pool_recycle=300  # ✅ Para MySQL - recicla conexões a cada 5 minutos
+    pool_recycle=300,  # ✅ Para MySQL - recicla conexões a cada 5 minutos
+    **_writer_options(SQLALCHEMY_DATABASE_URL),
+    **_pool_options(SQLALCHEMY_DATABASE_URL, "sync")
+)
+_setup_engine(engine, "sync")
+
+#Shards das tarefas (ver app/db/sharding.py): engine de escrita e, no SQLite
+#em arquivo, de leitura por shard. O shard com a URL de DATABASE_URL usa os
+#engines principais (None nas listas de fábricas)
+if settings.DATABASE_SHARD_URLS and settings.DB_ASYNC:
+    raise RuntimeError("DATABASE_SHARD_URLS is not supported with DB_ASYNC")
+
+shard_engines: List[Engine] = []
+_shard_writers: List[Optional[sessionmaker]] = []
+_shard_readers: List[Optional[sessionmaker]] = []
+for _index, _url in enumerate(settings.DATABASE_SHARD_URLS):
+    if _url == SQLALCHEMY_DATABASE_URL:
+        _shard_writers.append(None)
+        _shard_readers.append(None)
+        continue
+    _name = f"shard{_index}"
+    shard_engines.append(create_engine(
+        _url, pool_pre_ping=True, pool_recycle=300, **_writer_options(_url), **_pool_options(_url, _name)
+    ))
+    _setup_engine(shard_engines[-1], _name)
+    _shard_writers.append(
+        sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=shard_engines[-1])
+    )
+    _reader = _reader_urls(_url, [])
+    if _reader:
+        _name = _reader_name(_name, 0, 1)
+        shard_engines.append(create_engine(_url, pool_pre_ping=True, pool_recycle=300, **_pool_options(_url, _name)))
+        _setup_engine(shard_engines[-1], _name, read_only=True)
+        _shard_readers.append(sessionmaker(autocommit=False, autoflush=False, bind=shard_engines[-1]))
+    else:
+        _shard_readers.append(_shard_writers[-1])
+
+# expire_on_commit=False: AsyncTaskService fecha a sessão ao fim de cada
+# chamada no threadpool e os objetos retornados são serializados depois
+SessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, expire_on_commit=False, bind=engine,
+    class_=RoutingSession, shards=_shard_writers,
 )
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+#Engines de leitura (GET/HEAD): réplicas em round-robin ou o mesmo arquivo SQLite
+_urls = _reader_urls(SQLALCHEMY_DATABASE_URL, settings.DATABASE_REPLICA_URLS)
+read_engines: List[Engine] = []
+for _index, _url in enumerate(_urls):
+    _name = _reader_name("sync", _index, len(_urls))
+    read_engines.append(create_engine(_url, pool_pre_ping=True, pool_recycle=300, **_pool_options(_url, _name)))
+    _setup_engine(read_engines[-1], _name, read_only=True)
+
+_read_sessions = cycle([
+    sessionmaker(autocommit=False, autoflush=False, bind=read_engine, class_=RoutingSession, shards=_shard_readers)
+    for read_engine in read_engines
+] or [SessionLocal])
+
+
+def ReadSessionLocal():
+    """Sessão para leituras (próximo engine de leitura)."""
+    return next(_read_sessions)()
+
+
+def shard_urls() -> List[str]:
+    """URLs dos shards das tarefas (sem shards: só DATABASE_URL)."""
+    return list(settings.DATABASE_SHARD_URLS) or [SQLALCHEMY_DATABASE_URL]
+
+
+# Sessões de escrita por shard, na ordem de DATABASE_SHARD_URLS (para
+# group commit, arquivamento e rebalanceamento, que trabalham shard a shard)
+_main_writer = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+shard_sessions: List[sessionmaker] = [factory or _main_writer for factory in _shard_writers] or [SessionLocal]
+
+
+def shard_writer_engines() -> List[Engine]:
+    """Engine de escrita de cada shard, na ordem de shard_sessions."""
+    return [factory.kw["bind"] for factory in shard_sessions]
+
+
+def writer_engines() -> List[Engine]:
+    """Engines de escrita distintos (principal e shards), para migrações."""
+    return list(dict.fromkeys([engine] + shard_writer_engines()))
+
 
 Base = declarative_base()
 
-def get_db():
-    db = SessionLocal()
+# Drivers assíncronos equivalentes aos drivers síncronos suportados
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "mysql": "mysql+asyncmy"}
+
+
+def _to_async_url(url: str) -> str:
+    parsed = make_url(url)
+    return parsed.set(drivername=ASYNC_DRIVERS[parsed.get_backend_name()]).render_as_string(hide_password=False)
+
+
+def get_async_database_url() -> str:
+    """URL do banco para o engine assíncrono (ASYNC_DATABASE_URL ou derivada de DATABASE_URL)."""
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    return _to_async_url(SQLALCHEMY_DATABASE_URL)
+
+
+#Engine assíncrono (apenas com DB_ASYNC=True, para não exigir aiosqlite/asyncmy no modo padrão)
+async_engine = None
+async_read_engines = []
+AsyncSessionLocal = None
+AsyncReadSessionLocal = None
+
+if settings.DB_ASYNC:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_engine = create_async_engine(
+        get_async_database_url(),
+        pool_pre_ping=True,
+        pool_recycle=300,
+        **_writer_options(get_async_database_url()),
+        **_pool_options(get_async_database_url(), "async")
+    )
+    _setup_engine(async_engine.sync_engine, "async")
+    # expire_on_commit=False: os objetos retornados são serializados fora da sessão
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    _async_urls = _reader_urls(
+        get_async_database_url(), [_to_async_url(url) for url in settings.DATABASE_REPLICA_URLS]
+    )
+    for _index, _url in enumerate(_async_urls):
+        _name = _reader_name("async", _index, len(_async_urls))
+        async_read_engines.append(
+            create_async_engine(_url, pool_pre_ping=True, pool_recycle=300, **_pool_options(_url, _name))
+        )
+        _setup_engine(async_read_engines[-1].sync_engine, _name, read_only=True)
+
+    _async_read_sessions = cycle([
+        async_sessionmaker(read_engine, autoflush=False, expire_on_commit=False)
+        for read_engine in async_read_engines
+    ] or [AsyncSessionLocal])
+
+    def _next_async_read_session():
+        """Sessão assíncrona para leituras (próximo engine de leitura)."""
+        return next(_async_read_sessions)()
+
+    AsyncReadSessionLocal = _next_async_read_session
+
+def get_db(request: Request):
+    # GET/HEAD vão para o engine de leitura; o resto, para o de escrita
+    db = ReadSessionLocal() if request.method in READ_METHODS else SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db(request: Request):
+    session_factory = AsyncReadSessionLocal if request.method in READ_METHODS else AsyncSessionLocal
+    async with session_factory() as db:
+        yield db
@@ -0,0 +1,257 @@
+"""
+Migrações versionadas do schema.
+
+`Base.metadata.create_all` só cria tabelas que ainda não existem; índices,
+colunas e tabelas novas em bancos já existentes são aplicados aqui.
+Cada migração roda uma única vez, em ordem, e a versão aplicada fica
+registrada na tabela `schema_version`.
+
+Use: python -m app.db.migrations
+"""
+import importlib
+from typing import Callable, List, Tuple
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, inspect, literal, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.sql import func
+
+_metadata = MetaData()
+
+schema_version = Table(
+    "schema_version",
+    _metadata,
+    Column("version", Integer, primary_key=True),
+    Column("description", String(255), nullable=False),
+    Column("applied_at", DateTime(timezone=True), nullable=False, server_default=func.now()),
+)
+
+Migration = Tuple[int, str, Callable[[Connection], None]]
+
+# Índice de `tasks` usado pelo arquivamento (criado na migração 7)
+ARCHIVE_CANDIDATES_INDEX = "ix_tasks_status_completed"
+
+
+def _create_task_indexes(conn: Connection) -> None:
+    from app.modules.tasks.model import Task
+
+    for index in Task.__table__.indexes:
+        # Índices de colunas adicionadas depois: criados junto com elas (migrações 4 e 6)
+        if "revision" not in index.columns and "completed_at" not in index.columns:
+            index.create(conn, checkfirst=True)
+
+
+def _create_task_counters(conn: Connection) -> None:
+    from app.modules.tasks.model import TaskCounter
+    from app.modules.tasks.counters import rebuild_counters
+
+    TaskCounter.__table__.create(conn, checkfirst=True)
+    rebuild_counters(conn)
+
+
+def _create_task_versions(conn: Connection) -> None:
+    from app.modules.tasks.model import TaskVersion
+
+    TaskVersion.__table__.create(conn, checkfirst=True)
+
+
+def _add_task_revisions(conn: Connection) -> None:
+    from app.modules.tasks.model import Task, TaskTombstone, TaskVersion
+
+    if "revision" not in {column["name"] for column in inspect(conn).get_columns("tasks")}:
+        conn.execute(text("ALTER TABLE tasks ADD COLUMN revision INTEGER NOT NULL DEFAULT 0"))
+
+    # Tarefas existentes entram na revisão 1 (a sincronização começa em since=0)
+    # e todo usuário com tarefas passa a ter versão >= 1. UPDATE em SQL direto:
+    # pelo Core, o onupdate de updated_at também seria aplicado.
+    conn.execute(text("UPDATE tasks SET revision = 1 WHERE revision = 0"))
+    conn.execute(TaskVersion.__table__.insert().from_select(
+        ["user_id", "version"],
+        select(Task.user_id, literal(1)).where(Task.user_id.not_in(select(TaskVersion.user_id))).distinct(),
+    ))
+
+    for index in Task.__table__.indexes:
+        if "revision" in index.columns:
+            index.create(conn, checkfirst=True)
+    TaskTombstone.__table__.create(conn, checkfirst=True)
+
+
+def _create_task_search_index(conn: Connection) -> None:
+    from app.modules.tasks.search import create_search_index
+
+    create_search_index(conn)
+
+
+def _add_task_completed_at(conn: Connection) -> None:
+    from app.modules.tasks.model import Task
+
+    if "completed_at" not in {column["name"] for column in inspect(conn).get_columns("tasks")}:
+        conn.execute(text("ALTER TABLE tasks ADD COLUMN completed_at DATETIME"))
+
+    # Tarefas já concluídas: a última alteração é a melhor estimativa da
+    # conclusão. SQL direto pelo mesmo motivo da migração 4 (updated_at).
+    conn.execute(text(
+        "UPDATE tasks SET completed_at = coalesce(updated_at, created_at) "
+        "WHERE status = 'DONE' AND completed_at IS NULL"
+    ))
+
+    for index in Task.__table__.indexes:
+        if "completed_at" in index.columns and index.name != ARCHIVE_CANDIDATES_INDEX:
+            index.create(conn, checkfirst=True)
+
+
+def _create_task_archive(conn: Connection) -> None:
+    from app.modules.tasks.model import Task, TaskArchive
+
+    TaskArchive.__table__.create(conn, checkfirst=True)
+    for index in Task.__table__.indexes:
+        if index.name == ARCHIVE_CANDIDATES_INDEX:
+            index.create(conn, checkfirst=True)
+
+
+def _create_task_shard_moves(conn: Connection) -> None:
+    from app.modules.tasks.model import TaskShardMove
+
+    TaskShardMove.__table__.create(conn, checkfirst=True)
+
+
+def _add_user_to_search_index(conn: Connection) -> None:
+    from app.modules.tasks.search import upgrade_search_index
+
+    upgrade_search_index(conn)
+
+
+def _rebuild_tasks_with_autoincrement(conn: Connection) -> None:
+    """
+    SQLite: recria `tasks` com AUTOINCREMENT (não dá para alterar a chave de
+    uma tabela existente), mantendo os IDs, os índices e os triggers da busca.
+    """
+    from sqlalchemy.schema import CreateTable
+    from app.modules.tasks.model import Task
+    from app.modules.tasks.search import create_search_index
+
+    ddl = conn.exec_driver_sql("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'tasks'").scalar()
+    if "AUTOINCREMENT" in ddl.upper():
+        return
+    columns = ", ".join(column.name for column in Task.__table__.columns)
+    create = str(CreateTable(Task.__table__).compile(dialect=conn.dialect))
+    conn.exec_driver_sql(create.replace("CREATE TABLE tasks ", "CREATE TABLE tasks_autoincrement ", 1))
+    conn.exec_driver_sql(f"INSERT INTO tasks_autoincrement ({columns}) SELECT {columns} FROM tasks")
+    conn.exec_driver_sql("DROP TABLE tasks")
+    conn.exec_driver_sql("ALTER TABLE tasks_autoincrement RENAME TO tasks")
+    for index in Task.__table__.indexes:
+        index.create(conn)
+    # DROP TABLE levou os triggers do índice FTS5 (os rowids não mudaram)
+    create_search_index(conn)
+
+
+def _make_task_ids_unique(conn: Connection) -> None:
+    from app.modules.tasks.model import Task, TaskArchive, TaskTombstone
+    from app.modules.tasks.repository import reserve_task_ids
+
+    tasks, archive = Task.__table__, TaskArchive.__table__
+    if conn.dialect.name == "sqlite":
+        _rebuild_tasks_with_autoincrement(conn)
+
+    # Tarefas arquivadas cujo ID o SQLite já reusou em `tasks` ganham IDs
+    # novos, acima de todos os usados (inclusive em tombstones)
+    last_id = max(
+        conn.execute(select(func.max(column))).scalar() or 0
+        for column in (tasks.c.id, archive.c.id, TaskTombstone.__table__.c.task_id)
+    )
+    reused = conn.execute(select(archive.c.id).where(archive.c.id.in_(select(tasks.c.id)))).scalars().all()
+    for task_id in reused:
+        last_id += 1
+        conn.execute(archive.update().where(archive.c.id == task_id).values(id=last_id))
+
+    # Próximos IDs acima de todos esses (no MySQL, o AUTO_INCREMENT já passa
+    # dos IDs de `tasks` e dos tombstones; só o arquivo pode estar acima)
+    owner = conn.execute(select(archive.c.user_id).limit(1)).scalar()
+    if last_id and (owner is not None or conn.dialect.name == "sqlite"):
+        reserve_task_ids(conn, owner, last_id)
+
+
+def _prepare_task_id_ranges(conn: Connection) -> None:
+    """
+    Tabela da sequência de IDs por shard (ver app/db/sharding.py). No MySQL,
+    também IDs de tarefas em BIGINT e sem chaves estrangeiras para `users`
+    nas tabelas de tarefas, que podem ficar em shards. No SQLite, INTEGER já
+    tem 64 bits e as chaves estrangeiras não são verificadas (PRAGMA
+    foreign_keys desligado).
+    """
+    from app.modules.tasks.model import TaskIdSequence
+
+    TaskIdSequence.__table__.create(conn, checkfirst=True)
+    if conn.dialect.name != "mysql":
+        return
+    inspector = inspect(conn)
+    for table in ("tasks", "task_counters", "task_versions", "task_tombstones", "tasks_archive"):
+        for foreign_key in inspector.get_foreign_keys(table):
+            if foreign_key["referred_table"] == "users":
+                conn.execute(text(f"ALTER TABLE {table} DROP FOREIGN KEY {foreign_key['name']}"))
+    conn.execute(text("ALTER TABLE tasks MODIFY id BIGINT NOT NULL AUTO_INCREMENT"))
+    conn.execute(text("ALTER TABLE tasks_archive MODIFY id BIGINT NOT NULL"))
+    conn.execute(text("ALTER TABLE task_tombstones MODIFY task_id BIGINT NOT NULL"))
+
+
+MIGRATIONS: List[Migration] = [
+    (1, "composite indexes for task filtering", _create_task_indexes),
+    (2, "per-user task counters", _create_task_counters),
+    (3, "per-user task data versions", _create_task_versions),
+    (4, "task revisions and tombstones for incremental sync", _add_task_revisions),
+    (5, "full-text search index on task title and description", _create_task_search_index),
+    (6, "task completion timestamps for GET /tasks/stats", _add_task_completed_at),
+    (7, "archive table for completed tasks", _create_task_archive),
+    (8, "pending user moves between task shards", _create_task_shard_moves),
+    (9, "user_id in the full-text search index", _add_user_to_search_index),
+    (10, "task ids never reused (archived tasks keep theirs)", _make_task_ids_unique),
+    (11, "per-shard task id ranges, 64-bit task ids, no foreign keys to users", _prepare_task_id_ranges),
+]
+
+
+def current_version(conn: Connection) -> int:
+    """Retorna a última versão aplicada (0 se nenhuma)."""
+    return conn.execute(select(func.coalesce(func.max(schema_version.c.version), 0))).scalar()
+
+
+def run_migrations(engine: Engine) -> List[int]:
+    """
+    Cria as tabelas que ainda não existem (Base.metadata) e aplica as
+    migrações pendentes; retorna as versões aplicadas.
+    """
+    from app.db.database import Base
+
+    # Registra os modelos em Base.metadata
+    for module in ("app.modules.user.model", "app.modules.tasks.model"):
+        importlib.import_module(module)
+
+    Base.metadata.create_all(bind=engine)
+    _metadata.create_all(bind=engine)
+    applied = []
+
+    for version, description, upgrade in MIGRATIONS:
+        with engine.begin() as conn:
+            if version <= current_version(conn):
+                continue
+            upgrade(conn)
+            conn.execute(schema_version.insert().values(version=version, description=description))
+        applied.append(version)
+
+    return applied
+
+
+if __name__ == "__main__":
+    from app.db.database import shard_writer_engines, writer_engines
+    from app.db.sharding import assign_id_ranges
+
+    # Banco principal e shards das tarefas
+    for engine in writer_engines():
+        applied = run_migrations(engine)
+        with engine.connect() as conn:
+            version = current_version(conn)
+        database = engine.url.render_as_string()
+        if applied:
+            print(f"{database}: migrações aplicadas: {applied}. Versão atual: {version}")
+        else:
+            print(f"{database}: schema já está atualizado. Versão atual: {version}")
+    ranges = assign_id_ranges(shard_writer_engines())
+    if ranges:
+        print(f"Faixas de IDs de tarefas por shard: {ranges}")
@@ -0,0 +1,276 @@
+"""
+Profiler de consultas SQL (opcional, QUERY_PROFILER_ENABLED).
+
+- slow query log: statements acima de SLOW_QUERY_MS vão para o logger
+  `app.db.profiler`, normalizados e com os tipos dos parâmetros (os valores
+  só com QUERY_PROFILER_LOG_PARAMETERS, e mesmo assim sem hashes de senha e
+  e-mails), e com o plano
+  (EXPLAIN QUERY PLAN no SQLite, EXPLAIN no MySQL), obtido na mesma conexão
+  logo após a execução;
+  um plano diferente do último visto para o mesmo statement é sinalizado;
+- por requisição: sinaliza as que executam mais de QUERY_PROFILER_MAX_STATEMENTS
+  statements ou repetem o mesmo statement QUERY_PROFILER_MAX_REPEATS vezes
+  ou mais (padrão N+1);
+- estatísticas agregadas por statement normalizado (literais e listas de
+  IN/VALUES colapsadas), expostas em GET /api/v1/admin/queries.
+
+Tudo em memória, por processo.
+"""
+import logging
+import re
+import threading
+from collections import Counter, deque
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from time import perf_counter
+from typing import Deque, Dict, List, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core.config import settings
+from app.core.metrics import route_label
+
+logger = logging.getLogger(__name__)
+
+# Statements normalizados distintos guardados; os demais entram em OTHER
+MAX_TRACKED_STATEMENTS = 1000
+# Só statements até este tamanho têm a forma normalizada memorizada (INSERTs
+# multi-linha do import têm centenas de KB)
+_MAX_CACHED_STATEMENT = 4096
+OTHER = "<outros statements>"
+MAX_FLAGGED_REQUESTS = 100
+_MAX_PARAMS_REPR = 500
+
+# Valores que nunca vão para o log: strings de statements que usam estas
+# colunas, de parâmetros com estes nomes, e as que parecem e-mail ou hash
+# bcrypt em qualquer statement
+_SENSITIVE_COLUMN = re.compile(r"hashed_password|password|email", re.IGNORECASE)
+_SENSITIVE_VALUE = re.compile(r"@|^\$2[aby]?\$")
+REDACTED = "<redacted>"
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*(?:\?|%s|:\w+)(?:\s*,\s*(?:\?|%s|:\w+))*\s*\)")
+_VALUES_LIST = re.compile(r"(VALUES\s*\(\?\))(?:\s*,\s*\(\?\))+", re.IGNORECASE)
+_SPACES = re.compile(r"\s+")
+
+_normalized: Dict[str, str] = {}
+
+
+def normalize(statement: str) -> str:
+    """
+    Forma do statement: literais viram `?`, listas de placeholders de
+    IN (...) e de VALUES (...), (...) viram um só `(?)`.
+    """
+    shape = _normalized.get(statement)
+    if shape is None:
+        shape = _SPACES.sub(" ", statement).strip()
+        shape = _STRING.sub("?", shape)
+        shape = _NUMBER.sub("?", shape)
+        shape = _PLACEHOLDER_LIST.sub("(?)", shape)
+        shape = _VALUES_LIST.sub(r"\1", shape)
+        if len(statement) <= _MAX_CACHED_STATEMENT and len(_normalized) < MAX_TRACKED_STATEMENTS * 10:
+            _normalized[statement] = shape
+    return shape
+
+
+class StatementStats:
+    __slots__ = ("calls", "total", "max", "slow", "plan", "plan_changes")
+
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.slow = 0
+        self.plan: Optional[List[str]] = None
+        self.plan_changes = 0
+
+    def as_dict(self, statement: str) -> dict:
+        return {
+            "statement": statement,
+            "calls": self.calls,
+            "total_ms": round(self.total * 1e3, 3),
+            "mean_ms": round(self.total / self.calls * 1e3, 3) if self.calls else 0.0,
+            "max_ms": round(self.max * 1e3, 3),
+            "slow_calls": self.slow,
+            "last_plan": self.plan,
+            "plan_changes": self.plan_changes,
+        }
+
+
+_lock = threading.Lock()
+_stats: Dict[str, StatementStats] = {}
+_flagged: Deque[dict] = deque(maxlen=MAX_FLAGGED_REQUESTS)
+
+# Contagem de statements normalizados da requisição corrente
+_request_statements: ContextVar[Optional[Counter]] = ContextVar("request_statements", default=None)
+
+
+def _explain(conn, statement: str, parameters) -> Optional[List[str]]:
+    dialect = conn.dialect.name
+    if dialect == "sqlite":
+        prefix = "EXPLAIN QUERY PLAN "
+    elif dialect == "mysql":
+        prefix = "EXPLAIN "
+    else:
+        return None
+    # Cursor do driver direto: não passa pelos eventos (nem pelo próprio profiler)
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters)
+        return [" | ".join(str(value) for value in row) for row in cursor.fetchall()]
+    except Exception as exc:  # o plano é diagnóstico: nunca derruba a consulta original
+        return [f"EXPLAIN falhou: {exc}"]
+    finally:
+        cursor.close()
+
+
+def _parameter_types(parameters) -> str:
+    """Descrição dos parâmetros sem os valores: `(int, str)`, `{user_id: int}`, `500 x (...)`."""
+    if isinstance(parameters, (list, tuple)) and parameters and isinstance(parameters[0], (list, tuple, dict)):
+        return f"{len(parameters)} x {_parameter_types(parameters[0])}"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{key}: {type(value).__name__}" for key, value in parameters.items()) + "}"
+    return "(" + ", ".join(type(value).__name__ for value in parameters or ()) + ")"
+
+
+def _parameter_values(statement: str, parameters) -> str:
+    """Valores dos parâmetros, com os sensíveis trocados por REDACTED: `(1, '<redacted>')`, `500 x (...)`."""
+    sensitive_statement = _SENSITIVE_COLUMN.search(statement) is not None
+
+    def show(value, name: str = "") -> str:
+        if isinstance(value, (str, bytes)) and (
+            sensitive_statement
+            or _SENSITIVE_COLUMN.search(name)
+            or isinstance(value, bytes)
+            or _SENSITIVE_VALUE.search(value)
+        ):
+            return REDACTED
+        return repr(value)
+
+    if isinstance(parameters, (list, tuple)) and parameters and isinstance(parameters[0], (list, tuple, dict)):
+        return f"{len(parameters)} x {_parameter_values(statement, parameters[0])}"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{key}: {show(value, key)}" for key, value in parameters.items()) + "}"
+    return "(" + ", ".join(show(value) for value in parameters or ()) + ")"
+
+
+def _record(conn, statement: str, parameters, executemany: bool, elapsed: float) -> None:
+    shape = normalize(statement)
+    statements = _request_statements.get()
+    if statements is not None:
+        statements[shape] += 1
+
+    slow = elapsed * 1e3 >= settings.SLOW_QUERY_MS
+    plan = None
+    if slow and not executemany and statement.lstrip()[:6].upper() in ("SELECT", "UPDATE", "DELETE"):
+        plan = _explain(conn, statement, parameters)
+
+    with _lock:
+        stats = _stats.get(shape)
+        if stats is None:
+            if len(_stats) >= MAX_TRACKED_STATEMENTS:
+                shape = OTHER
+            stats = _stats.setdefault(shape, StatementStats())
+        stats.calls += 1
+        stats.total += elapsed
+        stats.max = max(stats.max, elapsed)
+        plan_changed = False
+        if slow:
+            stats.slow += 1
+        if plan is not None:
+            plan_changed = stats.plan is not None and plan != stats.plan
+            stats.plan_changes += plan_changed
+            stats.plan = plan
+
+    if slow:
+        if settings.QUERY_PROFILER_LOG_PARAMETERS:
+            params = _parameter_values(statement, parameters)
+        else:
+            params = _parameter_types(parameters)
+        if len(params) > _MAX_PARAMS_REPR:
+            params = params[:_MAX_PARAMS_REPR] + "..."
+        logger.warning(
+            "Consulta lenta (%.1f ms): %s | parâmetros: %s%s%s",
+            elapsed * 1e3, normalize(statement), params,
+            "\n  plano: " + "\n         ".join(plan) if plan else "",
+            "\n  (plano diferente do anterior)" if plan_changed else "",
+        )
+
+
+def install_profiler(engine: Engine) -> None:
+    """Registra o profiler nos eventos de `engine` (para AsyncEngine, use `.sync_engine`)."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        context._profiler_start = perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        _record(conn, statement, parameters, executemany, perf_counter() - context._profiler_start)
+
+
+class QueryProfilerMiddleware:
+    """Conta os statements de cada requisição HTTP e sinaliza excesso/repetição."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        statements = Counter()
+        token = _request_statements.set(statements)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_statements.reset(token)
+            _check_request(scope, statements)
+
+
+def _check_request(scope: dict, statements: Counter) -> None:
+    total = sum(statements.values())
+    repeated = [
+        {"statement": shape, "count": count}
+        for shape, count in statements.most_common()
+        if count >= settings.QUERY_PROFILER_MAX_REPEATS
+    ]
+    if total <= settings.QUERY_PROFILER_MAX_STATEMENTS and not repeated:
+        return
+
+    request = {
+        "at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "method": scope["method"],
+        "route": route_label(scope),
+        "path": scope["path"],
+        "statements": total,
+        "repeated": repeated,
+    }
+    with _lock:
+        _flagged.append(request)
+    logger.warning(
+        "%s %s executou %d statements%s", request["method"], request["path"], total,
+        "".join(f"\n  {item['count']}x {item['statement']}" for item in repeated),
+    )
+
+
+def profiler_report(limit: int = 50) -> dict:
+    """Statements mais custosos (tempo total) e as últimas requisições sinalizadas."""
+    with _lock:
+        statements = [stats.as_dict(shape) for shape, stats in _stats.items()]
+        flagged = list(_flagged)
+    statements.sort(key=lambda item: item["total_ms"], reverse=True)
+    return {
+        "enabled": settings.QUERY_PROFILER_ENABLED,
+        "slow_query_ms": settings.SLOW_QUERY_MS,
+        "tracked_statements": len(statements),
+        "statements": statements[:limit],
+        "flagged_requests": flagged[::-1],
+    }
+
+
+def reset_profiler() -> None:
+    with _lock:
+        _stats.clear()
+        _flagged.clear()
@@ -0,0 +1,374 @@
+"""
+Sharding horizontal das tarefas por usuário (DATABASE_SHARD_URLS).
+
+As tabelas de tarefas de cada usuário (tasks, contadores, versão,
+tombstones, arquivo e índice de busca) ficam em um único shard, escolhido
+pelo user_id com jump consistent hash; os usuários ficam no banco
+principal (DATABASE_URL). Toda consulta do TaskRepository é de um usuário,
+então vai para a sessão do shard dele (RoutingSession.for_user). Cada
+shard tem o próprio escritor: no SQLite, usuários de shards diferentes não
+disputam o mesmo lock de escrita.
+
+Acrescentar um shard no fim da lista muda o shard de ~1/N dos usuários;
+remover ou reordenar muda o de quase todos. Depois de alterar a lista,
+`rebalance` move cada usuário que está fora do lugar: a cópia no destino é
+uma revisão nova do usuário (todas as tarefas voltam em GET /tasks/changes)
+e as tarefas mantêm os IDs. Enquanto o usuário não é movido, a API já o
+procura no shard novo.
+
+IDs de tarefas são únicos entre shards: cada shard gera os seus em uma
+faixa própria de 2^40 IDs (`assign_id_ranges`, aplicado junto com as
+migrações), então mover um usuário não troca IDs, e uma tarefa de outro
+usuário em outro shard responde 403, como sem shards. IDs de antes das
+faixas (todos os shards começando em 1) podem se repetir entre shards: só
+esses, se já usados no destino, são trocados por IDs novos no movimento,
+com tombstones dos antigos.
+
+Use: python -m app.db.sharding status
+     python -m app.db.sharding rebalance [--dry-run] [--drain URL ...] [--pause-ms 10]
+"""
+import logging
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from sqlalchemy import delete, func, select, union, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+logger = logging.getLogger(__name__)
+
+_MASK64 = (1 << 64) - 1
+
+# IDs por consulta com IN (abaixo do limite de parâmetros do SQLite)
+_IN_CHUNK = 5000
+
+# Faixa de IDs de tarefas de cada shard: 2^40 IDs (com até 8192 shards, os
+# IDs ficam abaixo de 2^53, o maior inteiro exato em JSON/JavaScript)
+ID_RANGE_BITS = 40
+
+
+def jump_hash(key: int, buckets: int) -> int:
+    """
+    Jump consistent hash (Lamping e Veach): bucket de `key` em [0, buckets).
+
+    Com um bucket a mais, só ~1/(buckets + 1) das chaves mudam de bucket, e
+    todas para o bucket novo.
+    """
+    key &= _MASK64
+    bucket, candidate = -1, 0
+    while candidate < buckets:
+        bucket = candidate
+        key = (key * 2862933555777941757 + 1) & _MASK64
+        candidate = int((bucket + 1) * ((1 << 31) / ((key >> 33) + 1)))
+    return bucket
+
+
+def shard_for(user_id: int, shards: int) -> int:
+    """Índice do shard das tarefas do usuário."""
+    return jump_hash(user_id, shards)
+
+
+class RoutingSession(Session):
+    """
+    Sessão do banco principal que, com shards configurados, abre sob demanda
+    uma sessão por shard: `for_user` devolve a do shard do usuário (ou a
+    própria sessão, sem shards ou quando o shard é o banco principal) e
+    `close` fecha todas.
+    """
+
+    def __init__(self, *args, shards: Sequence[Optional[sessionmaker]] = (), **kwargs):
+        super().__init__(*args, **kwargs)
+        # Por índice de shard: fábrica de sessões, ou None para o banco principal
+        self.shards = shards
+        self._shard_sessions: Dict[int, Session] = {}
+
+    def for_user(self, user_id: int) -> Session:
+        if not self.shards:
+            return self
+        return self._for_shard(shard_for(user_id, len(self.shards)))
+
+    def all_shards(self) -> List[Session]:
+        """Sessões de todos os shards (sem shards, só a própria sessão)."""
+        return [self._for_shard(index) for index in range(len(self.shards))] or [self]
+
+    def _for_shard(self, index: int) -> Session:
+        factory = self.shards[index]
+        if factory is None:
+            return self
+        session = self._shard_sessions.get(index)
+        if session is None:
+            session = self._shard_sessions[index] = factory()
+        return session
+
+    def close(self) -> None:
+        for session in self._shard_sessions.values():
+            session.close()
+        self._shard_sessions.clear()
+        super().close()
+
+
+def assign_id_ranges(engines: Sequence[Engine]) -> List[int]:
+    """
+    Dá a cada shard (na ordem de `engines`) uma faixa de IDs de tarefas só
+    dele, gravada em `task_id_sequence`, e retorna a faixa de cada um.
+
+    Um shard sem faixa (ou com a mesma faixa de um anterior, como uma cópia
+    do arquivo) fica com a do maior ID que já usou, se estiver livre, ou com
+    a próxima faixa acima de todos os IDs de todos os shards. Idempotente:
+    roda junto com as migrações. Com um só banco, não faz nada (IDs do
+    autoincremento).
+    """
+    from app.modules.tasks.model import TaskIdSequence
+    from app.modules.tasks.repository import clear_id_sequence_cache, last_task_id
+
+    if len(engines) < 2:
+        return []
+    sequence = TaskIdSequence.__table__
+    current = []
+    for engine in engines:
+        with engine.connect() as conn:
+            current.append((conn.execute(select(sequence.c.id_range)).scalar(), last_task_id(conn)))
+
+    used = [id_range for id_range, _ in current]
+    free = 1 + max([id_range or 0 for id_range in used] + [last_id >> ID_RANGE_BITS for _, last_id in current])
+    ranges: List[int] = []
+    for engine, (id_range, last_id) in zip(engines, current):
+        if id_range is None or id_range in ranges:
+            candidate = last_id >> ID_RANGE_BITS
+            if candidate in used or candidate in ranges:
+                candidate, free = free, free + 1
+            id_range = candidate
+            next_id = max(last_id + 1, id_range << ID_RANGE_BITS)
+            with engine.begin() as conn:
+                conn.execute(delete(sequence))
+                conn.execute(sequence.insert().values(id_range=id_range, next_id=next_id))
+            logger.info("%s: task ids from %d", engine.url.render_as_string(), next_id)
+        ranges.append(id_range)
+    clear_id_sequence_cache()
+    return ranges
+
+
+def _chunks(values: List[int]) -> Iterable[List[int]]:
+    for start in range(0, len(values), _IN_CHUNK):
+        yield values[start:start + _IN_CHUNK]
+
+
+def _begin_write(db: Session) -> None:
+    # Trava de escrita desde a primeira leitura (ver group_commit.py)
+    if db.get_bind().dialect.name == "sqlite":
+        db.connection().exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def shard_user_ids(db: Session) -> List[int]:
+    """Usuários com dados de tarefas no shard da sessão, em ordem."""
+    from app.modules.tasks.model import Task, TaskArchive, TaskVersion
+
+    users = union(*(select(model.user_id).distinct() for model in (TaskVersion, Task, TaskArchive)))
+    return sorted(db.execute(users).scalars())
+
+
+def move_user(user_id: int, source: sessionmaker, target: sessionmaker) -> int:
+    """
+    Move os dados de tarefas do usuário do shard `source` para `target`;
+    retorna quantas tarefas (ativas e arquivadas) foram copiadas.
+
+    O shard de origem fica travado para escrita durante a cópia. Se o
+    usuário já tem dados no destino (escritos depois da mudança da lista),
+    os dois conjuntos são somados. Um registro em `task_shard_moves` no
+    destino, gravado na mesma transação da cópia, permite retomar um
+    movimento interrompido entre o commit no destino e a limpeza da origem
+    sem copiar de novo.
+    """
+    from app.modules.tasks.counters import adjust_counters, get_version
+    from app.modules.tasks.model import (
+        Task, TaskArchive, TaskCounter, TaskShardMove, TaskTombstone, TaskVersion
+    )
+    from app.modules.tasks.repository import allocate_task_ids
+
+    tasks, archive, tombstones = Task.__table__, TaskArchive.__table__, TaskTombstone.__table__
+    moved = 0
+    with source() as src, target() as dst:
+        _begin_write(src)
+        source_version = get_version(src, user_id)
+        _begin_write(dst)
+        pending = dst.execute(
+            select(TaskShardMove.source_version).where(TaskShardMove.user_id == user_id)
+        ).scalar()
+        if pending is not None and pending != source_version:
+            raise RuntimeError(
+                f"user {user_id}: interrupted move from version {pending}, source is now at {source_version}"
+            )
+
+        if pending is None:
+            task_rows = [dict(row) for row in src.execute(select(tasks).where(tasks.c.user_id == user_id)).mappings()]
+            archive_rows = [
+                dict(row) for row in src.execute(select(archive).where(archive.c.user_id == user_id)).mappings()
+            ]
+            deleted = src.execute(
+                select(tombstones.c.task_id).where(tombstones.c.user_id == user_id)
+            ).scalars().all()
+
+            # Os IDs são mantidos; só IDs de antes das faixas já usados no
+            # destino ganham IDs novos, da faixa do destino (sem faixa, acima
+            # de todos os usados, inclusive em tombstones do usuário)
+            moved_ids = [row["id"] for row in task_rows + archive_rows]
+            taken = set()
+            for chunk in _chunks(moved_ids):
+                for table in (tasks, archive):
+                    taken.update(dst.execute(select(table.c.id).where(table.c.id.in_(chunk))).scalars())
+            next_id = allocate_task_ids(dst, len(taken)) if taken else None
+            if next_id is None:
+                next_id = 1 + max(
+                    [dst.execute(select(func.max(table.c.id))).scalar() or 0 for table in (tasks, archive)]
+                    + [dst.execute(select(func.max(tombstones.c.task_id)).where(tombstones.c.user_id == user_id)).scalar() or 0]
+                    + moved_ids + deleted
+                )
+            new_ids = {}
+            for old_id in sorted(taken):
+                new_ids[old_id] = next_id
+                next_id += 1
+
+            # Uma revisão acima das duas versões: qualquer `since` do cliente recebe tudo de novo
+            revision = max(source_version, get_version(dst, user_id)) + 1
+            for row in task_rows:
+                row["id"] = new_ids.get(row["id"], row["id"])
+                row["revision"] = revision
+            for row in archive_rows:
+                row["id"] = new_ids.get(row["id"], row["id"])
+            # Os IDs antigos das tarefas renumeradas somem para o cliente; um ID
+            # não fica ao mesmo tempo entre as tarefas e os tombstones do usuário
+            moved_ids = [row["id"] for row in task_rows + archive_rows]
+            kept = set(moved_ids)
+            deleted_ids = [task_id for task_id in dict.fromkeys(deleted + list(new_ids)) if task_id not in kept]
+
+            # Tarefas que o usuário já tinha no destino também entram na nova revisão
+            dst.execute(
+                update(tasks).where(tasks.c.user_id == user_id)
+                .values(revision=revision, updated_at=tasks.c.updated_at)
+            )
+            if task_rows:
+                dst.execute(tasks.insert(), task_rows)
+            if archive_rows:
+                dst.execute(archive.insert(), archive_rows)
+            for chunk in _chunks(deleted_ids + moved_ids):
+                dst.execute(delete(tombstones).where(tombstones.c.user_id == user_id, tombstones.c.task_id.in_(chunk)))
+            if deleted_ids:
+                dst.execute(tombstones.insert(), [
+                    {"user_id": user_id, "task_id": task_id, "revision": revision} for task_id in deleted_ids
+                ])
+            adjust_counters(dst, user_id, Counter((row["status"], row["priority"]) for row in task_rows))
+            dst.execute(delete(TaskVersion).where(TaskVersion.user_id == user_id))
+            dst.execute(TaskVersion.__table__.insert().values(user_id=user_id, version=revision))
+            dst.execute(TaskShardMove.__table__.insert().values(user_id=user_id, source_version=source_version))
+            dst.commit()
+            moved = len(task_rows) + len(archive_rows)
+
+        for model in (Task, TaskArchive, TaskTombstone, TaskCounter, TaskVersion):
+            src.execute(delete(model).where(model.user_id == user_id))
+        src.commit()
+
+        dst.execute(delete(TaskShardMove).where(TaskShardMove.user_id == user_id))
+        dst.commit()
+    return moved
+
+
+def clear_stale_moves(shards: List[sessionmaker]) -> int:
+    """
+    Apaga registros de `task_shard_moves` de movimentos já concluídos
+    (usuário sem dados em nenhum outro shard); retorna quantos.
+    """
+    from app.modules.tasks.model import TaskShardMove
+
+    placed = []
+    for factory in shards:
+        with factory() as db:
+            placed.append(set(shard_user_ids(db)))
+
+    cleared = 0
+    for index, factory in enumerate(shards):
+        with factory() as db:
+            pending = db.execute(select(TaskShardMove.user_id)).scalars().all()
+            stale = [
+                user_id for user_id in pending
+                if not any(user_id in users for other, users in enumerate(placed) if other != index)
+            ]
+            if stale:
+                db.execute(delete(TaskShardMove).where(TaskShardMove.user_id.in_(stale)))
+                db.commit()
+            cleared += len(stale)
+    return cleared
+
+
+def misplaced_users(shards: List[sessionmaker], extra: Sequence[sessionmaker] = ()) -> List[Tuple[int, int, int]]:
+    """
+    (user_id, índice de origem, índice de destino) de cada usuário fora do
+    shard dele. Origens em `extra` (bancos a esvaziar) têm índices a partir
+    de len(shards).
+    """
+    result = []
+    for index, factory in enumerate(list(shards) + list(extra)):
+        with factory() as db:
+            for user_id in shard_user_ids(db):
+                target = shard_for(user_id, len(shards))
+                if target != index:
+                    result.append((user_id, index, target))
+    return result
+
+
+def rebalance(
+    shards: List[sessionmaker],
+    drain: Sequence[sessionmaker] = (),
+    pause: float = 0.0,
+    dry_run: bool = False
+) -> Tuple[int, int]:
+    """
+    Move os usuários que estão fora do shard deles (inclusive os dos bancos
+    em `drain`, que ficam vazios); retorna (usuários, tarefas) movidos.
+    """
+    sources = list(shards) + list(drain)
+    if not dry_run:
+        clear_stale_moves(sources)
+
+    users = tasks = 0
+    for user_id, source, target in misplaced_users(shards, drain):
+        logger.info("user %d: shard %d -> %d", user_id, source, target)
+        users += 1
+        if dry_run:
+            continue
+        tasks += move_user(user_id, sources[source], shards[target])
+        if pause:
+            time.sleep(pause)
+    return users, tasks
+
+
+if __name__ == "__main__":
+    import argparse
+    from sqlalchemy import create_engine
+    from app.db import database
+    from app.modules.tasks.model import Task
+
+    parser = argparse.ArgumentParser(description="Shards de tarefas (DATABASE_SHARD_URLS)")
+    parser.add_argument("command", choices=["status", "rebalance"])
+    parser.add_argument("--dry-run", action="store_true", help="Só lista os usuários que seriam movidos")
+    parser.add_argument("--drain", action="append", default=[], help="URL de um shard removido da lista (repetível)")
+    parser.add_argument("--pause-ms", type=float, default=10.0, help="Pausa entre usuários movidos")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    shards = database.shard_sessions
+    drain = [sessionmaker(bind=create_engine(url)) for url in args.drain]
+
+    if args.command == "status":
+        urls = database.shard_urls()
+        for index, (url, factory) in enumerate(zip(urls + args.drain, shards + drain)):
+            with factory() as db:
+                users = len(shard_user_ids(db))
+                total = db.execute(select(func.count()).select_from(Task)).scalar()
+            print(f"shard {index}: {users} usuários, {total} tarefas ativas ({url})")
+        print(f"{len(misplaced_users(shards, drain))} usuários fora do shard")
+    else:
+        users, tasks = rebalance(shards, drain, args.pause_ms / 1000, args.dry_run)
+        if args.dry_run:
+            print(f"{users} usuários seriam movidos")
+        else:
+            print(f"{users} usuários movidos ({tasks} tarefas)")
@@ -1,12 +1,49 @@
-from fastapi import FastAPI
+import gc
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
-from app.db.database import engine, Base
-from app.api.routes import users, tasks
+from app.core.metrics import CONTENT_TYPE, MetricsMiddleware, render_metrics
+from app.core.rate_limit import AdmissionMiddleware
+from app.core.security import password_hasher
+from app.core.warmup import warm_up
+from app.db.database import shard_writer_engines, writer_engines
+from app.db.migrations import run_migrations
+from app.db.sharding import assign_id_ranges
+from app.api.routes import admin, users, tasks
+from app.db.profiler import QueryProfilerMiddleware
+from app.modules.tasks.archive import task_archiver
+from app.modules.tasks.group_commit import task_writers
 
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Schema na subida do processo, não na importação do módulo; o serve.py
+    # aplica uma vez no processo pai e desliga aqui nos workers
+    if settings.DB_AUTO_MIGRATE:
+        for engine in writer_engines():
+            run_migrations(engine)
+        assign_id_ranges(shard_writer_engines())
+    if settings.STARTUP_WARM_UP:
+        await warm_up()
+    # Objetos criados na inicialização (módulos, metadata, rotas) vivem até o
+    # fim do processo: tirá-los do GC evita que cada coleta os percorra de novo
+    # em rotas que alocam muito (ex.: /tasks/import)
+    gc.freeze()
+    if task_archiver is not None:
+        task_archiver.start()
+    yield
+    if task_archiver is not None:
+        task_archiver.shutdown()
+    for task_writer in task_writers:
+        task_writer.shutdown()
+    password_hasher.shutdown()
 
-app = FastAPI(title=settings.PROJECT_NAME, version=settings.VERSION, openapi_url=f"{settings.API_V1_STR}/openapi.json")
+app = FastAPI(title=settings.PROJECT_NAME, version=settings.VERSION, openapi_url=f"{settings.API_V1_STR}/openapi.json", lifespan=lifespan)
+
+# Antes do CORS: fica por dentro dele, e as respostas 429/503 saem com os
+# cabeçalhos CORS (o navegador do cliente consegue ler o Retry-After)
+if settings.RATE_LIMIT_ENABLED or settings.MAX_IN_FLIGHT_REQUESTS:
+    app.add_middleware(AdmissionMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -16,8 +53,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.QUERY_PROFILER_ENABLED:
+    app.add_middleware(QueryProfilerMiddleware)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 app.include_router(users.router, prefix=f"{settings.API_V1_STR}/auth", tags=["auth"])
 app.include_router(tasks.router , prefix=f"{settings.API_V1_STR}/tasks", tags=["tasks"])
+app.include_router(admin.router, prefix=f"{settings.API_V1_STR}/admin", tags=["admin"])
 
 @app.get("/")
 def root():
@@ -27,6 +70,14 @@ def root():
         "docs": "/docs"
     }
 
+# Só liveness: sem autenticação; estado dos caches e da admissão em
+# GET /api/v1/admin/caches (administradores)
 @app.get("/health")
 def health_check():
     return {"status": "ok"}
+
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        """Métricas no formato texto do Prometheus."""
+        return Response(render_metrics(), media_type=CONTENT_TYPE)
@@ -0,0 +1,145 @@
+"""
+Arquivamento de tarefas concluídas (TASK_ARCHIVE_ENABLED).
+
+Tarefas DONE concluídas há mais de TASK_ARCHIVE_AFTER_DAYS dias saem de
+`tasks` para `tasks_archive`, para que a tabela quente (listagem, contagem,
+busca, changes) não cresça sem limite. Uma thread do processo roda o
+arquivamento a cada TASK_ARCHIVE_INTERVAL_SECONDS, em lotes de
+TASK_ARCHIVE_BATCH_SIZE tarefas: cada lote é uma transação curta
+(TaskRepository.archive_done) e, entre um lote e outro, a conexão de
+escrita fica livre por TASK_ARCHIVE_BATCH_PAUSE_MS para as requisições.
+
+Tarefas arquivadas só aparecem na listagem e no export com
+include_archived=true e voltam com POST /tasks/{id}/restore. Estatísticas,
+busca e GET /tasks/changes cobrem só as tarefas ativas (o arquivamento não
+gera tombstones: para o cliente, a tarefa continua existindo).
+
+Com vários workers (serve.py), cada um roda a própria thread; os lotes não
+se sobrepõem (a escolha das candidatas acontece com a escrita travada). Com
+shards (DATABASE_SHARD_URLS), cada rodada passa por um shard de cada vez.
+
+Use: python -m app.modules.tasks.archive [--after-days N]
+Roda o arquivamento uma vez e mostra quantas tarefas foram movidas.
+"""
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import List, Optional
+from sqlalchemy.orm import sessionmaker
+from app.core.config import settings
+from app.core.metrics import tasks_archived
+from app.db.database import shard_sessions
+from app.modules.tasks.repository import TaskRepository
+
+logger = logging.getLogger(__name__)
+
+
+def archive_done_tasks(
+    session_factory: sessionmaker,
+    after_days: int,
+    batch_size: int,
+    pause: float = 0.0,
+    stop: Optional[threading.Event] = None
+) -> int:
+    """
+    Arquiva, lote a lote, as tarefas concluídas há mais de `after_days`
+    dias; retorna o total movido.
+
+    Para quando um lote vem incompleto ou quando `stop` é sinalizado. Cada
+    lote usa uma sessão nova, fechada antes da pausa.
+    """
+    completed_before = datetime.utcnow() - timedelta(days=after_days)
+    total = 0
+    while stop is None or not stop.is_set():
+        with session_factory() as db:
+            moved = TaskRepository(db).archive_done(completed_before, batch_size)
+        total += moved
+        tasks_archived.inc(amount=moved)
+        if moved < batch_size:
+            break
+        if pause:
+            time.sleep(pause)
+    return total
+
+
+class TaskArchiver:
+    """
+    Thread que roda archive_done_tasks em cada shard a cada `interval` segundos.
+
+    A primeira rodada acontece logo após `start`; `shutdown` interrompe a
+    rodada em andamento ao fim do lote corrente.
+    """
+
+    def __init__(
+        self, session_factories: List[sessionmaker], after_days: int, interval: float, batch_size: int, pause: float
+    ):
+        self.session_factories = session_factories
+        self.after_days = after_days
+        self.interval = interval
+        self.batch_size = batch_size
+        self.pause = pause
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="task-archiver", daemon=True)
+            self._thread.start()
+
+    def run_once(self) -> int:
+        return sum(
+            archive_done_tasks(session_factory, self.after_days, self.batch_size, self.pause, self._stop)
+            for session_factory in self.session_factories
+        )
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            start = time.monotonic()
+            try:
+                moved = self.run_once()
+            except Exception:  # a thread não pode morrer: tenta de novo na próxima rodada
+                logger.exception("Falha no arquivamento de tarefas")
+            else:
+                if moved:
+                    logger.info("%d tarefas arquivadas em %.1f s", moved, time.monotonic() - start)
+            self._stop.wait(self.interval)
+
+    def shutdown(self) -> None:
+        """Para a thread (depois do lote em andamento)."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+
+# Arquivador do processo (None com TASK_ARCHIVE_ENABLED=False)
+task_archiver: Optional[TaskArchiver] = (
+    TaskArchiver(
+        shard_sessions,
+        settings.TASK_ARCHIVE_AFTER_DAYS,
+        settings.TASK_ARCHIVE_INTERVAL_SECONDS,
+        settings.TASK_ARCHIVE_BATCH_SIZE,
+        settings.TASK_ARCHIVE_BATCH_PAUSE_MS / 1000,
+    )
+    if settings.TASK_ARCHIVE_ENABLED else None
+)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--after-days", type=int, default=settings.TASK_ARCHIVE_AFTER_DAYS)
+    args = parser.parse_args()
+
+    start = time.monotonic()
+    moved = sum(
+        archive_done_tasks(
+            session_factory, args.after_days, settings.TASK_ARCHIVE_BATCH_SIZE,
+            settings.TASK_ARCHIVE_BATCH_PAUSE_MS / 1000,
+        )
+        for session_factory in shard_sessions
+    )
+    print(f"{moved} tarefas arquivadas em {time.monotonic() - start:.1f} s")
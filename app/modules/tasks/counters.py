@@ -0,0 +1,167 @@
+"""
+Contadores de tarefas por usuário/(status, prioridade) e versão dos dados
+de tarefas de cada usuário.
+
+Use: python -m app.modules.tasks.counters [--dry-run]
+Recalcula os contadores a partir da tabela `tasks` e mostra qualquer divergência.
+"""
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import Table, delete, func, select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from app.modules.tasks.model import Task, TaskCounter, TaskPriority, TaskStatus, TaskVersion
+
+CounterKey = Tuple[int, TaskStatus, TaskPriority]
+
+
+def _increment(db: Session, table: Table, keys: dict, column: str, delta: int) -> Optional[int]:
+    """
+    Soma `delta` à coluna da linha `keys` (upsert), dentro da transação corrente da sessão.
+
+    Retorna o novo valor quando o banco o devolve no próprio upsert
+    (SQLite >= 3.35, com RETURNING); senão, None.
+    """
+    values = {**keys, column: delta}
+    dialect = db.get_bind().dialect.name
+
+    if dialect == "mysql":
+        stmt = mysql_insert(table).values(**values)
+        stmt = stmt.on_duplicate_key_update({column: table.c[column] + stmt.inserted[column]})
+    elif dialect == "sqlite":
+        stmt = sqlite_insert(table).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(keys),
+            set_={column: table.c[column] + stmt.excluded[column]},
+        )
+        if db.get_bind().dialect.insert_returning:
+            return db.execute(stmt.returning(table.c[column])).scalar()
+    else:
+        updated = db.execute(
+            table.update()
+            .where(*(table.c[name] == value for name, value in keys.items()))
+            .values({column: table.c[column] + delta})
+        )
+        if updated.rowcount:
+            return None
+        stmt = table.insert().values(**values)
+
+    db.execute(stmt)
+    return None
+
+
+def adjust_counter(db: Session, user_id: int, status: TaskStatus, priority: TaskPriority, delta: int) -> None:
+    """Soma `delta` ao contador (upsert), dentro da transação corrente da sessão."""
+    keys = {"user_id": user_id, "status": status, "priority": priority}
+    _increment(db, TaskCounter.__table__, keys, "count", delta)
+
+
+def adjust_counters(db: Session, user_id: int, deltas: Dict[Tuple[TaskStatus, TaskPriority], int]) -> None:
+    """Aplica vários deltas de uma vez (escritas em lote), um upsert por combinação alterada."""
+    for (status, priority), delta in deltas.items():
+        if delta:
+            adjust_counter(db, user_id, status, priority, delta)
+
+
+def bump_version(db: Session, user_id: int) -> int:
+    """
+    Incrementa a versão dos dados de tarefas do usuário (chamar em toda escrita
+    em `tasks`, antes das demais alterações) e retorna a nova versão.
+
+    A nova versão é a revisão gravada nas linhas alteradas. A linha da versão
+    fica travada até o commit, então as revisões de um usuário são confirmadas
+    em ordem.
+    """
+    version = _increment(db, TaskVersion.__table__, {"user_id": user_id}, "version", 1)
+    return version if version is not None else get_version(db, user_id)
+
+
+def get_version(db: Session, user_id: int) -> int:
+    """Versão atual dos dados de tarefas do usuário (0 se ele nunca escreveu)."""
+    return db.execute(select(TaskVersion.version).where(TaskVersion.user_id == user_id)).scalar() or 0
+
+
+def sum_counters(
+    db: Session,
+    user_id: int,
+    status: Optional[TaskStatus] = None,
+    priority: Optional[TaskPriority] = None
+) -> int:
+    """Total de tarefas do usuário a partir dos contadores (no máximo 9 linhas lidas)."""
+    query = select(func.coalesce(func.sum(TaskCounter.count), 0)).where(TaskCounter.user_id == user_id)
+    if status:
+        query = query.where(TaskCounter.status == status)
+    if priority:
+        query = query.where(TaskCounter.priority == priority)
+    return db.execute(query).scalar()
+
+
+def counter_matrix(db: Session, user_id: int) -> Dict[Tuple[TaskStatus, TaskPriority], int]:
+    """Contadores do usuário por (status, prioridade); combinações sem linha ficam de fora."""
+    rows = db.execute(
+        select(TaskCounter.status, TaskCounter.priority, TaskCounter.count).where(TaskCounter.user_id == user_id)
+    )
+    return {(status, priority): count for status, priority, count in rows}
+
+
+def _actual_counts(conn: Connection) -> Dict[CounterKey, int]:
+    rows = conn.execute(
+        select(Task.user_id, Task.status, Task.priority, func.count())
+        .group_by(Task.user_id, Task.status, Task.priority)
+    )
+    return {(user_id, status, priority): count for user_id, status, priority, count in rows}
+
+
+def _stored_counts(conn: Connection) -> Dict[CounterKey, int]:
+    rows = conn.execute(select(TaskCounter.user_id, TaskCounter.status, TaskCounter.priority, TaskCounter.count))
+    return {(user_id, status, priority): count for user_id, status, priority, count in rows if count}
+
+
+def rebuild_counters(conn: Connection, dry_run: bool = False) -> List[Tuple[CounterKey, int, int]]:
+    """
+    Recalcula os contadores a partir de `tasks`.
+
+    Retorna a lista de divergências (chave, valor armazenado, valor real).
+    Com dry_run=True apenas reporta, sem gravar.
+    """
+    actual = _actual_counts(conn)
+    stored = _stored_counts(conn)
+    drift = [
+        (key, stored.get(key, 0), actual.get(key, 0))
+        for key in sorted(set(actual) | set(stored), key=lambda k: (k[0], k[1].value, k[2].value))
+        if stored.get(key, 0) != actual.get(key, 0)
+    ]
+
+    if not dry_run:
+        conn.execute(delete(TaskCounter))
+        if actual:
+            conn.execute(
+                TaskCounter.__table__.insert(),
+                [
+                    {"user_id": user_id, "status": status, "priority": priority, "count": count}
+                    for (user_id, status, priority), count in actual.items()
+                ],
+            )
+
+    return drift
+
+
+if __name__ == "__main__":
+    import argparse
+    from app.db.database import shard_writer_engines
+
+    parser = argparse.ArgumentParser(description="Reconcilia os contadores de tarefas")
+    parser.add_argument("--dry-run", action="store_true", help="Apenas reporta divergências")
+    args = parser.parse_args()
+
+    # Cada shard tem os contadores dos próprios usuários
+    drift = []
+    for engine in shard_writer_engines():
+        with engine.begin() as conn:
+            drift += rebuild_counters(conn, dry_run=args.dry_run)
+
+    for (user_id, status, priority), stored, actual in drift:
+        print(f"user={user_id} status={status.value} priority={priority.value}: {stored} -> {actual}")
+    action = "encontradas" if args.dry_run else "corrigidas"
+    print(f"{len(drift)} divergências {action}")
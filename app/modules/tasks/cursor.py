@@ -0,0 +1,52 @@
+import base64
+import json
+from datetime import datetime
+from typing import Tuple
+
+# Posição em GET /tasks/changes: (revisão, 0 = exclusão / 1 = tarefa, ID)
+ChangesPosition = Tuple[int, int, int]
+
+
+class InvalidCursorError(ValueError):
+    """Cursor malformado ou adulterado."""
+
+
+def _encode(values: list) -> str:
+    raw = json.dumps(values, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode(cursor: str) -> list:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded.encode()))
+
+
+def encode_cursor(created_at: datetime, task_id: int) -> str:
+    """Gera um cursor opaco a partir da chave de ordenação (created_at, id)."""
+    return _encode([created_at.isoformat(), task_id])
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Converte um cursor opaco de volta para (created_at, id)."""
+    try:
+        created_at, task_id = _decode(cursor)
+        return datetime.fromisoformat(created_at), int(task_id)
+    except (ValueError, TypeError) as exc:
+        raise InvalidCursorError("Invalid cursor") from exc
+
+
+def encode_changes_cursor(position: ChangesPosition) -> str:
+    """Cursor opaco de GET /tasks/changes: a última alteração entregue."""
+    return _encode(list(position))
+
+
+def decode_changes_cursor(cursor: str) -> ChangesPosition:
+    """Converte um cursor de GET /tasks/changes de volta para (revisão, tipo, ID)."""
+    try:
+        revision, kind, task_id = _decode(cursor)
+        position = (int(revision), int(kind), int(task_id))
+    except (ValueError, TypeError) as exc:
+        raise InvalidCursorError("Invalid cursor") from exc
+    if position[0] < 0 or position[1] not in (0, 1):
+        raise InvalidCursorError("Invalid cursor")
+    return position
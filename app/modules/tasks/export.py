@@ -0,0 +1,77 @@
+import csv
+import io
+import json
+from typing import Iterable, List, Optional, Sequence
+from sqlalchemy import Select, select
+from app.modules.tasks.model import Task, TaskArchive, TaskPriority, TaskStatus
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+EXPORT_COLUMNS = [
+    Task.id, Task.title, Task.description, Task.priority,
+    Task.status, Task.created_at, Task.updated_at,
+]
+
+EXPORT_FIELDS = [column.key for column in EXPORT_COLUMNS]
+
+# Linhas buscadas por lote (cursor do lado do servidor no MySQL)
+EXPORT_BATCH_SIZE = 1000
+
+
+def export_statement(
+    user_id: int,
+    status: Optional[TaskStatus] = None,
+    priority: Optional[TaskPriority] = None,
+    archived: bool = False
+) -> Select:
+    """SELECT das colunas exportadas, com os mesmos filtros da listagem (de `tasks_archive` com `archived`)."""
+    model = TaskArchive if archived else Task
+    query = select(*(getattr(model, field) for field in EXPORT_FIELDS)).where(model.user_id == user_id)
+    if status:
+        query = query.where(model.status == status)
+    if priority:
+        query = query.where(model.priority == priority)
+    return query.order_by(model.created_at.desc(), model.id.desc())
+
+
+def export_statements(
+    user_id: int,
+    status: Optional[TaskStatus] = None,
+    priority: Optional[TaskPriority] = None,
+    include_archived: bool = False
+) -> List[Select]:
+    """Consultas do export, em ordem: as tarefas ativas e, com `include_archived`, as arquivadas (todas DONE)."""
+    statements = [export_statement(user_id, status, priority)]
+    if include_archived and status in (None, TaskStatus.DONE):
+        statements.append(export_statement(user_id, status, priority, archived=True))
+    return statements
+
+
+def _plain(row: Sequence) -> list:
+    task_id, title, description, priority, status, created_at, updated_at = row
+    return [
+        task_id, title, description, priority.value, status.value,
+        created_at.isoformat() if created_at else None,
+        updated_at.isoformat() if updated_at else None,
+    ]
+
+
+def csv_header() -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(EXPORT_FIELDS)
+    return buffer.getvalue()
+
+
+def encode_batch(rows: Iterable[Sequence], fmt: str) -> str:
+    """Serializa um lote de linhas; cada lote vira um chunk da resposta."""
+    if fmt == "csv":
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(_plain(row) for row in rows)
+        return buffer.getvalue()
+    return "".join(
+        json.dumps(dict(zip(EXPORT_FIELDS, _plain(row))), ensure_ascii=False) + "\n"
+        for row in rows
+    )
@@ -0,0 +1,201 @@
+"""
+Group commit das escritas de tarefas (opcional, TASK_GROUP_COMMIT_ENABLED).
+
+Com um commit por requisição, o fsync de cada commit limita a taxa de
+inserções por mais workers que existam. Aqui, criações/atualizações que
+chegam em até TASK_GROUP_COMMIT_MAX_DELAY_MS (no máximo
+TASK_GROUP_COMMIT_MAX_BATCH) são executadas por uma thread escritora em uma
+só transação, com um commit para o lote inteiro.
+
+Cada operação roda em um SAVEPOINT: um erro (ou uma atualização de tarefa
+inexistente) desfaz só aquela operação e chega só a quem a enviou; se o
+commit do lote falhar, todos os chamadores do lote recebem o erro. O
+resultado só é entregue depois do commit.
+
+Com shards (DATABASE_SHARD_URLS), um escritor por shard, cada um com a
+própria fila: o lote de um shard não espera pelo lock de escrita de outro.
+"""
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+from time import monotonic
+from typing import Callable, List, Optional, Tuple, TypeVar
+from sqlalchemy.orm import Session, sessionmaker
+from app.core.config import settings
+from app.core.metrics import task_group_commit_batch_size
+from app.db.database import shard_sessions
+from app.db.sharding import shard_for
+from app.modules.tasks.repository import TaskRepository
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+Operation = Callable[[TaskRepository], T]
+
+
+class GroupCommitOverloadedError(RuntimeError):
+    """Fila do group commit cheia."""
+
+
+class _Rollback(Exception):
+    """Desfaz o savepoint da operação sem tratá-la como erro."""
+
+    def __init__(self, result):
+        self.result = result
+
+
+def rollback_if_none(operation: Operation) -> Operation:
+    """Operação cujo resultado None desfaz o que ela escreveu (ex.: update sem tarefa)."""
+
+    def run(repo: TaskRepository):
+        result = operation(repo)
+        if result is None:
+            raise _Rollback(result)
+        return result
+
+    return run
+
+
+class GroupCommitWriter:
+    """
+    Thread escritora que agrupa operações do TaskRepository em transações.
+
+    - `submit` enfileira uma operação (função que recebe o TaskRepository
+      da transação do lote) e devolve um Future com o resultado dela;
+    - um lote fecha com `max_batch` operações ou `max_delay` segundos depois
+      da primeira, o que vier antes;
+    - no máximo `queue_size` operações aguardando; além disso,
+      GroupCommitOverloadedError.
+    """
+
+    def __init__(
+        self, session_factory: sessionmaker, max_batch: int, max_delay: float, queue_size: int,
+        name: str = "task-group-commit"
+    ):
+        self.session_factory = session_factory
+        self.name = name
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._slots = threading.BoundedSemaphore(queue_size)
+        self._queue: "queue.Queue[Optional[Tuple[Future, Operation]]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def _start(self) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._loop, name=self.name, daemon=True)
+                    self._thread.start()
+
+    def submit(self, operation: Operation) -> Future:
+        """Agenda `operation` no próximo lote, ou levanta GroupCommitOverloadedError se a fila estiver cheia."""
+        if not self._slots.acquire(blocking=False):
+            raise GroupCommitOverloadedError("Task write queue is full")
+        self._start()
+        future: Future = Future()
+        future.add_done_callback(lambda _: self._slots.release())
+        self._queue.put((future, operation))
+        return future
+
+    def run(self, operation: Operation) -> T:
+        return self.submit(operation).result()
+
+    def _next_batch(self) -> Optional[List[Tuple[Future, Operation]]]:
+        first = self._queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = monotonic() + self.max_delay
+        while len(batch) < self.max_batch:
+            timeout = deadline - monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if item is None:
+                # Encerramento: processa o lote atual e para na próxima volta
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _loop(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            try:
+                self._commit_batch(batch)
+            except Exception:  # a thread não pode morrer: o erro já foi entregue aos chamadores
+                logger.exception("Falha no lote de group commit")
+
+    def _commit_batch(self, batch: List[Tuple[Future, Operation]]) -> None:
+        task_group_commit_batch_size.observe((), len(batch))
+        # expire_on_commit=False: os objetos retornados saem da sessão já carregados
+        db: Session = self.session_factory(expire_on_commit=False)
+        repo = TaskRepository(db)
+        outcomes = []
+        try:
+            if db.get_bind().dialect.name == "sqlite":
+                # O pysqlite só abre a transação no primeiro DML: sem o BEGIN
+                # explícito, o SAVEPOINT abriria a transação e o RELEASE dele
+                # faria commit a cada operação
+                db.connection().exec_driver_sql("BEGIN IMMEDIATE")
+            for future, operation in batch:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                savepoint = db.begin_nested()
+                try:
+                    result = operation(repo)
+                    savepoint.commit()
+                except _Rollback as rollback:
+                    savepoint.rollback()
+                    result = rollback.result
+                except Exception as exc:
+                    savepoint.rollback()
+                    future.set_exception(exc)
+                    continue
+                outcomes.append((future, result))
+            db.commit()
+        except Exception as exc:
+            db.rollback()
+            for future, _ in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            raise
+        finally:
+            db.close()
+
+        for future, result in outcomes:
+            future.set_result(result)
+
+    def shutdown(self) -> None:
+        """Processa as operações já enfileiradas e para a thread escritora."""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+
+# Escritores do processo, um por shard (vazio com TASK_GROUP_COMMIT_ENABLED=False)
+task_writers: List[GroupCommitWriter] = [
+    GroupCommitWriter(
+        session_factory,
+        settings.TASK_GROUP_COMMIT_MAX_BATCH,
+        settings.TASK_GROUP_COMMIT_MAX_DELAY_MS / 1000,
+        settings.TASK_GROUP_COMMIT_QUEUE_SIZE,
+        name=f"task-group-commit-{index}",
+    )
+    for index, session_factory in enumerate(shard_sessions)
+] if settings.TASK_GROUP_COMMIT_ENABLED else []
+
+
+def task_writer_for(user_id: int) -> Optional[GroupCommitWriter]:
+    """Escritor do shard das tarefas do usuário (None sem group commit)."""
+    if not task_writers:
+        return None
+    return task_writers[shard_for(user_id, len(task_writers))]
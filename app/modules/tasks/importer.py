@@ -0,0 +1,215 @@
+import csv
+from typing import Iterable, List, Optional, Tuple
+from pydantic import TypeAdapter, ValidationError
+from app.modules.tasks.schema import TaskCreate
+
+IMPORT_FIELDS = ("title", "description", "priority")
+
+# (linha, tarefa validada, erro): tarefa é None quando a linha tem erro
+ImportRecord = Tuple[int, Optional[TaskCreate], Optional[str]]
+
+# Linha física (número, texto, erro)
+ImportLine = Tuple[int, Optional[str], Optional[str]]
+
+
+class InvalidImportError(ValueError):
+    """Arquivo de importação inválido como um todo (ex.: cabeçalho CSV sem `title`)."""
+
+
+class LineReader:
+    """
+    Divide o corpo da requisição, recebido em chunks, em linhas completas.
+
+    Só a linha ainda incompleta fica em memória; linhas maiores que
+    `max_line_bytes` são descartadas e reportadas como erro.
+    """
+
+    def __init__(self, max_line_bytes: int):
+        self.max_line_bytes = max_line_bytes
+        self.line_no = 0
+        self._partial = b""
+        self._skipping = False
+
+    def _too_long(self) -> ImportLine:
+        self.line_no += 1
+        return self.line_no, None, f"Line exceeds {self.max_line_bytes} bytes"
+
+    def _line(self, raw: bytes) -> ImportLine:
+        if len(raw) > self.max_line_bytes:
+            return self._too_long()
+        self.line_no += 1
+        try:
+            return self.line_no, raw.decode("utf-8").rstrip("\r"), None
+        except UnicodeDecodeError:
+            return self.line_no, None, "Invalid UTF-8"
+
+    def _lines(self, parts: List[bytes]) -> List[ImportLine]:
+        if parts and max(map(len, parts)) <= self.max_line_bytes:
+            # Caminho comum: decodifica o bloco inteiro de uma vez
+            try:
+                texts = b"\n".join(parts).decode("utf-8").split("\n")
+            except UnicodeDecodeError:
+                pass
+            else:
+                start = self.line_no + 1
+                self.line_no += len(texts)
+                return [(line_no, text.rstrip("\r"), None) for line_no, text in enumerate(texts, start)]
+        return [self._line(raw) for raw in parts]
+
+    def feed(self, chunk: bytes) -> List[ImportLine]:
+        parts = chunk.split(b"\n")
+        parts[0] = self._partial + parts[0]
+        self._partial = parts.pop()
+
+        if self.line_no == 0 and parts and parts[0].startswith(b"\xef\xbb\xbf"):
+            parts[0] = parts[0][3:]
+        if self._skipping and parts:
+            # Fim da linha longa demais que já foi reportada
+            self._skipping = False
+            parts.pop(0)
+        lines = self._lines(parts)
+
+        if len(self._partial) > self.max_line_bytes:
+            if not self._skipping:
+                lines.append(self._too_long())
+            self._partial = b""
+            self._skipping = True
+        return lines
+
+    def finish(self) -> List[ImportLine]:
+        partial, self._partial = self._partial, b""
+        if self._skipping or not partial:
+            return []
+        if self.line_no == 0 and partial.startswith(b"\xef\xbb\xbf"):
+            partial = partial[3:]
+        return [self._line(partial)]
+
+
+def _error_detail(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(loc) for loc in error['loc'])}: {error['msg']}" if error["loc"] else error["msg"]
+        for error in exc.errors()
+    )
+
+
+_task_list = TypeAdapter(List[TaskCreate])
+
+
+class NDJSONParser:
+    """
+    Um objeto JSON por linha; linhas em branco são ignoradas.
+
+    O lote inteiro é decodificado e validado como TaskCreate em uma única
+    chamada (as linhas viram um array JSON). Se alguma linha tiver erro, o
+    lote é revalidado linha a linha para reportar cada erro.
+    """
+
+    def _parse_lines(self, lines: List[ImportLine]) -> List[ImportRecord]:
+        records = []
+        for line_no, text, error in lines:
+            if error:
+                records.append((line_no, None, error))
+                continue
+            try:
+                records.append((line_no, TaskCreate.model_validate_json(text), None))
+            except ValidationError as exc:
+                records.append((line_no, None, _error_detail(exc)))
+        return records
+
+    def parse(self, lines: Iterable[ImportLine], final: bool = False) -> List[ImportRecord]:
+        lines = [line for line in lines if line[2] or line[1].strip()]
+        if not lines or any(error for _, _, error in lines):
+            return self._parse_lines(lines)
+
+        # Com ",\n" entre as linhas uma string JSON não atravessa linhas e cada
+        # linha precisa produzir exatamente um item
+        try:
+            tasks = _task_list.validate_json("[" + ",\n".join(text for _, text, _ in lines) + "]")
+        except ValidationError:
+            return self._parse_lines(lines)
+        if len(tasks) != len(lines):
+            return self._parse_lines(lines)
+        return [(line_no, task, None) for (line_no, _, _), task in zip(lines, tasks)]
+
+
+class CSVParser:
+    """
+    CSV com cabeçalho na primeira linha (colunas extras são ignoradas).
+
+    Campos entre aspas podem conter quebras de linha: as linhas físicas são
+    acumuladas até o número de aspas ficar par, então o registro é lido.
+    """
+
+    def __init__(self, max_line_bytes: int):
+        self.max_line_bytes = max_line_bytes
+        self.header: Optional[List[str]] = None
+        self._pending_line = 0
+        self._reset()
+
+    def _reset(self) -> None:
+        self._pending: List[str] = []
+        self._pending_size = 0
+        self._quotes = 0
+
+    def _set_header(self, text: str) -> None:
+        self.header = [name.strip() for name in next(csv.reader([text]))]
+        if "title" not in self.header:
+            raise InvalidImportError("CSV header must include a 'title' column")
+
+    def _record(self, line_no: int, text: str) -> Optional[ImportRecord]:
+        if self.header is None:
+            self._set_header(text)
+            return None
+        if not text.strip():
+            return None
+        try:
+            values = next(csv.reader([text]))
+        except csv.Error:
+            return line_no, None, "Invalid CSV record"
+        data = {
+            name: value or None
+            for name, value in zip(self.header, values)
+            if name in IMPORT_FIELDS
+        }
+        try:
+            return line_no, TaskCreate.model_validate(data), None
+        except ValidationError as exc:
+            return line_no, None, _error_detail(exc)
+
+    def parse(self, lines: Iterable[ImportLine], final: bool = False) -> List[ImportRecord]:
+        records = []
+        for line_no, text, error in lines:
+            if error:
+                if self._pending:
+                    records.append((self._pending_line, None, "Unterminated quoted field"))
+                    self._reset()
+                records.append((line_no, None, error))
+                continue
+
+            if not self._pending:
+                self._pending_line = line_no
+            self._pending.append(text)
+            self._pending_size += len(text)
+            self._quotes += text.count('"')
+
+            if self._quotes % 2:
+                if self._pending_size > self.max_line_bytes:
+                    records.append((self._pending_line, None, "Unterminated quoted field"))
+                    self._reset()
+                continue
+
+            record = self._record(self._pending_line, "\n".join(self._pending))
+            self._reset()
+            if record is not None:
+                records.append(record)
+
+        if final and self._pending:
+            records.append((self._pending_line, None, "Unterminated quoted field"))
+            self._reset()
+        return records
+
+
+def make_parser(fmt: str, max_line_bytes: int):
+    if fmt == "csv":
+        return CSVParser(max_line_bytes)
+    return NDJSONParser()
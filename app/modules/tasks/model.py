@@ -1,8 +1,23 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Enum
+from sqlalchemy import BigInteger, Column, Integer, String, DateTime, Enum, Index
+from sqlalchemy.dialects import sqlite
 from app.db.database import Base
 from sqlalchemy.sql import func
 import enum
 
+# O SQLite grava CURRENT_TIMESTAMP sem microssegundos; usar o mesmo formato nos
+# parâmetros mantém as comparações de igualdade do cursor (created_at, id) corretas.
+TimestampType = DateTime(timezone=True).with_variant(
+    sqlite.DATETIME(
+        storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"
+    ),
+    "sqlite",
+)
+
+# IDs de tarefas: cada shard gera os seus em uma faixa própria (ver
+# app/db/sharding.py), acima do limite de INT; no SQLite, INTEGER já tem 64
+# bits (e AUTOINCREMENT exige INTEGER PRIMARY KEY)
+TaskIdType = BigInteger().with_variant(Integer, "sqlite")
+
 class TaskStatus(enum.Enum):
     PENDING = "pending"
     IN_PROGRESS = "in_progress"
@@ -15,13 +30,131 @@ class TaskPriority(enum.Enum):
 
 class Task(Base):
     __tablename__ = "tasks"
+    __table_args__ = (
+        # Índices alinhados com TaskRepository.get_by_user_with_filters/count_user_tasks:
+        # igualdade em user_id (+ filtros) seguida da ordenação por created_at, id.
+        Index("ix_tasks_user_created", "user_id", "created_at", "id"),
+        Index("ix_tasks_user_status_created", "user_id", "status", "created_at"),
+        Index("ix_tasks_user_priority_created", "user_id", "priority", "created_at"),
+        Index("ix_tasks_user_status_priority_created", "user_id", "status", "priority", "created_at"),
+        # Sincronização incremental (GET /tasks/changes): user_id = ? AND revision > ?
+        Index("ix_tasks_user_revision", "user_id", "revision"),
+        # Conclusões por dia (GET /tasks/stats)
+        Index("ix_tasks_user_completed", "user_id", "completed_at"),
+        # Candidatas ao arquivamento: status = DONE AND completed_at < ?
+        Index("ix_tasks_status_completed", "status", "completed_at"),
+        # IDs nunca reusados (sem isso, o SQLite reusa o maior ID depois de
+        # uma exclusão): o ID de uma tarefa arquivada continua só dela
+        {"sqlite_autoincrement": True},
+    )
 
-    id = Column(Integer,primary_key=True,index=True)
+    id = Column(TaskIdType, primary_key=True, index=True)
     title = Column(String(255), nullable=False)
     description = Column(String(255), nullable=True)
     priority = Column(Enum(TaskPriority), default=TaskPriority.MEDIUM, nullable=False)
     status = Column(Enum(TaskStatus), default=TaskStatus.PENDING, nullable=False)
-    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    created_at = Column(TimestampType, nullable=False, server_default=func.now())
     updated_at = Column(DateTime(timezone=True), nullable=True, onupdate=func.now())
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    # Sem chave estrangeira para users.id, aqui e nas demais tabelas de
+    # tarefas: elas podem ficar em shards, e os usuários ficam só no banco
+    # principal (a posse é conferida pelo TaskRepository)
+    user_id = Column(Integer, nullable=False)
+    # Versão do usuário (TaskVersion) na escrita que criou/alterou a tarefa por último
+    revision = Column(Integer, nullable=False, default=0, server_default="0")
+    # Quando a tarefa passou para DONE (None se não está concluída)
+    completed_at = Column(TimestampType, nullable=True)
+
+
+class TaskCounter(Base):
+    """Total de tarefas por usuário e combinação (status, prioridade).
+
+    Mantido pelo TaskRepository na mesma transação das escritas em `tasks`,
+    para que a paginação não precise de COUNT(*).
+    """
+    __tablename__ = "task_counters"
+
+    user_id = Column(Integer, primary_key=True)
+    status = Column(Enum(TaskStatus), primary_key=True)
+    priority = Column(Enum(TaskPriority), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
+class TaskVersion(Base):
+    """Versão dos dados de tarefas de cada usuário.
+
+    Incrementada na mesma transação de toda escrita em `tasks`; identifica
+    o estado da listagem (ETag e chave do cache de páginas).
+    """
+    __tablename__ = "task_versions"
+
+    user_id = Column(Integer, primary_key=True, autoincrement=False)
+    version = Column(Integer, nullable=False, default=0)
+
+
+class TaskTombstone(Base):
+    """Tarefa deletada, com a revisão da exclusão (para GET /tasks/changes)."""
+    __tablename__ = "task_tombstones"
+    __table_args__ = (
+        Index("ix_task_tombstones_user_revision", "user_id", "revision", "task_id"),
+    )
+
+    user_id = Column(Integer, primary_key=True)
+    task_id = Column(TaskIdType, primary_key=True)
+    revision = Column(Integer, nullable=False)
+    deleted_at = Column(TimestampType, nullable=False, server_default=func.now())
+
+
+class TaskArchive(Base):
+    """Tarefa concluída movida de `tasks` pelo arquivamento (ver archive.py).
+
+    Mesmas colunas de Task, com o ID original, mais a data do arquivamento.
+    Fica fora dos contadores: a listagem e o export só a leem com
+    include_archived.
+    """
+    __tablename__ = "tasks_archive"
+    __table_args__ = (
+        # Listagem com include_archived (mesma ordenação de `tasks`) e contagem por prioridade
+        Index("ix_tasks_archive_user_created", "user_id", "created_at", "id"),
+        Index("ix_tasks_archive_user_priority_created", "user_id", "priority", "created_at"),
+    )
+
+    id = Column(TaskIdType, primary_key=True, autoincrement=False)
+    title = Column(String(255), nullable=False)
+    description = Column(String(255), nullable=True)
+    priority = Column(Enum(TaskPriority), nullable=False)
+    status = Column(Enum(TaskStatus), nullable=False)
+    created_at = Column(TimestampType, nullable=False)
+    updated_at = Column(DateTime(timezone=True), nullable=True)
+    user_id = Column(Integer, nullable=False)
+    revision = Column(Integer, nullable=False)
+    completed_at = Column(TimestampType, nullable=True)
+    archived_at = Column(TimestampType, nullable=False, server_default=func.now())
+
+
+class TaskShardMove(Base):
+    """Usuário copiado para este shard e ainda não removido do shard de origem.
+
+    Gravado pelo rebalanceamento (app/db/sharding.py) na transação da
+    cópia, com a versão do usuário na origem: permite retomar o movimento
+    sem copiar de novo. Apagado ao fim do movimento.
+    """
+    __tablename__ = "task_shard_moves"
+
+    user_id = Column(Integer, primary_key=True, autoincrement=False)
+    source_version = Column(Integer, nullable=False)
+    moved_at = Column(TimestampType, nullable=False, server_default=func.now())
+
+
+class TaskIdSequence(Base):
+    """
+    Faixa de IDs de tarefas deste banco e o próximo ID dela (uma linha).
+
+    Só existe com shards (gravada por assign_id_ranges, ver
+    app/db/sharding.py): tarefas novas recebem IDs daqui em vez do
+    autoincremento, e tarefas movidas de outros shards, com IDs de outras
+    faixas, não mudam a sequência.
+    """
+    __tablename__ = "task_id_sequence"
 
+    id_range = Column(Integer, primary_key=True, autoincrement=False)
+    next_id = Column(TaskIdType, nullable=False)
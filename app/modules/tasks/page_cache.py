@@ -0,0 +1,66 @@
+"""
+ETag e cache em memória das páginas de GET /tasks e das respostas de
+GET /tasks/stats.
+
+A chave de uma página inclui a versão dos dados do usuário (task_versions),
+que muda em toda escrita: a mesma chave sempre corresponde ao mesmo
+conteúdo, então o cache não precisa de invalidação nem de TTL.
+"""
+import hashlib
+from datetime import date, datetime
+from typing import Hashable, Optional, Tuple
+from app.core.cache import LRUBytesCache
+from app.core.config import settings
+from app.modules.tasks.model import TaskPriority, TaskStatus
+
+# Corpos JSON já renderizados, limitados pelo total de bytes
+page_cache = LRUBytesCache(max_bytes=settings.TASK_PAGE_CACHE_MAX_BYTES)
+stats_cache = LRUBytesCache(max_bytes=settings.TASK_STATS_CACHE_MAX_BYTES)
+
+
+def page_key(
+    user_id: int,
+    version: int,
+    skip: int = 0,
+    limit: int = 10,
+    status: Optional[TaskStatus] = None,
+    priority: Optional[TaskPriority] = None,
+    after: Optional[Tuple[datetime, int]] = None,
+    include_archived: bool = False
+) -> Hashable:
+    return (
+        user_id, version,
+        status.value if status else None,
+        priority.value if priority else None,
+        skip, limit,
+        (after[0].isoformat(), after[1]) if after else None,
+        include_archived,
+    )
+
+
+def stats_key(user_id: int, version: int, days: int, today: date) -> Hashable:
+    # `today`: a janela da série diária também muda na virada do dia
+    return ("stats", user_id, version, days, today.isoformat())
+
+
+def page_etag(key: Hashable) -> str:
+    return '"' + hashlib.blake2b(repr(key).encode(), digest_size=12).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Compara If-None-Match com o ETag (comparação fraca: ignora o prefixo W/)."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def page_cache_stats() -> dict:
+    return {"enabled": settings.TASK_PAGE_CACHE_ENABLED, **page_cache.stats()}
+
+
+def stats_cache_stats() -> dict:
+    return stats_cache.stats()
@@ -1,61 +1,600 @@
+import heapq
+from collections import Counter
+from functools import lru_cache
+from itertools import islice
+from operator import itemgetter
+from sqlalchemy import Select, Table, bindparam, delete, func, or_, select, text, update
+from sqlalchemy.engine import Connection, Dialect, Engine
 from sqlalchemy.orm import Session
-from typing import Optional, List
-from app.modules.tasks.model import Task
+from typing import Optional, List, Tuple, Dict, Iterator, Sequence
+from datetime import date, datetime
+from app.modules.tasks.model import Task, TaskArchive, TaskIdSequence, TaskStatus, TaskPriority, TaskTombstone
+from app.modules.tasks.counters import (
+    adjust_counter, adjust_counters, bump_version, counter_matrix, get_version, sum_counters
+)
+from app.modules.tasks.cursor import ChangesPosition
+from app.modules.tasks.export import export_statements
+from app.modules.tasks.search import apply_search, deferred_search_indexing, search_backend
+
+# Colunas gravadas pelo import, na ordem da tabela (= ordem dos parâmetros posicionais)
+IMPORT_COLUMNS = ("title", "description", "priority", "status", "user_id", "revision")
+
+# Colunas retornadas por GET /tasks/changes (TaskChange)
+CHANGE_COLUMNS = (
+    Task.id, Task.title, Task.description, Task.priority, Task.status,
+    Task.created_at, Task.updated_at, Task.revision,
+)
+CHANGE_ID = CHANGE_COLUMNS.index(Task.id)
+CHANGE_REVISION = CHANGE_COLUMNS.index(Task.revision)
+
+# Colunas de TaskResponse, na ordem dos campos (listagem de GET /tasks)
+_tasks = Task.__table__
+LIST_COLUMNS = (_tasks.c.title, _tasks.c.description, _tasks.c.priority, _tasks.c.id, _tasks.c.status, _tasks.c.created_at)
+LIST_CREATED_AT = LIST_COLUMNS.index(_tasks.c.created_at)
+LIST_ID = LIST_COLUMNS.index(_tasks.c.id)
+# Ordem da listagem (decrescente) ao intercalar páginas de `tasks` e `tasks_archive`
+_list_order = itemgetter(LIST_CREATED_AT, LIST_ID)
+
+# Colunas copiadas entre `tasks` e `tasks_archive` (arquivamento e restauração)
+_archive = TaskArchive.__table__
+ARCHIVE_COPY_COLUMNS = tuple(column.key for column in _tasks.columns)
+
+# Linha de GET /tasks/stats: (dia, criadas, concluídas)
+DailyStats = Tuple[date, int, int]
+
+# Linha do import: (title, description, priority, status)
+ImportRow = Tuple[str, Optional[str], TaskPriority, TaskStatus]
+
+# Sequência de IDs de tarefas do banco (só com shards) e, por engine, se ela existe
+_sequence = TaskIdSequence.__table__
+_id_sequences: Dict[Engine, bool] = {}
+
+
+@lru_cache(maxsize=32)
+def _multi_row_insert_sql(dialect: Dialect, n_rows: int, with_ids: bool = False) -> str:
+    """INSERT INTO tasks (...) VALUES (?, ...), (?, ...), ... com `n_rows` linhas (com `id` primeiro, se `with_ids`)."""
+    columns = ("id",) + IMPORT_COLUMNS if with_ids else IMPORT_COLUMNS
+    compiled = Task.__table__.insert().compile(dialect=dialect, column_keys=columns)
+    head, _, values = compiled.string.partition(" VALUES ")
+    return f"{head} VALUES {', '.join([values] * n_rows)}"
+
+@lru_cache(maxsize=None)
+def _list_statement(by_status: bool, by_priority: bool, by_cursor: bool, archived: bool = False) -> Select:
+    """
+    SELECT da listagem para uma combinação de filtros, montado uma vez.
+
+    Só Core (colunas da tabela, sem entidade) e valores em bindparams: a
+    mesma instância é reusada em todas as requisições, com a chave do cache
+    de SQL compilado já memorizada nela. Com `archived`, as mesmas colunas
+    de `tasks_archive`.
+    """
+    table = _archive if archived else _tasks
+    query = select(*(table.c[column.key] for column in LIST_COLUMNS)).where(table.c.user_id == bindparam("user_id"))
+    if by_status:
+        query = query.where(table.c.status == bindparam("status"))
+    if by_priority:
+        query = query.where(table.c.priority == bindparam("priority"))
+    query = query.order_by(table.c.created_at.desc(), table.c.id.desc())
+    if by_cursor:
+        # Mesmo predicado de get_by_user_with_filters (ver comentário lá)
+        query = query.where(
+            table.c.created_at <= bindparam("created_at"),
+            or_(table.c.created_at < bindparam("created_at"), table.c.id < bindparam("task_id")),
+        )
+        return query.limit(bindparam("limit"))
+    return query.limit(bindparam("limit")).offset(bindparam("skip"))
+
+def last_task_id(conn: Connection) -> int:
+    """Maior ID de tarefa já usado no banco (ativas, arquivadas, deletadas e, no SQLite, a sequência)."""
+    columns = (_tasks.c.id, _archive.c.id, TaskTombstone.__table__.c.task_id)
+    values = [conn.execute(select(func.max(column))).scalar() or 0 for column in columns]
+    if conn.dialect.name == "sqlite":
+        values.append(conn.execute(text("SELECT seq FROM sqlite_sequence WHERE name = 'tasks'")).scalar() or 0)
+    return max(values)
+
+
+def reserve_task_ids(conn: Connection, user_id: int, last_id: int) -> None:
+    """
+    Faz os próximos IDs gerados em `tasks` ficarem acima de `last_id`, para
+    IDs gravados fora do autoincremento (no arquivo, pelo rebalanceamento de
+    shards). Roda na transação de `conn` (de uma sessão, `db.connection()`).
+    """
+    if conn.dialect.name == "sqlite":
+        # AUTOINCREMENT: a sequência fica em sqlite_sequence (sem chave única)
+        params = {"seq": last_id}
+        if not conn.execute(text("UPDATE sqlite_sequence SET seq = max(seq, :seq) WHERE name = 'tasks'"), params).rowcount:
+            conn.execute(text("INSERT INTO sqlite_sequence (name, seq) VALUES ('tasks', :seq)"), params)
+    elif (conn.execute(select(func.max(_tasks.c.id))).scalar() or 0) < last_id:
+        # Um INSERT com ID explícito avança o AUTO_INCREMENT dentro da
+        # transação (ALTER TABLE ... AUTO_INCREMENT faria commit implícito)
+        conn.execute(_tasks.insert().values(
+            id=last_id, title="", user_id=user_id, priority=TaskPriority.LOW, status=TaskStatus.PENDING, revision=0,
+        ))
+        conn.execute(delete(_tasks).where(_tasks.c.id == last_id))
+
+def allocate_task_ids(db: Session, count: int) -> Optional[int]:
+    """
+    Primeiro de `count` IDs novos (consecutivos) da faixa do banco de `db`,
+    ou None se ele não tem faixa (sem shards: IDs do autoincremento).
+
+    No SQLite, roda na transação da escrita, que já tem o lock do banco: os
+    IDs crescem na ordem dos commits, como no autoincremento. No MySQL, em
+    uma transação própria e curta, para não segurar a linha da sequência
+    até o commit da escrita.
+    """
+    engine = db.get_bind()
+    if engine not in _id_sequences:
+        _id_sequences[engine] = db.execute(select(_sequence.c.id_range)).first() is not None
+    if not _id_sequences[engine]:
+        return None
+    if engine.dialect.name == "sqlite":
+        return _take_task_ids(db.connection(), count)
+    with engine.begin() as conn:
+        return _take_task_ids(conn, count)
+
+
+def _take_task_ids(conn: Connection, count: int) -> int:
+    next_id = conn.execute(select(_sequence.c.next_id).with_for_update()).scalar()
+    conn.execute(update(_sequence).values(next_id=next_id + count))
+    return next_id
+
+
+def clear_id_sequence_cache() -> None:
+    """Esquece quais bancos têm sequência de IDs (depois de assign_id_ranges)."""
+    _id_sequences.clear()
+
 
 class TaskRepository:
     def __init__(self, db: Session):
         self.db = db
 
+    def _session(self, user_id: int) -> Session:
+        """
+        Sessão do shard das tarefas do usuário (ver app/db/sharding.py);
+        sem shards, a própria sessão do repositório.
+        """
+        for_user = getattr(self.db, "for_user", None)
+        return for_user(user_id) if for_user is not None else self.db
+
     def create(self, task_data: dict) -> Task:
         """Cria uma nova tarefa no banco de dados."""
-        db_task = Task(**task_data)
-        self.db.add(db_task)
-        self.db.commit()
-        self.db.refresh(db_task)
+        db = self._session(task_data["user_id"])
+        db_task = self.add(task_data)
+        db.commit()
+        db.refresh(db_task)
+        return db_task
+
+    def add(self, task_data: dict) -> Task:
+        """
+        Insere a tarefa (versão e contadores incluídos) sem commit.
+
+        Depois do flush a instância está completa: id e created_at vêm do
+        banco (INSERT ... RETURNING; sem ele, como no MySQL, um SELECT de
+        created_at) e as datas ainda vazias são explícitas. Quem usa a
+        tarefa depois de fechar a sessão (group commit) não dispara lazy load.
+        """
+        db = self._session(task_data["user_id"])
+        revision = bump_version(db, task_data["user_id"])
+        db_task = Task(updated_at=None, completed_at=None, **task_data, revision=revision)
+        first_id = allocate_task_ids(db, 1)
+        if first_id is not None:
+            db_task.id = first_id
+        db.add(db_task)
+        db.flush()
+        if not db.get_bind().dialect.insert_returning:
+            db.refresh(db_task, ["created_at"])
+        adjust_counter(db, db_task.user_id, db_task.status, db_task.priority, +1)
         return db_task
     
-    def update(self, task_id: int, task_data: dict) -> Task:
-        """atualiza uma task"""
-        self.db.query(Task).filter(Task.id == task_id).update(task_data)
-        self.db.commit()
-        return self.get_by_id(task_id)
+    def update(self, task_id: int, user_id: int, task_data: dict) -> Optional[Task]:
+        """
+        Atualiza uma tarefa do usuário em um único UPDATE com a posse no WHERE.
+
+        Usa UPDATE ... RETURNING quando o banco suporta (SQLite >= 3.35);
+        senão, UPDATE seguido de SELECT. Retorna None se a tarefa não existe
+        ou pertence a outro usuário.
+        """
+        db = self._session(user_id)
+        task = self.apply_update(task_id, user_id, task_data)
+        if task is None:
+            db.rollback()
+            return None
+        db.commit()
+        return task
+
+    def apply_update(self, task_id: int, user_id: int, task_data: dict) -> Optional[Task]:
+        """
+        Executa o update de `update` sem commit nem rollback.
+
+        Com None (tarefa inexistente ou de outro usuário), a versão já
+        incrementada precisa ser desfeita com rollback pelo chamador.
+        """
+        db = self._session(user_id)
+        owned = (Task.id == task_id, Task.user_id == user_id)
+
+        if not task_data:
+            return db.query(Task).filter(*owned).first()
+
+        revision = bump_version(db, user_id)
+        completion = {}
+
+        if "status" in task_data or "priority" in task_data:
+            # Só quando a classificação muda: valores atuais para mover o contador
+            old = db.execute(
+                select(Task.status, Task.priority).where(*owned).with_for_update()
+            ).first()
+            if old is None:
+                return None
+            new_status = task_data.get("status") or old.status
+            new_priority = task_data.get("priority") or old.priority
+            if (new_status, new_priority) != (old.status, old.priority):
+                adjust_counter(db, user_id, old.status, old.priority, -1)
+                adjust_counter(db, user_id, new_status, new_priority, +1)
+            if new_status != old.status:
+                completion["completed_at"] = func.now() if new_status == TaskStatus.DONE else None
+
+        stmt = (
+            update(Task).where(*owned).values(**task_data, **completion, revision=revision)
+            .execution_options(synchronize_session=False)
+        )
+
+        if db.get_bind().dialect.update_returning:
+            task = db.execute(stmt.returning(Task)).scalars().first()
+            if task is not None:
+                # Desanexa antes do commit para não expirar os valores já retornados
+                db.expunge(task)
+        else:
+            task = None
+            if db.execute(stmt).rowcount:
+                task = db.query(Task).filter(*owned).first()
+
+        return task
+
+    def delete(self, task_id: int, user_id: int) -> bool:
+        """
+        Deleta uma tarefa do usuário em um único DELETE com a posse no WHERE.
+
+        Retorna False se a tarefa não existe ou pertence a outro usuário.
+        """
+        db = self._session(user_id)
+        owned = (Task.id == task_id, Task.user_id == user_id)
+        stmt = delete(Task).where(*owned).execution_options(synchronize_session=False)
+        revision = bump_version(db, user_id)
+
+        if db.get_bind().dialect.delete_returning:
+            old = db.execute(stmt.returning(Task.status, Task.priority)).first()
+        else:
+            old = db.execute(
+                select(Task.status, Task.priority).where(*owned).with_for_update()
+            ).first()
+            if old is not None:
+                db.execute(stmt)
+
+        if old is None:
+            db.rollback()
+            return False
+
+        adjust_counter(db, user_id, old.status, old.priority, -1)
+        self._add_tombstones(user_id, [task_id], revision)
+        db.commit()
+        return True
+
+    def _add_tombstones(self, user_id: int, task_ids: List[int], revision: int) -> None:
+        """Registra as exclusões (um ID reaproveitado pelo SQLite substitui o registro anterior)."""
+        db = self._session(user_id)
+        table = TaskTombstone.__table__
+        db.execute(delete(table).where(table.c.user_id == user_id, table.c.task_id.in_(task_ids)))
+        db.execute(table.insert(), [
+            {"user_id": user_id, "task_id": task_id, "revision": revision} for task_id in task_ids
+        ])
+
+    def get_version(self, user_id: int) -> int:
+        """Versão dos dados de tarefas do usuário (muda a cada escrita)."""
+        return get_version(self._session(user_id), user_id)
+
+    def _shards_from(self, user_id: int) -> List[Session]:
+        """
+        Sessão do shard de `user_id` seguida das dos demais shards: IDs de
+        tarefas são únicos entre shards (ver app/db/sharding.py), então uma
+        tarefa de outro usuário pode ser achada em outro shard.
+        """
+        own = self._session(user_id)
+        all_shards = getattr(self.db, "all_shards", None)
+        others = [db for db in all_shards() if db is not own] if all_shards is not None else []
+        return [own] + others
+
+    def _find_owners(self, table: Table, task_ids: List[int], user_id: int) -> Dict[int, int]:
+        """id -> user_id das tarefas de `table` com esses IDs, shard a shard até achar todas."""
+        owners: Dict[int, int] = {}
+        for db in self._shards_from(user_id):
+            missing = [task_id for task_id in task_ids if task_id not in owners]
+            if not missing:
+                break
+            owners.update(db.execute(select(table.c.id, table.c.user_id).where(table.c.id.in_(missing))).all())
+        return owners
+
+    def get_owner_id(self, task_id: int, user_id: int) -> Optional[int]:
+        """
+        Retorna o user_id dono da tarefa (None se não existe), procurando
+        primeiro no shard de `user_id` e depois nos demais.
+        """
+        return self._find_owners(_tasks, [task_id], user_id).get(task_id)
+
+    def bulk_create(self, user_id: int, rows: List[dict]) -> List[Task]:
+        """Cria várias tarefas do mesmo usuário em uma única transação."""
+        db = self._session(user_id)
+        revision = bump_version(db, user_id)
+        tasks = [Task(**row, user_id=user_id, revision=revision) for row in rows]
+        first_id = allocate_task_ids(db, len(tasks))
+        if first_id is not None:
+            for task_id, task in enumerate(tasks, first_id):
+                task.id = task_id
+        db.add_all(tasks)
+        db.flush()
+        adjust_counters(db, user_id, Counter((task.status, task.priority) for task in tasks))
+        # Relidas em um único SELECT: created_at (server_default) só existe no
+        # banco, e em sessões que expiram no commit cada `task.id` faria um SELECT
+        ids = [task.id for task in tasks]
+        db.commit()
+        return self.get_many(ids, user_id)
+
+    def import_rows(self, user_id: int, rows: List[ImportRow]) -> None:
+        """
+        Insere um lote de tarefas do usuário (já validadas) e faz commit.
+
+        INSERTs multi-linha executados direto no driver, sem o processamento
+        de parâmetros linha a linha do SQLAlchemy (que custava mais que o
+        próprio INSERT no SQLite). Cada statement respeita os limites de
+        parâmetros do dialeto. Os Enums são gravados pelo nome, como faz o
+        tipo Enum do SQLAlchemy. No SQLite, o lote é indexado para a busca
+        de uma vez, no fim.
+        """
+        db = self._session(user_id)
+        revision = bump_version(db, user_id)
+        conn = db.connection()
+        dialect = conn.dialect
+        values = [
+            (title, description, priority.name, status.name, user_id, revision)
+            for title, description, priority, status in rows
+        ]
+        # Com shards, IDs da faixa do banco, gravados junto
+        first_id = allocate_task_ids(db, len(values))
+        with_ids = first_id is not None
+        columns = ("id",) + IMPORT_COLUMNS if with_ids else IMPORT_COLUMNS
+        if with_ids:
+            values = [(task_id,) + row for task_id, row in enumerate(values, first_id)]
+
+        with deferred_search_indexing(db, range(first_id, first_id + len(values)) if with_ids else None):
+            if dialect.positional:
+                page = min(dialect.insertmanyvalues_page_size, dialect.insertmanyvalues_max_parameters // len(columns))
+                for start in range(0, len(values), page):
+                    chunk = values[start:start + page]
+                    conn.exec_driver_sql(
+                        _multi_row_insert_sql(dialect, len(chunk), with_ids),
+                        tuple(value for row in chunk for value in row),
+                    )
+            else:
+                db.execute(Task.__table__.insert(), [dict(zip(columns, row)) for row in values])
+
+        # Contagem pelos nomes (hash de str é bem mais barato que o de Enum)
+        names = Counter((status.name, priority.name) for _, _, priority, status in rows)
+        adjust_counters(db, user_id, {
+            (TaskStatus[status], TaskPriority[priority]): count for (status, priority), count in names.items()
+        })
+        db.commit()
+
+    def bulk_update(self, user_id: int, rows: List[dict]) -> List[Task]:
+        """
+        Atualiza várias tarefas do usuário em uma única transação
+        (executemany por chave primária, com o user_id no WHERE) e faz commit.
+
+        Os valores atuais, que movem os contadores, são lidos com a escrita
+        já travada (versão incrementada antes, SELECT ... FOR UPDATE no
+        MySQL). Tarefas apagadas ou de outro usuário ficam de fora: retorna
+        só as atualizadas.
+        """
+        db = self._session(user_id)
+        revision = bump_version(db, user_id)
+        current = {
+            task_id: (status, priority)
+            for task_id, status, priority in db.execute(
+                select(Task.id, Task.status, Task.priority)
+                .where(Task.id.in_([row["id"] for row in rows]), Task.user_id == user_id)
+                .with_for_update()
+            )
+        }
+        rows = [row for row in rows if row["id"] in current]
+        if not rows:
+            db.rollback()
+            return []
+
+        now = datetime.utcnow()
+        deltas = Counter()
+        for row in rows:
+            old_status, old_priority = current[row["id"]]
+            new_key = (row.get("status") or old_status, row.get("priority") or old_priority)
+            if new_key != (old_status, old_priority):
+                deltas[(old_status, old_priority)] -= 1
+                deltas[new_key] += 1
+            if new_key[0] != old_status:
+                row["completed_at"] = now if new_key[0] == TaskStatus.DONE else None
+            row["updated_at"] = now
+            row["revision"] = revision
+
+        db.execute(
+            update(Task).where(Task.user_id == user_id).execution_options(synchronize_session=None), rows
+        )
+        adjust_counters(db, user_id, deltas)
+        db.commit()
+        return self.get_many([row["id"] for row in rows], user_id)
 
-    def delete(self, task_id: int) -> None:
-        """Deleta uma tarefa pelo ID."""
-        task = self.get_by_id(task_id)
-        if task:
-            self.db.delete(task)
-            self.db.commit()
-            return True
-        return False
+    def bulk_delete(self, user_id: int, task_ids: List[int]) -> List[int]:
+        """
+        Deleta várias tarefas do usuário com um único DELETE ... WHERE id IN
+        (...) e faz commit; retorna os IDs realmente apagados.
+
+        Status e prioridade das linhas apagadas vêm do próprio DELETE
+        (RETURNING) ou de um SELECT ... FOR UPDATE na mesma transação.
+        """
+        db = self._session(user_id)
+        owned = (Task.id.in_(task_ids), Task.user_id == user_id)
+        stmt = delete(Task).where(*owned).execution_options(synchronize_session=False)
+        revision = bump_version(db, user_id)
+
+        if db.get_bind().dialect.delete_returning:
+            deleted = db.execute(stmt.returning(Task.id, Task.status, Task.priority)).all()
+        else:
+            deleted = db.execute(select(Task.id, Task.status, Task.priority).where(*owned).with_for_update()).all()
+            if deleted:
+                db.execute(stmt)
+
+        if not deleted:
+            db.rollback()
+            return []
+
+        deltas = Counter()
+        for _, status, priority in deleted:
+            deltas[(status, priority)] -= 1
+        deleted_ids = [task_id for task_id, _, _ in deleted]
+        adjust_counters(db, user_id, deltas)
+        self._add_tombstones(user_id, deleted_ids, revision)
+        db.commit()
+        return deleted_ids
+
+    def get_ownership(self, task_ids: List[int], user_id: int) -> Dict[int, int]:
+        """
+        Retorna id -> user_id das tarefas existentes, em uma consulta no
+        shard de `user_id` (e, só para os IDs que faltarem, nos demais).
+        """
+        return self._find_owners(_tasks, task_ids, user_id)
+
+    def get_many(self, task_ids: List[int], user_id: int) -> List[Task]:
+        """Busca várias tarefas pelo ID (no shard de `user_id`), na ordem recebida."""
+        db = self._session(user_id)
+        tasks = {task.id: task for task in db.query(Task).filter(Task.id.in_(task_ids))}
+        return [tasks[task_id] for task_id in task_ids if task_id in tasks]
 
     def get_by_user_with_filters(
         self, 
         user_id: int,
         skip: int = 0,
         limit: int = 10,
-        status: Optional[str] = None,
-        priority: Optional[str] = None
+        status: Optional[TaskStatus] = None,
+        priority: Optional[TaskPriority] = None,
+        after: Optional[Tuple[datetime, int]] = None
     ) -> List[Task]:
-        """Busca tarefas com filtros"""
-        query = self.db.query(Task).filter(Task.user_id == user_id)
+        """
+        Busca tarefas com filtros.
+
+        Se `after` (created_at, id) for informado, usa paginação por cursor:
+        busca direto a partir da última tarefa vista em vez de usar OFFSET.
+        """
+        db = self._session(user_id)
+        query = db.query(Task).filter(Task.user_id == user_id)
         
         if status:
             query = query.filter(Task.status == status)
         
         if priority:
             query = query.filter(Task.priority == priority)
+
+        query = query.order_by(Task.created_at.desc(), Task.id.desc())
+
+        if after is not None:
+            created_at, task_id = after
+            # `created_at <= :c` é redundante, mas permite ao banco iniciar a
+            # busca no índice direto na posição do cursor
+            query = query.filter(
+                Task.created_at <= created_at,
+                or_(Task.created_at < created_at, Task.id < task_id),
+            )
+            return query.limit(limit).all()
         
-        return query.order_by(Task.created_at.desc()).offset(skip).limit(limit).all()
+        return query.offset(skip).limit(limit).all()
     
+    def list_rows(
+        self,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 10,
+        status: Optional[TaskStatus] = None,
+        priority: Optional[TaskPriority] = None,
+        after: Optional[Tuple[datetime, int]] = None,
+        include_archived: bool = False
+    ) -> Sequence[tuple]:
+        """
+        Mesmo resultado de get_by_user_with_filters, como tuplas de LIST_COLUMNS.
+
+        Caminho de leitura de GET /tasks: sem instâncias de Task nem identity
+        map, com o statement já montado (_list_statement). Roda na conexão da
+        sessão, dentro da mesma transação das outras leituras da requisição.
+
+        Com `include_archived`, busca as primeiras skip + limit linhas de
+        cada tabela (cada uma pelo próprio índice) e as intercala na ordem da
+        listagem: o custo cresce com a página pedida, não com o arquivo.
+        """
+        db = self._session(user_id)
+        params = {"user_id": user_id, "limit": limit}
+        if status:
+            params["status"] = status
+        if priority:
+            params["priority"] = priority
+        if after is not None:
+            params["created_at"], params["task_id"] = after
+        else:
+            params["skip"] = skip
+        conn = db.connection()
+        filters = (bool(status), bool(priority), after is not None)
+        # Arquivadas são todas DONE
+        if not include_archived or status not in (None, TaskStatus.DONE):
+            return conn.execute(_list_statement(*filters), params).all()
+
+        start = 0 if after is not None else skip
+        if after is None:
+            params.update(skip=0, limit=skip + limit)
+        pages = [conn.execute(_list_statement(*filters, archived=archived), params).all() for archived in (False, True)]
+        return list(islice(heapq.merge(*pages, key=_list_order, reverse=True), start, start + limit))
+
+    def search(
+        self,
+        user_id: int,
+        terms: List[str],
+        skip: int = 0,
+        limit: int = 10,
+        status: Optional[TaskStatus] = None,
+        priority: Optional[TaskPriority] = None,
+        backend: Optional[str] = None
+    ) -> Tuple[List[Task], int]:
+        """
+        Busca tarefas que contêm todos os `terms` (título ou descrição), por relevância.
+
+        Usa o índice textual do banco (ver search.py); `backend` força um
+        backend específico. Retorna a página e o total de resultados.
+        """
+        db = self._session(user_id)
+        query = select(Task).where(Task.user_id == user_id)
+        if status:
+            query = query.where(Task.status == status)
+        if priority:
+            query = query.where(Task.priority == priority)
+        backend = backend or search_backend(db)
+
+        matching, _ = apply_search(query.with_only_columns(Task.id), backend, terms, user_id, ranked=False)
+        total = db.execute(select(func.count()).select_from(matching.subquery())).scalar()
+
+        query, ranking = apply_search(query, backend, terms, user_id)
+        tasks = db.execute(query.order_by(*ranking).offset(skip).limit(limit)).scalars().all()
+        return tasks, total
+
     def count_user_tasks(
         self, 
         user_id: int,
-        status: Optional[str] = None,
-        priority: Optional[str] = None
+        status: Optional[TaskStatus] = None,
+        priority: Optional[TaskPriority] = None
     ) -> int:
-        """Conta tarefas para paginação"""
-        query = self.db.query(Task).filter(Task.user_id == user_id)
+        """Conta tarefas com COUNT(*) (valor exato; a paginação usa count_from_counters)"""
+        db = self._session(user_id)
+        query = db.query(Task).filter(Task.user_id == user_id)
         
         if status:
             query = query.filter(Task.status == status)
@@ -65,6 +604,227 @@ class TaskRepository:
         
         return query.count()
     
-    def get_by_id(self, task_id: int) -> Optional[Task]:
-        """Obtém uma tarefa específica pelo ID."""
-        return self.db.query(Task).filter(Task.id == task_id).first()
\ No newline at end of file
+    def count_archived(
+        self,
+        user_id: int,
+        status: Optional[TaskStatus] = None,
+        priority: Optional[TaskPriority] = None
+    ) -> int:
+        """
+        Conta as tarefas arquivadas do usuário com COUNT(*) sobre um índice
+        de `tasks_archive` (só com include_archived; fora dos contadores).
+        """
+        if status not in (None, TaskStatus.DONE):
+            return 0
+        db = self._session(user_id)
+        query = select(func.count()).select_from(_archive).where(_archive.c.user_id == user_id)
+        if priority:
+            query = query.where(_archive.c.priority == priority)
+        return db.execute(query).scalar()
+
+    def count_from_counters(
+        self,
+        user_id: int,
+        status: Optional[TaskStatus] = None,
+        priority: Optional[TaskPriority] = None
+    ) -> int:
+        """Conta tarefas a partir da tabela de contadores, sem varrer `tasks`."""
+        return sum_counters(self._session(user_id), user_id, status=status, priority=priority)
+
+    def count_matrix(self, user_id: int) -> Dict[Tuple[TaskStatus, TaskPriority], int]:
+        """Total por (status, prioridade), lido dos contadores (no máximo 9 linhas)."""
+        return counter_matrix(self._session(user_id), user_id)
+
+    def daily_stats(self, user_id: int, since: datetime) -> List[DailyStats]:
+        """
+        Tarefas criadas e concluídas por dia (UTC) a partir de `since`, só
+        dias com alguma das duas, em ordem.
+
+        Um GROUP BY por coluna, cada um sobre uma faixa dos índices
+        (user_id, created_at) e (user_id, completed_at): o custo depende das
+        tarefas da janela, não do total. Juntar as duas faixas em um UNION
+        ALL com um único GROUP BY custava quase o dobro no SQLite.
+        """
+        db = self._session(user_id)
+        days: Dict[date, List[int]] = {}
+        for position, column in enumerate((Task.created_at, Task.completed_at)):
+            day = func.date(column)
+            rows = db.execute(
+                select(day, func.count()).where(Task.user_id == user_id, column >= since).group_by(day)
+            )
+            for value, count in rows:
+                # SQLite devolve date() como texto
+                value = value if isinstance(value, date) else date.fromisoformat(value)
+                days.setdefault(value, [0, 0])[position] = count
+        return [(day, created, completed) for day, (created, completed) in sorted(days.items())]
+
+    def get_changes(
+        self, user_id: int, since: int, limit: int, after: Optional[ChangesPosition] = None
+    ) -> Tuple[List[tuple], List[int], int, Optional[ChangesPosition]]:
+        """
+        Até `limit` alterações com revisão > `since` (ou depois da posição
+        `after`, o cursor da página anterior), em ordem de (revisão, exclusões
+        antes de tarefas, ID).
+
+        Retorna (linhas de CHANGE_COLUMNS, IDs deletados, revisão até a qual
+        a resposta está completa, posição da última alteração entregue se há
+        mais). `limit` vale também dentro de uma revisão: uma revisão maior
+        que ele (migração 4, um lote do import, um rebalanceamento) é
+        entregue em várias páginas. Todas as consultas usam os índices
+        (user_id, revision), então o custo depende do número de alterações,
+        não do total de tarefas.
+        """
+        db = self._session(user_id)
+        version = get_version(db, user_id)
+        tombstones = TaskTombstone.__table__
+
+        task_filter = [Task.user_id == user_id, Task.revision > since]
+        deleted_filter = [tombstones.c.user_id == user_id, tombstones.c.revision > since]
+        if after is not None:
+            revision, kind, task_id = after
+            # Só o que vem depois do cursor; na revisão dele, as exclusões
+            # (tipo 0) vêm antes das tarefas (tipo 1)
+            task_filter = [
+                Task.user_id == user_id, Task.revision >= revision,
+                or_(Task.revision > revision, Task.id > (task_id if kind else 0)),
+            ]
+            deleted_filter = [
+                tombstones.c.user_id == user_id, tombstones.c.revision >= revision + kind,
+                or_(tombstones.c.revision > revision, tombstones.c.task_id > task_id),
+            ]
+
+        rows = db.execute(
+            select(*CHANGE_COLUMNS).where(*task_filter).order_by(Task.revision, Task.id).limit(limit + 1)
+        ).all()
+        deleted = db.execute(
+            select(tombstones.c.revision, tombstones.c.task_id).where(*deleted_filter)
+            .order_by(tombstones.c.revision, tombstones.c.task_id).limit(limit + 1)
+        ).all()
+        changes = list(islice(heapq.merge(
+            ((revision, 0, task_id) for revision, task_id in deleted),
+            ((row[CHANGE_REVISION], 1, row[CHANGE_ID]) for row in rows),
+        ), limit + 1))
+
+        if len(changes) <= limit:
+            return rows, [task_id for _, task_id in deleted], version, None
+        # Revisões anteriores à da próxima alteração estão completas
+        changes, following = changes[:limit], changes[limit]
+        last = changes[-1]
+        page_rows = [row for row in rows if (row[CHANGE_REVISION], 1, row[CHANGE_ID]) <= last]
+        page_deleted = [task_id for revision, task_id in deleted if (revision, 0, task_id) <= last]
+        return page_rows, page_deleted, following[0] - 1, last
+
+    def stream_user_tasks(
+        self,
+        user_id: int,
+        status: Optional[TaskStatus] = None,
+        priority: Optional[TaskPriority] = None,
+        batch_size: int = 1000,
+        include_archived: bool = False
+    ) -> Iterator[Sequence[tuple]]:
+        """
+        Percorre todas as tarefas filtradas em lotes de `batch_size` linhas.
+
+        Usa cursor do lado do servidor (stream_results) e tuplas em vez de
+        objetos ORM, então a memória não cresce com o total de tarefas.
+        Com `include_archived`, as arquivadas vêm depois das ativas.
+        """
+        db = self._session(user_id)
+        for statement in export_statements(user_id, status, priority, include_archived):
+            result = db.execute(
+                statement,
+                execution_options={"stream_results": True, "yield_per": batch_size},
+            )
+            yield from result.partitions()
+
+    def archive_done(self, completed_before: datetime, limit: int) -> int:
+        """
+        Move até `limit` tarefas concluídas antes de `completed_before` para
+        `tasks_archive` em uma transação curta (com commit); retorna quantas.
+
+        As candidatas saem do índice (status, completed_at), mais antigas
+        primeiro; ficam de fora as alteradas (ou restauradas) depois de
+        `completed_before`. O ID vai junto: IDs de `tasks` nunca são reusados
+        (AUTOINCREMENT no SQLite, ver migração 10), então não colidem com os
+        do arquivo. Contadores e versão dos usuários afetados mudam na mesma
+        transação; sem tombstones: a tarefa continua existindo. Com shards,
+        roda no banco da sessão do repositório (um shard por vez, ver
+        archive.py).
+        """
+        if self.db.get_bind().dialect.name == "sqlite":
+            # Trava de escrita desde a escolha das candidatas: nenhuma muda de
+            # status entre o SELECT e o DELETE (ver group_commit.py)
+            self.db.connection().exec_driver_sql("BEGIN IMMEDIATE")
+
+        rows = self.db.execute(
+            select(_tasks.c.id, _tasks.c.user_id, _tasks.c.priority)
+            .where(
+                _tasks.c.status == TaskStatus.DONE,
+                _tasks.c.completed_at < completed_before,
+                or_(_tasks.c.updated_at.is_(None), _tasks.c.updated_at < completed_before),
+            )
+            .order_by(_tasks.c.completed_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        ).all()
+        if not rows:
+            self.db.rollback()
+            return 0
+
+        deltas: Dict[int, Counter] = {}
+        for _, user_id, priority in rows:
+            deltas.setdefault(user_id, Counter())[(TaskStatus.DONE, priority)] -= 1
+        # Em ordem de usuário: as versões travadas sempre na mesma ordem
+        for user_id in sorted(deltas):
+            bump_version(self.db, user_id)
+
+        task_ids = [task_id for task_id, _, _ in rows]
+        self.db.execute(_archive.insert().from_select(
+            ARCHIVE_COPY_COLUMNS,
+            select(*(_tasks.c[key] for key in ARCHIVE_COPY_COLUMNS)).where(_tasks.c.id.in_(task_ids)),
+        ))
+        self.db.execute(delete(_tasks).where(_tasks.c.id.in_(task_ids)))
+        for user_id, user_deltas in deltas.items():
+            adjust_counters(self.db, user_id, user_deltas)
+        self.db.commit()
+        return len(task_ids)
+
+    def restore(self, task_id: int, user_id: int) -> Optional[Task]:
+        """
+        Devolve uma tarefa arquivada do usuário para `tasks` com uma nova
+        revisão (aparece em GET /tasks/changes) e faz commit.
+
+        A restauração conta como alteração (updated_at): a tarefa só volta ao
+        arquivo depois de outro período inteiro sem mudanças. Mantém o ID
+        original (nenhuma tarefa criada depois do arquivamento recebe o mesmo
+        ID, ver archive_done). Retorna None se a tarefa não está arquivada ou
+        pertence a outro usuário.
+        """
+        db = self._session(user_id)
+        owned = (_archive.c.id == task_id, _archive.c.user_id == user_id)
+        revision = bump_version(db, user_id)
+        row = db.execute(
+            select(*(_archive.c[key] for key in ARCHIVE_COPY_COLUMNS)).where(*owned).with_for_update()
+        ).first()
+        if row is None:
+            db.rollback()
+            return None
+
+        db.execute(delete(_archive).where(*owned))
+        task = Task(**{**row._mapping, "revision": revision, "updated_at": datetime.utcnow()})
+        db.add(task)
+        db.flush()
+        adjust_counter(db, user_id, task.status, task.priority, +1)
+        db.commit()
+        return task
+
+    def get_archived_owner_id(self, task_id: int, user_id: int) -> Optional[int]:
+        """
+        Retorna o user_id dono da tarefa arquivada (None se não está no
+        arquivo), procurando primeiro no shard de `user_id`.
+        """
+        return self._find_owners(_archive, [task_id], user_id).get(task_id)
+
+    def get_by_id(self, task_id: int, user_id: int) -> Optional[Task]:
+        """Obtém uma tarefa específica pelo ID (no shard de `user_id`)."""
+        return self._session(user_id).query(Task).filter(Task.id == task_id).first()
\ No newline at end of file
@@ -1,6 +1,7 @@
-from pydantic import BaseModel
-from datetime import datetime
-from typing import Optional, List
+from pydantic import BaseModel, Field
+from datetime import date, datetime
+from typing import Dict, Optional, List
+from app.core.config import settings
 from .model import TaskPriority, TaskStatus
 
 class TaskBase(BaseModel):
@@ -32,6 +33,62 @@ class PaginatedTaskResponse(BaseModel):
     page: int
     pages: int
     size: int
+    next_cursor: Optional[str] = None
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class TaskBulkCreate(BaseModel):
+    items: List[TaskCreate] = Field(..., min_length=1, max_length=settings.TASK_BULK_MAX_ITEMS)
+
+class TaskBulkUpdateItem(TaskUpdate):
+    id: int
+
+class TaskBulkUpdate(BaseModel):
+    items: List[TaskBulkUpdateItem] = Field(..., min_length=1, max_length=settings.TASK_BULK_MAX_ITEMS)
+
+class TaskBulkDelete(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=settings.TASK_BULK_MAX_ITEMS)
+
+class TaskBulkResult(BaseModel):
+    id: Optional[int] = None
+    status_code: int
+    detail: Optional[str] = None
+    task: Optional[TaskResponse] = None
+
+class TaskBulkResponse(BaseModel):
+    results: List[TaskBulkResult]
+
+class TaskChange(TaskResponse):
+    updated_at: Optional[datetime] = None
+    revision: int
+
+class TaskChangesResponse(BaseModel):
+    items: List[TaskChange]
+    deleted: List[int]
+    revision: int  # Envie como `since` na próxima sincronização
+    has_more: bool
+    cursor: Optional[str] = None  # Com has_more, envie em `cursor` na próxima chamada
+
+class TaskStatsDay(BaseModel):
+    date: date
+    created: int
+    completed: int
+
+class TaskStatsResponse(BaseModel):
+    total: int
+    by_status: Dict[TaskStatus, int]
+    by_priority: Dict[TaskPriority, int]
+    matrix: Dict[TaskStatus, Dict[TaskPriority, int]]  # status -> prioridade -> total
+    days: List[TaskStatsDay]  # Um item por dia da janela, do mais antigo ao mais recente
+
+class TaskImportError(BaseModel):
+    line: int
+    detail: str
+
+class TaskImportResponse(BaseModel):
+    imported: int
+    failed: int
+    batches: int
+    errors: List[TaskImportError]
+    errors_truncated: bool = False
@@ -0,0 +1,202 @@
+"""
+Busca textual em título e descrição das tarefas.
+
+- SQLite: tabela FTS5 `tasks_fts` (conteúdo externo: `tasks`), mantida por
+  triggers em toda escrita (o import indexa cada lote de uma vez, ver
+  deferred_search_indexing). O user_id também é indexado: o MATCH cruza os
+  termos com as tarefas do usuário dentro do próprio índice;
+- MySQL: índice FULLTEXT em (title, description);
+- outros bancos, ou índice ausente: LIKE em título e descrição (varredura).
+
+O índice é criado pela migração 5 (create_search_index); a migração 9
+recria o do SQLite com a coluna user_id (upgrade_search_index).
+"""
+import re
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+from sqlalchemy import Select, and_, column, func, inspect, literal_column, or_, select, table, text
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from app.modules.tasks.model import Task
+
+FTS5 = "fts5"
+FULLTEXT = "fulltext"
+LIKE = "like"
+
+MAX_SEARCH_TERMS = 16
+
+MYSQL_FULLTEXT_INDEX = "ix_tasks_fulltext"
+
+_SQLITE_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+        title, description, user_id, content='tasks', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    # Linha presente = trigger de INSERT pausado na transação corrente
+    "CREATE TABLE IF NOT EXISTS tasks_fts_paused (paused INTEGER NOT NULL)",
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks
+    WHEN NOT EXISTS (SELECT 1 FROM tasks_fts_paused) BEGIN
+        INSERT INTO tasks_fts (rowid, title, description, user_id)
+        VALUES (new.id, new.title, new.description, new.user_id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+        INSERT INTO tasks_fts (tasks_fts, rowid, title, description, user_id)
+        VALUES ('delete', old.id, old.title, old.description, old.user_id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF title, description, user_id ON tasks BEGIN
+        INSERT INTO tasks_fts (tasks_fts, rowid, title, description, user_id)
+        VALUES ('delete', old.id, old.title, old.description, old.user_id);
+        INSERT INTO tasks_fts (rowid, title, description, user_id)
+        VALUES (new.id, new.title, new.description, new.user_id);
+    END
+    """,
+    # Indexa as tarefas que já existem
+    "INSERT INTO tasks_fts (tasks_fts) VALUES ('rebuild')",
+]
+
+_SQLITE_TRIGGERS = ("tasks_fts_insert", "tasks_fts_delete", "tasks_fts_update")
+
+_fts = table("tasks_fts", column("rowid"))
+_fts_table = literal_column("tasks_fts")
+
+# Peso do título no ranking (bm25), relativo à descrição
+_TITLE_WEIGHT = 10.0
+
+_TOKEN = re.compile(r"\w+")
+
+# Backend detectado por URL do banco
+_backends: Dict[str, str] = {}
+
+
+def create_search_index(conn: Connection) -> None:
+    dialect = conn.dialect.name
+    if dialect == "sqlite":
+        for statement in _SQLITE_DDL:
+            conn.exec_driver_sql(statement)
+    elif dialect == "mysql":
+        indexes = {index["name"] for index in inspect(conn).get_indexes("tasks")}
+        if MYSQL_FULLTEXT_INDEX not in indexes:
+            conn.execute(text(f"CREATE FULLTEXT INDEX {MYSQL_FULLTEXT_INDEX} ON tasks (title, description)"))
+
+
+def upgrade_search_index(conn: Connection) -> None:
+    """
+    Recria o índice FTS5 sem a coluna user_id (criado pela migração 5
+    original) com ela, reindexando as tarefas existentes.
+    """
+    if conn.dialect.name != "sqlite":
+        return
+    columns = [row[1] for row in conn.exec_driver_sql("PRAGMA table_info(tasks_fts)")]
+    if not columns or "user_id" in columns:
+        return
+    for trigger in _SQLITE_TRIGGERS:
+        conn.exec_driver_sql(f"DROP TRIGGER IF EXISTS {trigger}")
+    conn.exec_driver_sql("DROP TABLE tasks_fts")
+    create_search_index(conn)
+
+
+def _detect_backend(conn: Connection) -> str:
+    dialect = conn.dialect.name
+    if dialect == "sqlite":
+        exists = conn.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tasks_fts'"
+        ).first()
+        return FTS5 if exists else LIKE
+    if dialect == "mysql":
+        indexes = {index["name"] for index in inspect(conn).get_indexes("tasks")}
+        return FULLTEXT if MYSQL_FULLTEXT_INDEX in indexes else LIKE
+    return LIKE
+
+
+def search_backend(db: Session) -> str:
+    """Backend de busca disponível no banco da sessão (verificado uma vez por banco)."""
+    url = str(db.get_bind().url)
+    if url not in _backends:
+        _backends[url] = _detect_backend(db.connection())
+    return _backends[url]
+
+
+@contextmanager
+def deferred_search_indexing(db: Session, ids: Optional[range] = None) -> Iterator[None]:
+    """
+    Pausa o trigger de INSERT do FTS5 e indexa as tarefas inseridas no bloco
+    com um único INSERT ... SELECT (várias vezes mais rápido que o trigger
+    linha a linha).
+
+    Tudo acontece na transação corrente: se ela for desfeita, a pausa também
+    é. As tarefas inseridas são as de `ids` (IDs explícitos, da faixa do
+    shard) ou, sem eles, as de ID maior que o maior ID atual (rowid do
+    SQLite); a escrita já iniciada na transação impede outras inserções no
+    meio.
+    """
+    if search_backend(db) != FTS5:
+        yield
+        return
+
+    conn = db.connection()
+    if ids is None:
+        first_id = conn.exec_driver_sql("SELECT coalesce(max(id), 0) FROM tasks").scalar() + 1
+        ids = range(first_id, 1 << 63)
+    conn.exec_driver_sql("INSERT INTO tasks_fts_paused (paused) VALUES (1)")
+    yield
+    conn.exec_driver_sql("DELETE FROM tasks_fts_paused")
+    conn.exec_driver_sql(
+        "INSERT INTO tasks_fts (rowid, title, description, user_id) "
+        "SELECT id, title, description, user_id FROM tasks WHERE id BETWEEN ? AND ?",
+        (ids.start, ids.stop - 1),
+    )
+
+
+def search_terms(q: str) -> List[str]:
+    """Palavras da consulta; a sintaxe própria de cada backend (aspas, operadores) é descartada."""
+    return _TOKEN.findall(q.lower())[:MAX_SEARCH_TERMS]
+
+
+def search_matches(terms: List[str], user_id: int, ranked: bool = True) -> Select:
+    """
+    SELECT no FTS5 das tarefas do usuário com todos os termos: (rowid) ou
+    (rowid, score). O user_id entra no MATCH, então um termo comum às
+    tarefas de muitos usuários só percorre, no índice, as deste.
+    """
+    phrase = " ".join(f'"{term}"' for term in terms) + "*"
+    expression = f'user_id : "{int(user_id)}" AND {{title description}} : ({phrase})'
+    columns = [_fts.c.rowid]
+    if ranked:
+        # bm25: menor é mais relevante; a coluna user_id não pesa
+        columns.append(func.bm25(_fts_table, _TITLE_WEIGHT, 1.0, 0.0).label("score"))
+    return select(*columns).where(_fts_table.op("MATCH")(expression))
+
+
+def apply_search(query: Select, backend: str, terms: List[str], user_id: int, ranked: bool = True) -> Tuple[Select, list]:
+    """
+    Restringe `query` (SELECT sobre as tarefas de `user_id` em `tasks`) às
+    tarefas com todos os termos; o último termo também casa como prefixo.
+    Retorna a consulta e a ordenação por relevância (`ranked=False`: sem
+    calcular relevância, para contagens).
+    """
+    if backend == FTS5:
+        # MATERIALIZED: sem ele, o SQLite percorre as tarefas do usuário pelo
+        # índice de user_id e reavalia o MATCH a cada linha
+        matches = search_matches(terms, user_id, ranked).cte("search_matches").prefix_with("MATERIALIZED")
+        query = query.join(matches, matches.c.rowid == Task.id)
+        return query, [matches.c.score, Task.id.desc()] if ranked else []
+
+    if backend == FULLTEXT:
+        expression = " ".join(f"+{term}" for term in terms) + "*"
+        relevance = match(Task.title, Task.description, against=expression).in_boolean_mode()
+        return query.where(relevance), [relevance.desc(), Task.id.desc()]
+
+    # LIKE '%termo%': casa também como prefixo, sem ranking
+    query = query.where(and_(*(
+        or_(Task.title.icontains(term, autoescape=True), Task.description.icontains(term, autoescape=True))
+        for term in terms
+    )))
+    return query, [Task.created_at.desc(), Task.id.desc()]
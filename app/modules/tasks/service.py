@@ -1,69 +1,273 @@
+import asyncio
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
-from typing import Optional, Dict
-from app.modules.tasks.repository import TaskRepository
-from app.modules.tasks.schema import TaskCreate, TaskUpdate, TaskResponse, PaginatedTaskResponse
+from starlette.concurrency import run_in_threadpool
+from typing import AsyncIterator, Callable, Optional, Dict, Iterator, List, Tuple, TypeVar, Union
+from datetime import date, datetime, timedelta, timezone
+from operator import attrgetter, itemgetter
+from app.core.config import settings
+from app.core.responses import dumps
+from app.modules.tasks.repository import CHANGE_COLUMNS, LIST_COLUMNS, LIST_CREATED_AT, LIST_ID, TaskRepository
+from app.modules.tasks.cursor import ChangesPosition, encode_changes_cursor, encode_cursor
+from app.modules.tasks.group_commit import GroupCommitOverloadedError, Operation, rollback_if_none, task_writer_for
+from app.modules.tasks.export import EXPORT_BATCH_SIZE, csv_header, encode_batch, export_statements
+from app.modules.tasks.importer import ImportLine, InvalidImportError, LineReader, make_parser
+from app.modules.tasks.model import Task, TaskStatus, TaskPriority
+from app.modules.tasks.page_cache import etag_matches, page_cache, page_etag, page_key, stats_cache, stats_key
+from app.modules.tasks.search import search_terms
+from app.modules.tasks.schema import (
+    TaskCreate, TaskUpdate, TaskResponse,
+    TaskBulkUpdateItem, TaskBulkResult, TaskBulkResponse, TaskImportError, TaskImportResponse
+)
 from app.modules.user.model import User
 
+T = TypeVar("T")
+
+# Campos de TaskResponse, lidos de uma vez de cada Task na listagem
+TASK_RESPONSE_FIELDS = tuple(TaskResponse.model_fields)
+_loaded_values = itemgetter(*TASK_RESPONSE_FIELDS)
+_task_response_values = attrgetter(*TASK_RESPONSE_FIELDS)
+
+
+CHANGE_FIELDS = tuple(column.key for column in CHANGE_COLUMNS)
+LIST_FIELDS = tuple(column.key for column in LIST_COLUMNS)
+
+
+def task_response_dict(task: Task) -> dict:
+    """TaskResponse como dict simples (Enum/datetime ficam para o ORJSONResponse)."""
+    try:
+        # Valores já carregados ficam no __dict__ da instância; ler dali evita
+        # o descriptor do ORM em cada campo
+        values = _loaded_values(task.__dict__)
+    except KeyError:
+        # Algum atributo expirado/não carregado: acesso normal (faz o refresh)
+        values = _task_response_values(task)
+    return dict(zip(TASK_RESPONSE_FIELDS, values))
+
+
+def paginated_dict(
+    tasks: List[Task], total: int, skip: int, limit: int, next_cursor: Optional[str] = None
+) -> dict:
+    """Página no formato de PaginatedTaskResponse, como dict simples."""
+    return page_dict([task_response_dict(task) for task in tasks], total, skip, limit, next_cursor)
+
+
+def page_dict(
+    items: List[dict], total: int, skip: int, limit: int, next_cursor: Optional[str] = None
+) -> dict:
+    """Página com os itens já em dicts de TaskResponse."""
+    return {
+        "items": items,
+        "total": total,
+        "page": (skip // limit) + 1,
+        "pages": (total + limit - 1) // limit if total > 0 else 1,
+        "size": limit,
+        "next_cursor": next_cursor
+    }
+
+def new_task_dict(task_data: TaskCreate, current_user: User) -> dict:
+    """Valores de uma tarefa nova do usuário (para TaskRepository.create/add)."""
+    if not current_user:
+        raise HTTPException(status_code=403, detail="Not authenticated to create tasks")
+
+    return {
+        "title": task_data.title,
+        "description": task_data.description,
+        "priority": task_data.priority,
+        "user_id": current_user.id,
+        "status": TaskStatus.PENDING  # Default status for new tasks
+    }
+
+def _bulk_not_found(task_id: int) -> TaskBulkResult:
+    return TaskBulkResult(id=task_id, status_code=404, detail="Task not found")
+
 class TaskService:
     def __init__(self, db: Session):
         self.repo = TaskRepository(db)
 
     def create_task(self, task_data: TaskCreate, current_user: User) -> TaskResponse:
         """Cria uma nova tarefa."""
-        
-        if not current_user:
-            raise HTTPException(status_code=403, detail="Not authenticated to create tasks")
-
-        task_dict = {
-            "title": task_data.title,
-            "description": task_data.description,
-            "priority": task_data.priority,
-            "user_id": current_user.id,
-            "status": "pending"  # Default status for new tasks
-        }
-
-        return self.repo.create(task_dict)
+        return self.repo.create(new_task_dict(task_data, current_user))
     
     def get_user_tasks(
         self, 
         current_user: User, 
         skip: int = 0, 
         limit: int = 10,
-        status: Optional[str] = None,
-        priority: Optional[str] = None
-    ) -> PaginatedTaskResponse:
-        """Obtém tarefas do usuário com paginação."""
+        status: Optional[TaskStatus] = None,
+        priority: Optional[TaskPriority] = None,
+        after: Optional[Tuple[datetime, int]] = None,
+        include_archived: bool = False
+    ) -> dict:
+        """
+        Obtém tarefas do usuário com paginação (offset ou cursor).
+
+        Retorna a página no formato de PaginatedTaskResponse como dict simples:
+        as colunas já vêm tipadas do banco, então não há nova validação. As
+        linhas vêm como tuplas (TaskRepository.list_rows), sem instâncias de Task.
+        Com `include_archived`, a página e o total incluem as tarefas arquivadas.
+        """
         
-        # ✅ Buscar tarefas
-        tasks = self.repo.get_by_user_with_filters(
+        # ✅ Buscar tarefas (um item extra indica se existe próxima página)
+        rows = self.repo.list_rows(
             user_id=current_user.id,
             skip=skip,
-            limit=limit,
+            limit=limit + 1,
             status=status,
             priority=priority,
+            after=after,
+            include_archived=include_archived,
         )
+        has_next = len(rows) > limit
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1][LIST_CREATED_AT], rows[-1][LIST_ID]) if has_next else None
         
-        # ✅ Contar total
-        total = self.repo.count_user_tasks(
+        # ✅ Contar total (contadores mantidos a cada escrita, sem COUNT(*))
+        total = self.repo.count_from_counters(
             user_id=current_user.id,
             status=status,
             priority=priority,
         )
+        if include_archived:
+            total += self.repo.count_archived(current_user.id, status=status, priority=priority)
         
-        # ✅ Calcular paginação
-        page = (skip // limit) + 1
-        pages = (total + limit - 1) // limit if total > 0 else 1
-        
-        # ✅ CORRETO - Retorna objeto PaginatedTaskResponse
-        return PaginatedTaskResponse(
-            items=tasks,
-            total=total,
-            page=page,
-            pages=pages,
-            size=limit
+        # ✅ Página no formato de PaginatedTaskResponse
+        return page_dict([dict(zip(LIST_FIELDS, row)) for row in rows], total, skip, limit, next_cursor)
+
+    def search_tasks(
+        self,
+        current_user: User,
+        q: str,
+        skip: int = 0,
+        limit: int = 10,
+        status: Optional[TaskStatus] = None,
+        priority: Optional[TaskPriority] = None
+    ) -> dict:
+        """Busca textual nas tarefas do usuário, por relevância, no formato de PaginatedTaskResponse."""
+        terms = search_terms(q)
+        if not terms:
+            raise HTTPException(status_code=400, detail="Search query must contain letters or digits")
+
+        tasks, total = self.repo.search(
+            current_user.id, terms, skip=skip, limit=limit, status=status, priority=priority
         )
+        return paginated_dict(tasks, total, skip, limit)
     
+    def get_user_tasks_page(
+        self,
+        current_user: User,
+        if_none_match: Optional[str] = None,
+        **kwargs
+    ) -> Tuple[str, Optional[bytes]]:
+        """
+        Página de tarefas já serializada, com o ETag correspondente.
+
+        O ETag vem da versão dos dados do usuário e dos parâmetros da página.
+        Retorna (etag, None) quando `if_none_match` já tem esse ETag: o
+        cliente está atualizado e a tabela `tasks` nem é consultada.
+        A versão e a página são lidas na mesma transação.
+        """
+        key = page_key(current_user.id, self.repo.get_version(current_user.id), **kwargs)
+        etag = page_etag(key)
+        if etag_matches(if_none_match, etag):
+            return etag, None
+
+        use_cache = settings.TASK_PAGE_CACHE_ENABLED
+        body = page_cache.get(key) if use_cache else None
+        if body is None:
+            body = dumps(self.get_user_tasks(current_user, **kwargs))
+            if use_cache:
+                page_cache.set(key, body)
+        return etag, body
+
+    def get_stats(self, current_user: User, days: int, today: Optional[date] = None) -> dict:
+        """
+        Totais por status × prioridade e tarefas criadas/concluídas por dia
+        nos últimos `days` dias (UTC), no formato de TaskStatsResponse.
+
+        Todas as combinações e todos os dias da janela aparecem, com 0 quando
+        vazios.
+        """
+        matrix = self.repo.count_matrix(current_user.id)
+        today = today or datetime.now(timezone.utc).date()
+        first_day = today - timedelta(days=days - 1)
+        daily = {
+            day: {"date": day, "created": created, "completed": completed}
+            for day, created, completed in self.repo.daily_stats(
+                current_user.id, datetime.combine(first_day, datetime.min.time())
+            )
+        }
+        window = [first_day + timedelta(days=offset) for offset in range(days)]
+
+        return {
+            "total": sum(matrix.values()),
+            "by_status": {
+                status.value: sum(matrix.get((status, priority), 0) for priority in TaskPriority)
+                for status in TaskStatus
+            },
+            "by_priority": {
+                priority.value: sum(matrix.get((status, priority), 0) for status in TaskStatus)
+                for priority in TaskPriority
+            },
+            "matrix": {
+                status.value: {priority.value: matrix.get((status, priority), 0) for priority in TaskPriority}
+                for status in TaskStatus
+            },
+            "days": [daily.get(day) or {"date": day, "created": 0, "completed": 0} for day in window],
+        }
+
+    def get_stats_body(
+        self, current_user: User, days: int, if_none_match: Optional[str] = None
+    ) -> Tuple[str, Optional[bytes]]:
+        """
+        get_stats já serializado, com ETag, como em get_user_tasks_page.
+
+        A resposta fica em cache até a próxima escrita do usuário (a chave
+        inclui a versão dos dados) ou a virada do dia.
+        """
+        today = datetime.now(timezone.utc).date()
+        key = stats_key(current_user.id, self.repo.get_version(current_user.id), days, today)
+        etag = page_etag(key)
+        if etag_matches(if_none_match, etag):
+            return etag, None
+
+        body = stats_cache.get(key)
+        if body is None:
+            body = dumps(self.get_stats(current_user, days, today))
+            stats_cache.set(key, body)
+        return etag, body
+
+    def get_changes(
+        self, current_user: User, since: int, limit: int, after: Optional[ChangesPosition] = None
+    ) -> dict:
+        """
+        Alterações nas tarefas do usuário desde a revisão `since` (ou depois
+        do cursor `after`), no formato de TaskChangesResponse (dict simples,
+        como em get_user_tasks).
+        """
+        rows, deleted, revision, last = self.repo.get_changes(current_user.id, since, limit, after)
+        if last is None and (after[0] if after else since) > revision:
+            # Revisão que este servidor nunca emitiu (ex.: banco restaurado)
+            raise HTTPException(status_code=409, detail="Unknown revision, sync again from since=0")
+
+        return {
+            "items": [dict(zip(CHANGE_FIELDS, row)) for row in rows],
+            "deleted": deleted,
+            "revision": revision,
+            "has_more": last is not None,
+            "cursor": encode_changes_cursor(last) if last is not None else None,
+        }
+
+    def _raise_not_found_or_forbidden(self, task_id: int, user_id: int, action: str):
+        """
+        Chamado só quando a escrita não afetou nenhuma linha: diferencia 404
+        de 403 (com shards, só entre tarefas do mesmo shard do usuário).
+        """
+        if self.repo.get_owner_id(task_id, user_id) is None:
+            raise HTTPException(status_code=404, detail="Task not found")
+        raise HTTPException(status_code=403, detail=f"Not authorized to {action} this task")
+
     def update_task(
         self,
         task_id: int,
@@ -75,40 +279,321 @@ class TaskService:
         if not current_user:
             raise HTTPException(status_code=403, detail="Not authenticated to update tasks")
         
-        task = self.repo.get_by_id(task_id)
+        # Posse verificada no próprio UPDATE (id e user_id no WHERE)
+        task = self.repo.update(task_id, current_user.id, task_data.dict(exclude_unset=True))
 
-        if not task:
-            raise HTTPException(status_code=404, detail="Task not found")
-        
-        if task.user_id != current_user.id:
-            raise HTTPException(status_code=403, detail="Not authorized to update this task")
-        
-        # Atualiza os campos da tarefa
-        task_data_dict = task_data.dict(exclude_unset=True)
-        for key, value in task_data_dict.items():
-            setattr(task, key, value)
+        if task is None:
+            self._raise_not_found_or_forbidden(task_id, current_user.id, "update")
 
-        return self.repo.update(task_id, task_data_dict)
+        return task
 
     def delete_task(
         self,
         task_id: int,
         current_user: User
-    ):
+    ) -> bool:
         """Deleta uma task existente"""
         
         if not current_user:
             raise HTTPException(status_code=403, detail="Not authenticated to delete tasks")
         
-        task = self.repo.get_by_id(task_id)
+        # Posse verificada no próprio DELETE (id e user_id no WHERE)
+        if not self.repo.delete(task_id, current_user.id):
+            self._raise_not_found_or_forbidden(task_id, current_user.id, "delete")
 
-        if not task:
-            raise HTTPException(status_code=404, detail="Task not found")
-        
-        if task.user_id != current_user.id:
-            raise HTTPException(status_code=403, detail="Not authorized to delete this task")
-        
-        self.repo.delete(task_id)
-        
+        return True
+
+    def restore_task(self, task_id: int, current_user: User) -> TaskResponse:
+        """Devolve uma tarefa arquivada do usuário para as tarefas ativas."""
+        task = self.repo.restore(task_id, current_user.id)
+        if task is None:
+            if self.repo.get_archived_owner_id(task_id, current_user.id) is None:
+                raise HTTPException(status_code=404, detail="Archived task not found")
+            raise HTTPException(status_code=403, detail="Not authorized to restore this task")
+        return task
+
+    def bulk_create_tasks(self, items: List[TaskCreate], current_user: User) -> TaskBulkResponse:
+        """Cria várias tarefas em uma única transação."""
+        rows = [
+            {
+                "title": item.title,
+                "description": item.description,
+                "priority": item.priority,
+                "status": TaskStatus.PENDING
+            }
+            for item in items
+        ]
+        tasks = self.repo.bulk_create(current_user.id, rows)
+        return TaskBulkResponse(results=[
+            TaskBulkResult(id=task.id, status_code=201, task=TaskResponse.model_validate(task))
+            for task in tasks
+        ])
+
+    def _check_bulk_ownership(
+        self,
+        task_ids: List[int],
+        current_user: User,
+        action: str
+    ) -> Dict[int, TaskBulkResult]:
+        """
+        Valida em uma única consulta quais tarefas existem e pertencem ao
+        usuário; o repositório confere de novo dentro da transação de escrita.
+        """
+        owners = self.repo.get_ownership(task_ids, current_user.id)
+        errors = {}
+        for task_id in task_ids:
+            if task_id not in owners:
+                errors[task_id] = _bulk_not_found(task_id)
+            elif owners[task_id] != current_user.id:
+                errors[task_id] = TaskBulkResult(
+                    id=task_id, status_code=403, detail=f"Not authorized to {action} this task"
+                )
+        return errors
+
+    def bulk_update_tasks(self, items: List[TaskBulkUpdateItem], current_user: User) -> TaskBulkResponse:
+        """Atualiza várias tarefas em uma única transação; resultado individual por item."""
+        rows = {item.id: item.dict(exclude_unset=True) for item in items}
+        errors = self._check_bulk_ownership(list(rows), current_user, "update")
+
+        allowed = [row for task_id, row in rows.items() if task_id not in errors]
+        updated = {}
+        if allowed:
+            updated = {task.id: task for task in self.repo.bulk_update(current_user.id, allowed)}
+
+        # Apagadas entre a validação e a escrita: 404
+        return TaskBulkResponse(results=[
+            errors.get(task_id) or (
+                TaskBulkResult(id=task_id, status_code=200, task=TaskResponse.model_validate(updated[task_id]))
+                if task_id in updated else _bulk_not_found(task_id)
+            )
+            for task_id in rows
+        ])
+
+    def bulk_delete_tasks(self, task_ids: List[int], current_user: User) -> TaskBulkResponse:
+        """Deleta várias tarefas em uma única transação; resultado individual por item."""
+        task_ids = list(dict.fromkeys(task_ids))
+        errors = self._check_bulk_ownership(task_ids, current_user, "delete")
+
+        allowed = [task_id for task_id in task_ids if task_id not in errors]
+        deleted = set(self.repo.bulk_delete(current_user.id, allowed)) if allowed else set()
+
+        return TaskBulkResponse(results=[
+            errors.get(task_id) or (
+                TaskBulkResult(id=task_id, status_code=200, detail="Task deleted successfully")
+                if task_id in deleted else _bulk_not_found(task_id)
+            )
+            for task_id in task_ids
+        ])
+
+    def import_tasks_batch(
+        self,
+        parser,
+        lines: List[ImportLine],
+        current_user: User,
+        final: bool = False
+    ) -> Tuple[int, List[TaskImportError]]:
+        """Valida um lote de linhas do import (TaskCreate) e grava as válidas com um commit."""
+        try:
+            records = parser.parse(lines, final=final)
+        except InvalidImportError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+
+        rows, errors = [], []
+        for line_no, task, error in records:
+            if error is not None:
+                errors.append(TaskImportError(line=line_no, detail=error))
+                continue
+            rows.append((task.title, task.description, task.priority or TaskPriority.MEDIUM, TaskStatus.PENDING))
+
+        if rows:
+            self.repo.import_rows(current_user.id, rows)
+        return len(rows), errors
+
+    def export_tasks(
+        self,
+        current_user: User,
+        fmt: str,
+        status: Optional[TaskStatus] = None,
+        priority: Optional[TaskPriority] = None,
+        include_archived: bool = False
+    ) -> Iterator[str]:
+        """Gera o export das tarefas em chunks (NDJSON ou CSV); fecha a sessão ao final."""
+        try:
+            if fmt == "csv":
+                yield csv_header()
+            for batch in self.repo.stream_user_tasks(
+                current_user.id, status=status, priority=priority, batch_size=EXPORT_BATCH_SIZE,
+                include_archived=include_archived
+            ):
+                yield encode_batch(batch, fmt)
+        finally:
+            self.repo.db.close()
+
+
+class AsyncTaskService:
+    """
+    Interface assíncrona do TaskService, usada pelas rotas `async def`.
+
+    Com AsyncSession (DB_ASYNC=True) a mesma lógica do TaskService roda via
+    `run_sync` sobre o driver assíncrono, sem ocupar threads; com Session
+    síncrona, roda no threadpool como antes.
+    """
+
+    def __init__(self, db: Union[Session, AsyncSession]):
+        self.db = db
+
+    async def _run(self, fn: Callable[[TaskService], T]) -> T:
+        if isinstance(self.db, AsyncSession):
+            return await self.db.run_sync(lambda session: fn(TaskService(session)))
+        return await run_in_threadpool(self._run_and_release, fn)
+
+    def _run_and_release(self, fn: Callable[[TaskService], T]) -> T:
+        # A conexão volta ao pool na mesma thread: segurá-la até o fim da
+        # requisição, com o threadpool cheio de requisições esperando pela
+        # única conexão de escrita do SQLite, trava todas elas
+        try:
+            return fn(TaskService(self.db))
+        finally:
+            self.db.close()
 
+    async def _write(self, user_id: int, operation: Operation) -> T:
+        """Executa `operation` no próximo lote do group commit do shard do usuário, sem ocupar thread esperando."""
+        # Devolve a conexão da requisição (ex.: da autenticação) ao pool antes
+        # de esperar: no SQLite, o escritor do lote usa a única conexão de escrita
+        if isinstance(self.db, AsyncSession):
+            await self.db.close()
+        else:
+            self.db.close()
+        try:
+            future = task_writer_for(user_id).submit(operation)
+        except GroupCommitOverloadedError:
+            raise HTTPException(
+                status_code=503, detail="Server busy, try again later", headers={"Retry-After": "1"}
+            )
+        return await asyncio.wrap_future(future)
 
+    async def create_task(self, task_data: TaskCreate, current_user: User) -> TaskResponse:
+        task_dict = new_task_dict(task_data, current_user)
+        if task_writer_for(current_user.id) is None:
+            return await self._run(lambda service: service.repo.create(task_dict))
+        return await self._write(current_user.id, lambda repo: repo.add(task_dict))
+
+    async def get_user_tasks(self, current_user: User, **kwargs) -> dict:
+        return await self._run(lambda service: service.get_user_tasks(current_user, **kwargs))
+
+    async def get_user_tasks_page(
+        self, current_user: User, if_none_match: Optional[str] = None, **kwargs
+    ) -> Tuple[str, Optional[bytes]]:
+        return await self._run(lambda service: service.get_user_tasks_page(current_user, if_none_match, **kwargs))
+
+    async def search_tasks(self, current_user: User, q: str, **kwargs) -> dict:
+        return await self._run(lambda service: service.search_tasks(current_user, q, **kwargs))
+
+    async def get_stats_body(
+        self, current_user: User, days: int, if_none_match: Optional[str] = None
+    ) -> Tuple[str, Optional[bytes]]:
+        return await self._run(lambda service: service.get_stats_body(current_user, days, if_none_match))
+
+    async def get_changes(
+        self, current_user: User, since: int, limit: int, after: Optional[ChangesPosition] = None
+    ) -> dict:
+        return await self._run(lambda service: service.get_changes(current_user, since, limit, after))
+
+    async def update_task(self, task_id: int, task_data: TaskUpdate, current_user: User) -> TaskResponse:
+        if not current_user or task_writer_for(current_user.id) is None:
+            return await self._run(lambda service: service.update_task(task_id, task_data, current_user))
+        values = task_data.dict(exclude_unset=True)
+        task = await self._write(
+            current_user.id, rollback_if_none(lambda repo: repo.apply_update(task_id, current_user.id, values))
+        )
+        if task is None:
+            await self._run(lambda service: service._raise_not_found_or_forbidden(task_id, current_user.id, "update"))
+        return task
+
+    async def delete_task(self, task_id: int, current_user: User):
+        return await self._run(lambda service: service.delete_task(task_id, current_user))
+
+    async def restore_task(self, task_id: int, current_user: User) -> TaskResponse:
+        return await self._run(lambda service: service.restore_task(task_id, current_user))
+
+    async def bulk_create_tasks(self, items: List[TaskCreate], current_user: User) -> TaskBulkResponse:
+        return await self._run(lambda service: service.bulk_create_tasks(items, current_user))
+
+    async def bulk_update_tasks(self, items: List[TaskBulkUpdateItem], current_user: User) -> TaskBulkResponse:
+        return await self._run(lambda service: service.bulk_update_tasks(items, current_user))
+
+    async def bulk_delete_tasks(self, task_ids: List[int], current_user: User) -> TaskBulkResponse:
+        return await self._run(lambda service: service.bulk_delete_tasks(task_ids, current_user))
+
+    async def import_tasks(
+        self,
+        current_user: User,
+        fmt: str,
+        chunks: AsyncIterator[bytes]
+    ) -> TaskImportResponse:
+        """
+        Importa tarefas de um corpo NDJSON/CSV recebido em chunks.
+
+        As linhas são lidas conforme chegam e gravadas a cada
+        TASK_IMPORT_BATCH_SIZE linhas (um commit por lote): a memória não
+        depende do tamanho do arquivo e, se a importação for interrompida,
+        os lotes anteriores permanecem gravados.
+        """
+        batch_size = settings.TASK_IMPORT_BATCH_SIZE
+        reader = LineReader(settings.TASK_IMPORT_MAX_LINE_BYTES)
+        parser = make_parser(fmt, settings.TASK_IMPORT_MAX_LINE_BYTES)
+        report = TaskImportResponse(imported=0, failed=0, batches=0, errors=[])
+
+        async def flush(lines: List[ImportLine], final: bool = False) -> None:
+            imported, errors = await self._run(
+                lambda service: service.import_tasks_batch(parser, lines, current_user, final=final)
+            )
+            report.imported += imported
+            report.failed += len(errors)
+            report.batches += 1 if imported else 0
+            room = settings.TASK_IMPORT_MAX_ERRORS - len(report.errors)
+            report.errors.extend(errors[:max(room, 0)])
+            report.errors_truncated = report.errors_truncated or len(errors) > room
+
+        pending: List[ImportLine] = []
+        async for chunk in chunks:
+            pending.extend(reader.feed(chunk))
+            while len(pending) >= batch_size:
+                await flush(pending[:batch_size])
+                pending = pending[batch_size:]
+
+        await flush(pending + reader.finish(), final=True)
+        return report
+
+    def export_tasks(
+        self,
+        current_user: User,
+        fmt: str,
+        status: Optional[TaskStatus] = None,
+        priority: Optional[TaskPriority] = None,
+        include_archived: bool = False
+    ) -> Union[Iterator[str], AsyncIterator[str]]:
+        """Iterador do export: assíncrono com AsyncSession, síncrono (threadpool) caso contrário."""
+        if not isinstance(self.db, AsyncSession):
+            return TaskService(self.db).export_tasks(
+                current_user, fmt, status=status, priority=priority, include_archived=include_archived
+            )
+        return self._export_tasks_async(current_user, fmt, status, priority, include_archived)
+
+    async def _export_tasks_async(
+        self,
+        current_user: User,
+        fmt: str,
+        status: Optional[TaskStatus],
+        priority: Optional[TaskPriority],
+        include_archived: bool
+    ) -> AsyncIterator[str]:
+        try:
+            if fmt == "csv":
+                yield csv_header()
+            for statement in export_statements(current_user.id, status, priority, include_archived):
+                result = await self.db.stream(statement, execution_options={"yield_per": EXPORT_BATCH_SIZE})
+                async for batch in result.partitions():
+                    yield encode_batch(batch, fmt)
+        finally:
+            await self.db.close()
@@ -2,7 +2,10 @@ from sqlalchemy.orm import Session
 from fastapi import HTTPException
 from app.modules.user.repository import UserRepository
 from app.modules.user.schema import UserCreate, UserResponse, UserLogin
-from app.core.security import get_password_hash, verify_password, create_access_token
+from app.core.security import (
+    get_password_hash, verify_password, create_access_token,
+    is_known_bad_password, record_login_failure, reset_login_failures
+)
 from app.core.config import settings
 from datetime import timedelta
 
@@ -15,6 +18,9 @@ class UserService:
         # ✅ Verificar se usuário já existe
         if self.repo.get_by_user(user_data.user):
             raise HTTPException(status_code=400, detail="Username already registered")
+
+        # ✅ Devolver a conexão ao pool enquanto o bcrypt roda
+        self.repo.db.close()
         
         # ✅ Hash da senha
         hashed_password = get_password_hash(user_data.password)
@@ -29,16 +35,27 @@ class UserService:
 
     def authenticate_user(self, login_data: UserLogin) -> dict:
         """Autenticar usuário e retornar token"""
+        invalid_credentials = HTTPException(
+            status_code=401,
+            detail="Usuário ou senha inválidos",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+
+        # ✅ Recusar logo, sem bcrypt, a mesma senha errada repetida
+        if is_known_bad_password(login_data.username, login_data.password):
+            raise invalid_credentials
+
         # ✅ Buscar usuário
         user = self.repo.get_by_user(login_data.username)
+
+        # ✅ Devolver a conexão ao pool enquanto o bcrypt roda
+        self.repo.db.close()
         
         # ✅ Verificar credenciais
         if not user or not verify_password(login_data.password, user.hashed_password):
-            raise HTTPException(
-                status_code=401,
-                detail="Usuário ou senha inválidos",
-                headers={"WWW-Authenticate": "Bearer"}
-            )
+            record_login_failure(login_data.username, login_data.password)
+            raise invalid_credentials
+        reset_login_failures(login_data.username)
         
         # ✅ Criar token
         access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
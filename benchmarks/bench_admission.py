@@ -0,0 +1,138 @@
+"""
+Benchmark: um cliente abusivo (GET /tasks em loop fechado, várias conexões)
+contra usuários normais (uma requisição a cada --interval-ms), sem e com
+controle de admissão (RATE_LIMIT_ENABLED + MAX_IN_FLIGHT_REQUESTS).
+
+Cada modo roda em um subprocesso próprio (a configuração é lida na
+importação do app), com a aplicação servida em processo via
+httpx.ASGITransport. Todos os clientes saem do mesmo IP, então o bucket por
+IP de /tasks fica desligado e só vale o por usuário.
+
+Use: python -m benchmarks.bench_admission [--seconds 5] [--users 8]
+         [--abuser-connections 32] [--abuser-retry-ms 10] [--per-user 20]
+         [--max-in-flight 16]
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def run_child(seconds: float, users: int, abuser_connections: int, interval: float, retry: float) -> dict:
+    import httpx
+    from app.main import app
+    from app.core.security import create_access_token
+    from app.db.database import engine
+    from app.db.migrations import run_migrations
+    from app.modules.tasks.model import Task
+    from app.modules.user.model import User
+
+    run_migrations(engine)
+    with engine.begin() as conn:
+        user_ids = [
+            conn.execute(
+                User.__table__.insert().values(user=f"bench{i}", email=f"bench{i}@example.com", hashed_password="x")
+            ).inserted_primary_key[0]
+            for i in range(users + 1)
+        ]
+        conn.execute(Task.__table__.insert(), [
+            {"title": f"task {n}", "user_id": user_id, "revision": 0} for user_id in user_ids for n in range(200)
+        ])
+    headers = [{"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"} for user_id in user_ids]
+    abuser, normal = headers[0], headers[1:]
+    normal_latencies, normal_statuses, abuser_statuses = [], [], []
+
+    async def normal_client(http: "httpx.AsyncClient", headers: dict, deadline: float):
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            response = await http.get("/api/v1/tasks/", params={"size": 20}, headers=headers)
+            elapsed = time.perf_counter() - start
+            normal_latencies.append(elapsed)
+            normal_statuses.append(response.status_code)
+            await asyncio.sleep(max(0.0, interval - elapsed))
+
+    async def abusive_client(http: "httpx.AsyncClient", deadline: float):
+        while time.perf_counter() < deadline:
+            response = await http.get("/api/v1/tasks/", params={"size": 100}, headers=abuser)
+            abuser_statuses.append(response.status_code)
+            if response.status_code != 200:
+                # Ignora o Retry-After: tenta de novo depois de um ida-e-volta de rede
+                await asyncio.sleep(retry)
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+            deadline = time.perf_counter() + seconds
+            await asyncio.gather(
+                *(normal_client(http, h, deadline) for h in normal),
+                *(abusive_client(http, deadline) for _ in range(abuser_connections)),
+            )
+
+    asyncio.run(main())
+    normal_latencies.sort()
+    return {
+        "normal_requests": len(normal_statuses),
+        "normal_ok": normal_statuses.count(200) / len(normal_statuses),
+        "normal_p50_ms": statistics.median(normal_latencies) * 1000,
+        "normal_p99_ms": normal_latencies[int(len(normal_latencies) * 0.99) - 1] * 1000,
+        "abuser_ok_per_s": abuser_statuses.count(200) / seconds,
+        "abuser_rejected_per_s": (len(abuser_statuses) - abuser_statuses.count(200)) / seconds,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--users", type=int, default=8)
+    parser.add_argument("--abuser-connections", type=int, default=32)
+    parser.add_argument("--interval-ms", type=float, default=50.0)
+    parser.add_argument("--abuser-retry-ms", type=float, default=10.0, help="pausa do abusivo após 429/503 (RTT)")
+    parser.add_argument("--per-user", type=float, default=20.0, help="RATE_LIMIT_TASKS_PER_USER")
+    parser.add_argument("--max-in-flight", type=int, default=16, help="MAX_IN_FLIGHT_REQUESTS")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(
+            args.seconds, args.users, args.abuser_connections, args.interval_ms / 1000, args.abuser_retry_ms / 1000
+        )))
+        return
+
+    print(
+        f"{args.users} usuários (1 req/{args.interval_ms:.0f} ms) + 1 abusivo com "
+        f"{args.abuser_connections} conexões, {args.seconds:.0f} s"
+    )
+    print(f"{'modo':>15} {'normais ok':>10} {'p50 ms':>8} {'p99 ms':>8} {'abusivo ok/s':>12} {'recusadas/s':>11}")
+    for mode in ("sem limites", "com admissão"):
+        limited = mode == "com admissão"
+        env = dict(
+            os.environ,
+            SECRET_KEY="benchmark",
+            DATABASE_URL=f"sqlite:///{tempfile.mkdtemp(prefix='bench_admission_')}/bench.db",
+            RATE_LIMIT_ENABLED="true" if limited else "false",
+            RATE_LIMIT_TASKS_PER_USER=str(args.per_user),
+            RATE_LIMIT_TASKS_USER_BURST=str(int(args.per_user * 2)),
+            RATE_LIMIT_TASKS_PER_IP="0",
+            MAX_IN_FLIGHT_REQUESTS=str(args.max_in_flight) if limited else "0",
+        )
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_admission", "--child",
+             "--seconds", str(args.seconds), "--users", str(args.users),
+             "--abuser-connections", str(args.abuser_connections), "--interval-ms", str(args.interval_ms),
+             "--abuser-retry-ms", str(args.abuser_retry_ms)],
+            env=env, capture_output=True, text=True, check=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(
+            f"{mode:>15} {result['normal_ok']:10.1%} {result['normal_p50_ms']:8.1f} {result['normal_p99_ms']:8.1f} "
+            f"{result['abuser_ok_per_s']:12.1f} {result['abuser_rejected_per_s']:11.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Benchmark: latência das consultas da tabela quente conforme cresce o volume
+de tarefas concluídas antigas, sem e com arquivamento.
+
+Para cada volume, um usuário com --active tarefas recentes e N tarefas DONE
+concluídas há dois anos. "sem arquivo": as N ficam em `tasks`; "com
+arquivo": archive_done_tasks as move para `tasks_archive` antes das
+medições (o tempo total e a duração de um lote, que é quanto a escrita
+fica travada, também são mostrados). Cada combinação roda em um
+subprocesso com um banco novo.
+
+Consultas medidas (ms por chamada):
+- lista: get_by_user_with_filters, primeira página (20);
+- profunda: get_by_user_with_filters, página com skip=1000;
+- count: count_user_tasks (COUNT(*), sem filtros);
+- count done: count_user_tasks(status=DONE);
+- +arquivo: list_rows com include_archived, primeira página (só "com arquivo").
+
+Use: python -m benchmarks.bench_archive [--volumes 0,10000,50000,200000]
+         [--active 2000] [--repeat 50] [--batch-size 500]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+
+def run_child(volume: int, active: int, repeat: int, archive: bool, batch_size: int) -> dict:
+    from app.db.database import SessionLocal, engine
+    from app.db.migrations import run_migrations
+    from app.modules.tasks.archive import archive_done_tasks
+    from app.modules.tasks.counters import rebuild_counters
+    from app.modules.tasks.model import Task, TaskPriority, TaskStatus
+    from app.modules.tasks.repository import TaskRepository
+    from app.modules.user.model import User
+
+    run_migrations(engine)
+    now = datetime.utcnow().replace(microsecond=0)
+    old = now - timedelta(days=730)
+    priorities = list(TaskPriority)
+    with engine.begin() as conn:
+        user_id = conn.execute(
+            User.__table__.insert().values(user="bench", email="bench@example.com", hashed_password="x")
+        ).inserted_primary_key[0]
+        # Antigas primeiro (IDs menores), como numa base real
+        for start in range(0, volume, 10000):
+            conn.execute(Task.__table__.insert(), [
+                {
+                    "title": f"old {i}", "description": "archive benchmark", "priority": priorities[i % 3],
+                    "status": TaskStatus.DONE, "user_id": user_id, "revision": 1,
+                    "created_at": old + timedelta(seconds=i), "completed_at": old + timedelta(days=1, seconds=i),
+                }
+                for i in range(start, min(start + 10000, volume))
+            ])
+        conn.execute(Task.__table__.insert(), [
+            {
+                "title": f"task {i}", "description": "archive benchmark", "priority": priorities[i % 3],
+                "status": list(TaskStatus)[i % 3], "user_id": user_id, "revision": 1,
+                "created_at": now - timedelta(seconds=active - i),
+                "completed_at": now if i % 3 == 2 else None,
+            }
+            for i in range(active)
+        ])
+        rebuild_counters(conn)
+
+    result = {}
+    if archive:
+        start = time.perf_counter()
+        archive_done_tasks(SessionLocal, after_days=365, batch_size=batch_size)
+        result["archive_s"] = time.perf_counter() - start
+        result["archive_batch_ms"] = batch_ms(SessionLocal, batch_size, volume, user_id)
+
+    def timed(fn) -> float:
+        fn()
+        start = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        return (time.perf_counter() - start) / repeat * 1000
+
+    def query(call):
+        def run():
+            with SessionLocal() as db:
+                call(TaskRepository(db))
+        return run
+
+    result["list_ms"] = timed(query(lambda repo: repo.get_by_user_with_filters(user_id, limit=20)))
+    result["deep_ms"] = timed(query(lambda repo: repo.get_by_user_with_filters(user_id, skip=1000, limit=20)))
+    result["count_ms"] = timed(query(lambda repo: repo.count_user_tasks(user_id)))
+    result["count_done_ms"] = timed(query(lambda repo: repo.count_user_tasks(user_id, status=TaskStatus.DONE)))
+    if archive:
+        result["with_archived_ms"] = timed(query(lambda repo: repo.list_rows(user_id, limit=20, include_archived=True)))
+    return result
+
+
+def batch_ms(session_factory, batch_size: int, volume: int, user_id: int) -> float:
+    """Duração da transação de um lote: restaura um lote de tarefas e o arquiva de novo."""
+    from sqlalchemy import text
+    from app.modules.tasks.repository import TaskRepository
+
+    if not volume:
+        return 0.0
+    with session_factory() as db:
+        repo = TaskRepository(db)
+        archived = db.execute(
+            text("SELECT id FROM tasks_archive ORDER BY id LIMIT :n"), {"n": batch_size}
+        ).scalars().all()
+        for task_id in archived:
+            repo.restore(task_id, user_id)
+    with session_factory() as db:
+        start = time.perf_counter()
+        TaskRepository(db).archive_done(datetime.utcnow() - timedelta(days=365), batch_size)
+        return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--volumes", default="0,10000,50000,200000")
+    parser.add_argument("--active", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--volume", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--archive", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(args.volume, args.active, args.repeat, args.archive, args.batch_size)))
+        return
+
+    print(f"{args.active} tarefas ativas + N concluídas antigas; ms por consulta")
+    print(
+        f"{'N':>7} {'modo':>11} {'lista':>7} {'profunda':>8} {'count':>7} {'count done':>10} "
+        f"{'+arquivo':>8} {'arquivar s':>10} {'lote ms':>7}"
+    )
+    for volume in (int(volume) for volume in args.volumes.split(",")):
+        for archive in (False, True):
+            env = dict(
+                os.environ,
+                SECRET_KEY="benchmark",
+                DATABASE_URL=f"sqlite:///{tempfile.mkdtemp(prefix='bench_archive_')}/bench.db",
+            )
+            command = [
+                sys.executable, "-m", "benchmarks.bench_archive", "--child", "--volume", str(volume),
+                "--active", str(args.active), "--repeat", str(args.repeat), "--batch-size", str(args.batch_size),
+            ]
+            output = subprocess.run(
+                command + (["--archive"] if archive else []), env=env, capture_output=True, text=True, check=True,
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            extra = (
+                f"{result['with_archived_ms']:8.2f} {result['archive_s']:10.1f} {result['archive_batch_ms']:7.1f}"
+                if archive else f"{'-':>8} {'-':>10} {'-':>7}"
+            )
+            print(
+                f"{volume:7d} {'com arquivo' if archive else 'sem arquivo':>11} {result['list_ms']:7.2f} "
+                f"{result['deep_ms']:8.2f} {result['count_ms']:7.2f} {result['count_done_ms']:10.2f} {extra}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark: GET /tasks com muitos clientes concorrentes, modo síncrono vs. DB_ASYNC.
+
+Cada modo roda em um subprocesso próprio (o modo é escolhido na importação do app),
+com a aplicação servida em processo via httpx.ASGITransport.
+
+Use: python -m benchmarks.bench_async [--clients 500] [--requests 4]
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def run_child(clients: int, requests_per_client: int) -> dict:
+    import httpx
+    from app.main import app
+    from app.core.security import create_access_token
+    from app.db.database import engine
+    from app.db.migrations import run_migrations
+    from app.modules.tasks.counters import rebuild_counters
+    from app.modules.tasks.model import Task, TaskPriority, TaskStatus
+    from app.modules.user.model import User
+
+    run_migrations(engine)
+    with engine.begin() as conn:
+        user_id = conn.execute(
+            User.__table__.insert().values(user="bench", email="bench@example.com", hashed_password="x")
+        ).inserted_primary_key[0]
+        conn.execute(
+            Task.__table__.insert(),
+            [
+                {"title": f"task {i}", "priority": TaskPriority.MEDIUM, "status": TaskStatus.PENDING, "user_id": user_id}
+                for i in range(1_000)
+            ],
+        )
+        rebuild_counters(conn)
+
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"}
+    latencies = []
+
+    async def client(http: "httpx.AsyncClient"):
+        for _ in range(requests_per_client):
+            start = time.perf_counter()
+            response = await http.get("/api/v1/tasks/?size=20", headers=headers)
+            latencies.append(time.perf_counter() - start)
+            assert response.status_code == 200, response.text
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+            await http.get("/api/v1/tasks/", headers=headers)  # aquecimento
+            start = time.perf_counter()
+            await asyncio.gather(*(client(http) for _ in range(clients)))
+            return time.perf_counter() - start
+
+    elapsed = asyncio.run(main())
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "req_per_s": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=4)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(args.clients, args.requests)))
+        return
+
+    for mode in ("sync", "async"):
+        env = dict(
+            os.environ,
+            SECRET_KEY="benchmark",
+            DATABASE_URL=f"sqlite:///{tempfile.mkdtemp(prefix='bench_async_')}/bench.db",
+            DB_ASYNC="true" if mode == "async" else "false",
+        )
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_async", "--child",
+             "--clients", str(args.clients), "--requests", str(args.requests)],
+            env=env, capture_output=True, text=True, check=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(
+            f"{mode:>5}: {result['requests']} req, {result['req_per_s']:8.1f} req/s, "
+            f"p50 {result['p50_ms']:7.1f} ms, p95 {result['p95_ms']:7.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
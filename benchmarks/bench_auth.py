@@ -0,0 +1,60 @@
+"""
+Benchmark: custo de get_current_user por requisição, com e sem o cache de autenticação.
+
+Use: python -m benchmarks.bench_auth [--requests 20000]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+_tmpdir = tempfile.mkdtemp(prefix="bench_auth_")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_tmpdir}/bench.db")
+
+from fastapi.security import HTTPAuthorizationCredentials  # noqa: E402
+
+from app.core import security  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.db.database import Base, SessionLocal, engine  # noqa: E402
+from app.modules.user.model import User  # noqa: E402
+
+
+def run(credentials: HTTPAuthorizationCredentials, n: int) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        db = SessionLocal()
+        try:
+            security.get_current_user(credentials, db)
+        finally:
+            db.close()
+    return (time.perf_counter() - start) / n * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20_000)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    user = User(user="bench", email="bench@example.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+    token = security.create_access_token({"sub": str(user.id)})
+    db.close()
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+    settings.AUTH_CACHE_ENABLED = False
+    uncached = run(credentials, args.requests)
+
+    settings.AUTH_CACHE_ENABLED = True
+    cached = run(credentials, args.requests)
+
+    print(f"sem cache: {uncached:8.1f} µs/requisição")
+    print(f"com cache: {cached:8.1f} µs/requisição ({uncached / cached:.1f}x)")
+    print(f"estatísticas: {security.auth_cache_stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark: endpoints por item vs. /tasks/bulk com 1.000 tarefas.
+
+Use: python -m benchmarks.bench_bulk [--tasks 1000]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+_tmpdir = tempfile.mkdtemp(prefix="bench_bulk_")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_tmpdir}/bench.db")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.core.security import create_access_token  # noqa: E402
+from app.db.database import SessionLocal, engine  # noqa: E402
+from app.db.migrations import run_migrations  # noqa: E402
+from app.main import app  # noqa: E402
+from app.modules.user.model import User  # noqa: E402
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=1000)
+    args = parser.parse_args()
+    n = args.tasks
+
+    run_migrations(engine)
+    db = SessionLocal()
+    user = User(user="bench", email="bench@example.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': str(user.id)})}"}
+    db.close()
+
+    client = TestClient(app)
+    items = [{"title": f"task {i}", "priority": "high"} for i in range(n)]
+    single_ids, bulk_ids = [], []
+
+    def single_create():
+        for item in items:
+            single_ids.append(client.post("/api/v1/tasks/", json=item, headers=headers).json()["id"])
+
+    def bulk_create():
+        results = client.post("/api/v1/tasks/bulk", json={"items": items}, headers=headers).json()["results"]
+        bulk_ids.extend(result["id"] for result in results)
+
+    def single_update():
+        for task_id in single_ids:
+            client.put(f"/api/v1/tasks/{task_id}", json={"status": "done"}, headers=headers)
+
+    def bulk_update():
+        payload = {"items": [{"id": task_id, "status": "done"} for task_id in bulk_ids]}
+        client.put("/api/v1/tasks/bulk", json=payload, headers=headers)
+
+    def single_delete():
+        for task_id in single_ids:
+            client.delete(f"/api/v1/tasks/{task_id}", headers=headers)
+
+    def bulk_delete():
+        client.post("/api/v1/tasks/bulk/delete", json={"ids": bulk_ids}, headers=headers)
+
+    print(f"{'operação':>10} {'por item (s)':>13} {'bulk (s)':>10} {'ganho':>8}")
+    for name, single, bulk in (
+        ("create", single_create, bulk_create),
+        ("update", single_update, bulk_update),
+        ("delete", single_delete, bulk_delete),
+    ):
+        single_s, bulk_s = timed(single), timed(bulk)
+        print(f"{name:>10} {single_s:>13.3f} {bulk_s:>10.3f} {single_s / bulk_s:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Benchmark: polling de GET /tasks (página de 100 tarefas) em três cenários:
+- completo: sem If-None-Match e sem cache de páginas (consulta + serialização);
+- 304: cliente reenvia o ETag e nada mudou (só lê a versão do usuário);
+- cache: sem If-None-Match, com o cache de páginas ligado (corpo pronto).
+
+As requisições vão direto via ASGI (sem o TestClient, cujo custo por
+requisição esconderia a diferença).
+
+Use: python -m benchmarks.bench_etag [--tasks 5000] [--size 100] [--requests 2000]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+_tmpdir = tempfile.mkdtemp(prefix="bench_etag_")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_tmpdir}/bench.db")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+from app.main import app  # noqa: E402
+from app.modules.tasks.page_cache import page_cache  # noqa: E402
+from app.modules.user.model import User  # noqa: E402
+from app.db.database import SessionLocal, engine  # noqa: E402
+from app.db.migrations import run_migrations  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=5000)
+    parser.add_argument("--size", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    run_migrations(engine)
+    db = SessionLocal()
+    user = User(user="bench", email="bench@example.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': str(user.id)})}"}
+    db.close()
+
+    client = TestClient(app)
+    items = [{"title": f"task {i}", "priority": "high"} for i in range(1000)]
+    for _ in range(args.tasks // len(items)):
+        client.post("/api/v1/tasks/bulk", json={"items": items}, headers=headers)
+
+    path, query = "/api/v1/tasks/", f"size={args.size}&status=pending".encode()
+    etag = client.get(f"{path}?{query.decode()}", headers=headers).headers["etag"]
+
+    async def get(request_headers: list) -> int:
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+            "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": query,
+            "root_path": "", "headers": request_headers,
+            "client": ("127.0.0.1", 0), "server": ("bench", 80),
+        }
+        result = {}
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                result["status"] = message["status"]
+
+        await app(scope, receive, send)
+        return result["status"]
+
+    def poll(extra_headers: dict, expected: int) -> float:
+        request_headers = [
+            (name.lower().encode(), value.encode()) for name, value in {**headers, **extra_headers}.items()
+        ]
+
+        async def run() -> float:
+            for _ in range(50):
+                await get(request_headers)
+            start = time.perf_counter()
+            for _ in range(args.requests):
+                status = await get(request_headers)
+            elapsed = (time.perf_counter() - start) / args.requests * 1e6
+            assert status == expected, status
+            return elapsed
+
+        return asyncio.run(run())
+
+    settings.TASK_PAGE_CACHE_ENABLED = False
+    full = poll({}, 200)
+    not_modified = poll({"If-None-Match": etag}, 304)
+    settings.TASK_PAGE_CACHE_ENABLED = True
+    cached = poll({}, 200)
+
+    print(f"{'cenário':>10} {'µs/req':>10} {'ganho':>8}")
+    for name, value in (("completo", full), ("304", not_modified), ("cache", cached)):
+        print(f"{name:>10} {value:>10.1f} {full / value:>7.1f}x")
+    print(f"cache de páginas: {page_cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Benchmark: GET /tasks/export com 1M tarefas sob um orçamento fixo de RSS.
+
+A aplicação é chamada direto via ASGI e os chunks são descartados ao chegar
+(os clientes de teste acumulam o corpo inteiro em memória).
+Sai com código 1 se o RSS crescer mais que --budget-mb durante o export.
+
+Use: python -m benchmarks.bench_export [--tasks 1000000] [--format ndjson] [--budget-mb 64]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+_tmpdir = tempfile.mkdtemp(prefix="bench_export_")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_tmpdir}/bench.db")
+
+from app.core.security import create_access_token  # noqa: E402
+from app.db.database import engine  # noqa: E402
+from app.db.migrations import run_migrations  # noqa: E402
+from app.main import app  # noqa: E402
+from app.modules.tasks.model import Task, TaskPriority, TaskStatus  # noqa: E402
+from app.modules.user.model import User  # noqa: E402
+
+SEED_CHUNK = 50_000
+
+
+def rss_mb() -> float:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+def seed(n_tasks: int) -> int:
+    run_migrations(engine)
+    with engine.begin() as conn:
+        user_id = conn.execute(
+            User.__table__.insert().values(user="bench", email="bench@example.com", hashed_password="x")
+        ).inserted_primary_key[0]
+    for start in range(0, n_tasks, SEED_CHUNK):
+        with engine.begin() as conn:
+            conn.execute(
+                Task.__table__.insert(),
+                [
+                    {
+                        "title": f"task {i}",
+                        "description": "exported task",
+                        "priority": TaskPriority.MEDIUM,
+                        "status": TaskStatus.PENDING,
+                        "user_id": user_id,
+                    }
+                    for i in range(start, min(start + SEED_CHUNK, n_tasks))
+                ],
+            )
+    return user_id
+
+
+async def export(token: str, fmt: str) -> dict:
+    stats = {"bytes": 0, "lines": 0, "peak_rss_mb": rss_mb(), "status": None}
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/api/v1/tasks/export", "raw_path": b"/api/v1/tasks/export",
+        "query_string": f"format={fmt}".encode(), "root_path": "",
+        "headers": [(b"host", b"bench"), (b"authorization", f"Bearer {token}".encode())],
+        "client": ("127.0.0.1", 0), "server": ("bench", 80),
+    }
+
+    request_sent = False
+    response_done = asyncio.Event()
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # Depois do corpo da requisição, só "desconecta" quando a resposta termina
+        await response_done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            stats["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            body = message.get("body", b"")
+            stats["bytes"] += len(body)
+            stats["lines"] += body.count(b"\n")
+            stats["peak_rss_mb"] = max(stats["peak_rss_mb"], rss_mb())
+            if not message.get("more_body", False):
+                response_done.set()
+
+    await app(scope, receive, send)
+    return stats
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=1_000_000)
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    parser.add_argument("--budget-mb", type=float, default=64)
+    args = parser.parse_args()
+
+    user_id = seed(args.tasks)
+    token = create_access_token({"sub": str(user_id)})
+
+    baseline = rss_mb()
+    start = time.perf_counter()
+    stats = asyncio.run(export(token, args.format))
+    elapsed = time.perf_counter() - start
+    growth = stats["peak_rss_mb"] - baseline
+
+    print(f"status {stats['status']}: {stats['lines']} linhas, {stats['bytes'] / 2**20:.1f} MiB em {elapsed:.1f}s")
+    print(f"RSS: base {baseline:.1f} MiB, pico {stats['peak_rss_mb']:.1f} MiB, crescimento {growth:.1f} MiB "
+          f"(orçamento {args.budget_mb:.0f} MiB)")
+    return 0 if stats["status"] == 200 and growth <= args.budget_mb else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""
+Benchmark: POST /tasks com muitos clientes concorrentes, commit por
+requisição vs. group commit (TASK_GROUP_COMMIT_ENABLED).
+
+Cada modo roda em um subprocesso próprio (a configuração é lida na
+importação do app), com a aplicação servida em processo via
+httpx.ASGITransport. Roda com SQLITE_SYNCHRONOUS=FULL (fsync em todo
+commit) e NORMAL (padrão do perfil WAL: fsync só nos checkpoints).
+
+Use: python -m benchmarks.bench_group_commit [--clients 64] [--requests 50]
+         [--max-delay-ms 2] [--max-batch 64]
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def run_child(clients: int, requests_per_client: int) -> dict:
+    import httpx
+    from app.main import app
+    from app.core.security import create_access_token
+    from app.db.database import engine
+    from app.db.migrations import run_migrations
+    from app.modules.user.model import User
+
+    run_migrations(engine)
+    with engine.begin() as conn:
+        user_ids = [
+            conn.execute(
+                User.__table__.insert().values(user=f"bench{i}", email=f"bench{i}@example.com", hashed_password="x")
+            ).inserted_primary_key[0]
+            for i in range(clients)
+        ]
+    tokens = [{"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"} for user_id in user_ids]
+    latencies = []
+
+    async def client(http: "httpx.AsyncClient", headers: dict):
+        for i in range(requests_per_client):
+            start = time.perf_counter()
+            response = await http.post("/api/v1/tasks/", json={"title": f"task {i}"}, headers=headers)
+            latencies.append(time.perf_counter() - start)
+            assert response.status_code == 201, response.text
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+            for headers in tokens:  # aquecimento (cache de usuários, pool, thread escritora)
+                await http.get("/api/v1/tasks/", headers=headers)
+            start = time.perf_counter()
+            await asyncio.gather(*(client(http, headers) for headers in tokens))
+            return time.perf_counter() - start
+
+    elapsed = asyncio.run(main())
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "inserts_per_s": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--max-delay-ms", type=float, default=2.0)
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(args.clients, args.requests)))
+        return
+
+    print(f"{args.clients} clientes × {args.requests} POST /tasks")
+    print(f"{'synchronous':>11} {'modo':>13} {'inserts/s':>10} {'p50 ms':>8} {'p99 ms':>8}")
+    for synchronous in ("FULL", "NORMAL"):
+        for mode in ("por requisição", "group commit"):
+            env = dict(
+                os.environ,
+                SECRET_KEY="benchmark",
+                DATABASE_URL=f"sqlite:///{tempfile.mkdtemp(prefix='bench_group_commit_')}/bench.db",
+                SQLITE_SYNCHRONOUS=synchronous,
+                TASK_GROUP_COMMIT_ENABLED="true" if mode == "group commit" else "false",
+                TASK_GROUP_COMMIT_MAX_DELAY_MS=str(args.max_delay_ms),
+                TASK_GROUP_COMMIT_MAX_BATCH=str(args.max_batch),
+            )
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_group_commit", "--child",
+                 "--clients", str(args.clients), "--requests", str(args.requests)],
+                env=env, capture_output=True, text=True, check=True,
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(
+                f"{synchronous:>11} {mode:>13} {result['inserts_per_s']:10.1f} "
+                f"{result['p50_ms']:8.1f} {result['p99_ms']:8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Benchmark: POST /tasks/import com um arquivo gerado sob demanda.
+
+O arquivo é gerado em disco antes da medição e enviado em chunks de 64 KiB
+direto via ASGI, sem existir inteiro em memória de nenhum lado. Sai com
+código 1 se a taxa ficar abaixo de --target linhas/s ou se o RSS crescer
+mais que --budget-mb.
+
+Use: python -m benchmarks.bench_import [--rows 1000000] [--format ndjson] [--target 50000]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+_tmpdir = tempfile.mkdtemp(prefix="bench_import_")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_tmpdir}/bench.db")
+
+from app.core.security import create_access_token  # noqa: E402
+from app.db.database import engine  # noqa: E402
+from app.db.migrations import run_migrations  # noqa: E402
+from app.main import app  # noqa: E402
+from app.modules.user.model import User  # noqa: E402
+
+CHUNK_BYTES = 64 * 1024
+PRIORITIES = ("low", "medium", "high")
+
+
+def rss_mb() -> float:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+def write_file(path: str, n_rows: int, fmt: str) -> int:
+    with open(path, "w", encoding="utf-8") as out:
+        if fmt == "csv":
+            out.write("title,description,priority\n")
+        for i in range(n_rows):
+            priority = PRIORITIES[i % 3]
+            if fmt == "csv":
+                out.write(f"imported task {i},migrated from another tracker,{priority}\n")
+            else:
+                out.write(f'{{"title": "imported task {i}", "description": "migrated from another tracker", '
+                          f'"priority": "{priority}"}}\n')
+    return os.path.getsize(path)
+
+
+def read_chunks(path: str):
+    with open(path, "rb") as source:
+        while chunk := source.read(CHUNK_BYTES):
+            yield chunk
+
+
+async def upload(token: str, path: str, fmt: str) -> dict:
+    stats = {"peak_rss_mb": rss_mb(), "status": None, "body": b""}
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+        "scheme": "http", "path": "/api/v1/tasks/import", "raw_path": b"/api/v1/tasks/import",
+        "query_string": f"format={fmt}".encode(), "root_path": "",
+        "headers": [(b"host", b"bench"), (b"authorization", f"Bearer {token}".encode())],
+        "client": ("127.0.0.1", 0), "server": ("bench", 80),
+    }
+
+    chunks = read_chunks(path)
+    body_sent = False
+    response_done = asyncio.Event()
+
+    async def receive():
+        nonlocal body_sent
+        if not body_sent:
+            chunk = next(chunks, None)
+            stats["peak_rss_mb"] = max(stats["peak_rss_mb"], rss_mb())
+            if chunk is not None:
+                return {"type": "http.request", "body": chunk, "more_body": True}
+            body_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await response_done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            stats["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            stats["body"] += message.get("body", b"")
+            if not message.get("more_body", False):
+                response_done.set()
+
+    async with app.router.lifespan_context(app):
+        await app(scope, receive, send)
+    return stats
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    parser.add_argument("--target", type=float, default=50_000, help="Linhas/s mínimas")
+    parser.add_argument("--budget-mb", type=float, default=64)
+    args = parser.parse_args()
+
+    run_migrations(engine)
+    with engine.begin() as conn:
+        user_id = conn.execute(
+            User.__table__.insert().values(user="bench", email="bench@example.com", hashed_password="x")
+        ).inserted_primary_key[0]
+    token = create_access_token({"sub": str(user_id)})
+
+    path = os.path.join(_tmpdir, f"tasks.{args.format}")
+    size = write_file(path, args.rows, args.format)
+    print(f"arquivo: {args.rows} linhas, {size / 2**20:.1f} MiB")
+
+    baseline = rss_mb()
+    start = time.perf_counter()
+    stats = asyncio.run(upload(token, path, args.format))
+    elapsed = time.perf_counter() - start
+    growth = stats["peak_rss_mb"] - baseline
+
+    if stats["status"] != 200:
+        print(f"status {stats['status']}: {stats['body'][:500]!r}")
+        return 1
+
+    report = json.loads(stats["body"])
+    rate = report["imported"] / elapsed
+    print(f"{report['imported']} importadas, {report['failed']} com erro, "
+          f"{report['batches']} lotes em {elapsed:.1f}s: {rate:,.0f} linhas/s (meta {args.target:,.0f})")
+    print(f"RSS: base {baseline:.1f} MiB, pico {stats['peak_rss_mb']:.1f} MiB, crescimento {growth:.1f} MiB "
+          f"(orçamento {args.budget_mb:.0f} MiB)")
+    return 0 if rate >= args.target and growth <= args.budget_mb else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""
+Microbenchmark: leitura de uma página de GET /tasks até os dicts de
+TaskResponse, em uma sessão nova por página (como numa requisição).
+
+- orm: TaskRepository.get_by_user_with_filters (db.query(Task), instâncias
+  no identity map) + task_response_dict;
+- core: TaskRepository.list_rows (SELECT Core já montado, tuplas) + zip
+  com os nomes dos campos.
+
+Mostra µs por página para vários tamanhos e separa, em cada caminho, o
+custo fixo por consulta do custo por linha (reta entre a menor e a maior
+página).
+
+Use: python -m benchmarks.bench_list_rows [--sizes 1,10,100] [--repeat 2000]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+_tmpdir = tempfile.mkdtemp(prefix="bench_list_rows_")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_tmpdir}/bench.db")
+
+from app.db.database import SessionLocal, engine  # noqa: E402
+from app.db.migrations import run_migrations  # noqa: E402
+from app.modules.tasks.model import Task, TaskPriority, TaskStatus  # noqa: E402
+from app.modules.tasks.repository import TaskRepository  # noqa: E402
+from app.modules.tasks.service import LIST_FIELDS, task_response_dict  # noqa: E402
+from app.modules.user.model import User  # noqa: E402
+
+
+def seed(n_tasks: int) -> int:
+    run_migrations(engine)
+    with engine.begin() as conn:
+        user_id = conn.execute(
+            User.__table__.insert().values(user="bench", email="bench@example.com", hashed_password="x")
+        ).inserted_primary_key[0]
+        conn.execute(Task.__table__.insert(), [
+            {
+                "title": f"task {i}",
+                "description": "list rows benchmark",
+                "priority": list(TaskPriority)[i % 3],
+                "status": list(TaskStatus)[i % 3],
+                "user_id": user_id,
+                "revision": 0,
+            }
+            for i in range(n_tasks)
+        ])
+    return user_id
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="1,10,100")
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(",")]
+    user_id = seed(max(sizes) * len(TaskStatus))
+
+    def orm_page(size: int) -> list:
+        with SessionLocal() as db:
+            tasks = TaskRepository(db).get_by_user_with_filters(user_id, limit=size, status=TaskStatus.PENDING)
+            return [task_response_dict(task) for task in tasks]
+
+    def core_page(size: int) -> list:
+        with SessionLocal() as db:
+            rows = TaskRepository(db).list_rows(user_id, limit=size, status=TaskStatus.PENDING)
+            return [dict(zip(LIST_FIELDS, row)) for row in rows]
+
+    print(f"{'linhas':>6} {'orm µs':>9} {'core µs':>9} {'ganho':>6}")
+    timings = {}
+    for size in sizes:
+        if orm_page(size) != core_page(size):
+            raise SystemExit("os dois caminhos produzem páginas diferentes")
+        results = {}
+        for name, fn in (("orm", orm_page), ("core", core_page)):
+            for _ in range(50):
+                fn(size)
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                fn(size)
+            results[name] = (time.perf_counter() - start) / args.repeat * 1e6
+        timings[size] = results
+        print(f"{size:6d} {results['orm']:9.1f} {results['core']:9.1f} {results['orm'] / results['core']:5.1f}x")
+
+    small, large = min(sizes), max(sizes)
+    if large > small:
+        for name in ("orm", "core"):
+            per_row = (timings[large][name] - timings[small][name]) / (large - small)
+            fixed = timings[small][name] - per_row * small
+            print(f"{name:>6}: {fixed:7.1f} µs por consulta + {per_row:5.2f} µs por linha")
+
+
+if __name__ == "__main__":
+    main()
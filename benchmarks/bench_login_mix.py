@@ -0,0 +1,107 @@
+"""
+Benchmark: rajada de logins misturada com listagem de tarefas.
+
+Compara bcrypt inline (PASSWORD_HASH_WORKERS=0) com o pool de processos,
+medindo a latência de GET /tasks enquanto os logins acontecem.
+
+Use: python -m benchmarks.bench_login_mix [--logins 100] [--lists 200] [--workers 2]
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[max(0, int(len(values) * pct) - 1)] * 1000 if values else 0.0
+
+
+def run_child(logins: int, lists: int) -> dict:
+    import httpx
+    from app.main import app
+    from app.core.security import create_access_token, get_password_hash
+    from app.db.database import engine
+    from app.db.migrations import run_migrations
+    from app.modules.user.model import User
+
+    run_migrations(engine)
+    with engine.begin() as conn:
+        user_id = conn.execute(
+            User.__table__.insert().values(
+                user="bench", email="bench@example.com", hashed_password=get_password_hash("secret")
+            )
+        ).inserted_primary_key[0]
+
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"}
+    list_latencies, login_codes = [], []
+
+    async def login(http):
+        response = await http.post("/api/v1/auth/login", json={"username": "bench", "password": "secret"})
+        login_codes.append(response.status_code)
+
+    async def list_tasks(http):
+        start = time.perf_counter()
+        response = await http.get("/api/v1/tasks/", headers=headers)
+        list_latencies.append(time.perf_counter() - start)
+        assert response.status_code == 200, response.text
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as http:
+            await list_tasks(http)
+            list_latencies.clear()
+            start = time.perf_counter()
+            await asyncio.gather(
+                *(login(http) for _ in range(logins)),
+                *(list_tasks(http) for _ in range(lists)),
+            )
+            return time.perf_counter() - start
+
+    elapsed = asyncio.run(main())
+    return {
+        "elapsed_s": elapsed,
+        "logins_ok": login_codes.count(200),
+        "logins_rejected": len(login_codes) - login_codes.count(200),
+        "list_p50_ms": percentile(list_latencies, 0.50),
+        "list_p95_ms": percentile(list_latencies, 0.95),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--lists", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(args.logins, args.lists)))
+        return
+
+    for label, workers in (("inline", 0), (f"pool({args.workers})", args.workers)):
+        env = dict(
+            os.environ,
+            SECRET_KEY="benchmark",
+            DATABASE_URL=f"sqlite:///{tempfile.mkdtemp(prefix='bench_login_')}/bench.db",
+            PASSWORD_HASH_WORKERS=str(workers),
+        )
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_login_mix", "--child",
+             "--logins", str(args.logins), "--lists", str(args.lists)],
+            env=env, capture_output=True, text=True, check=True,
+        ).stdout
+        r = json.loads(output.strip().splitlines()[-1])
+        print(
+            f"{label:>8}: {r['elapsed_s']:6.2f}s, logins ok={r['logins_ok']} rejeitados={r['logins_rejected']}, "
+            f"GET /tasks p50 {r['list_p50_ms']:7.1f} ms, p95 {r['list_p95_ms']:7.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark: paginação por OFFSET vs. paginação por cursor em GET /tasks.
+
+Use: python -m benchmarks.bench_pagination [--tasks 110000] [--size 10]
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+_tmpdir = tempfile.mkdtemp(prefix="bench_pagination_")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_tmpdir}/bench.db")
+
+from app.db.database import Base, SessionLocal, engine  # noqa: E402
+from app.modules.tasks.model import Task, TaskPriority, TaskStatus  # noqa: E402
+from app.modules.tasks.repository import TaskRepository  # noqa: E402
+from app.modules.user.model import User  # noqa: E402
+
+PAGES = [1, 10, 100, 1_000, 10_000]
+
+
+def seed(n_tasks: int) -> int:
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        user_id = conn.execute(
+            User.__table__.insert().values(user="bench", email="bench@example.com", hashed_password="x")
+        ).inserted_primary_key[0]
+        base = datetime(2024, 1, 1)
+        rows = [
+            {
+                "title": f"task {i}",
+                "priority": TaskPriority.MEDIUM,
+                "status": TaskStatus.PENDING,
+                "created_at": base + timedelta(seconds=i // 3),
+                "user_id": user_id,
+            }
+            for i in range(n_tasks)
+        ]
+        conn.execute(Task.__table__.insert(), rows)
+    return user_id
+
+
+def timed(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=110_000)
+    parser.add_argument("--size", type=int, default=10)
+    args = parser.parse_args()
+
+    user_id = seed(args.tasks)
+    db = SessionLocal()
+    repo = TaskRepository(db)
+
+    print(f"{'page':>8} {'offset (ms)':>12} {'cursor (ms)':>12}")
+    for page in PAGES:
+        skip = (page - 1) * args.size
+        if skip >= args.tasks:
+            break
+        # Cursor equivalente: última tarefa da página anterior
+        after = None
+        if skip:
+            last = repo.get_by_user_with_filters(user_id, skip=skip - 1, limit=1)[0]
+            after = (last.created_at, last.id)
+
+        offset_ms = timed(lambda: repo.get_by_user_with_filters(user_id, skip=skip, limit=args.size))
+        cursor_ms = timed(lambda: repo.get_by_user_with_filters(user_id, limit=args.size, after=after))
+
+        offset_ids = [t.id for t in repo.get_by_user_with_filters(user_id, skip=skip, limit=args.size)]
+        cursor_ids = [t.id for t in repo.get_by_user_with_filters(user_id, limit=args.size, after=after)]
+        assert offset_ids == cursor_ids, f"páginas divergentes na página {page}"
+
+        print(f"{page:>8} {offset_ms:>12.2f} {cursor_ms:>12.2f}")
+
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""
+Benchmark: leituras (GET /tasks) concorrentes com escritas (POST/PUT /tasks)
+no SQLite, comparando os perfis do banco:
+
+- padrão: rollback journal, fsync completo, um engine para tudo;
+- wal: perfil de produção do SQLite (SQLITE_TUNED), um engine para tudo;
+- wal+split: perfil de produção com engine de leitura separado e um único
+  escritor (DB_READ_WRITE_SPLIT).
+
+Para cada perfil, os dados são gerados uma vez (benchmarks.datagen) e
+--processes subprocessos, como os workers do uvicorn, disputam o mesmo
+arquivo: cada um serve a aplicação em processo via httpx.ASGITransport com
+--readers leitores e --writers escritores concorrentes por --duration
+segundos. A configuração é lida na importação do app, por isso tudo roda em
+subprocessos. Respostas 5xx (ex.: "database is locked") contam como erro.
+
+Use: python -m benchmarks.bench_rw_mix [--processes 4] [--readers 8] [--writers 2]
+         [--duration 10] [--users 10] [--tasks-per-user 5000]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+PROFILES = {
+    "padrão": {"SQLITE_TUNED": "false", "DB_READ_WRITE_SPLIT": "false"},
+    "wal": {"SQLITE_TUNED": "true", "DB_READ_WRITE_SPLIT": "false"},
+    "wal+split": {"SQLITE_TUNED": "true", "DB_READ_WRITE_SPLIT": "true"},
+}
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> dict:
+    latencies.sort()
+    if not latencies:
+        return {"requests": 0, "errors": errors, "req_per_s": 0.0, "p50_ms": 0.0, "p99_ms": 0.0}
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "req_per_s": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1e3,
+        "p99_ms": latencies[max(int(len(latencies) * 0.99) - 1, 0)] * 1e3,
+    }
+
+
+def prepare(args) -> None:
+    from app.db.database import engine
+    from benchmarks.datagen import generate
+
+    generate(engine, args.users, args.tasks_per_user, seed=19)
+
+
+def run_worker(args) -> dict:
+    """Um "worker": carga mista até o fim de --duration, após o sinal do processo pai."""
+    import httpx
+    from sqlalchemy import select
+    from app.main import app
+    from app.core.security import create_access_token
+    from app.db.database import engine
+    from app.modules.tasks.model import Task
+
+    task_ids: Dict[int, List[int]] = {}
+    with engine.connect() as conn:
+        for task_id, user_id in conn.execute(select(Task.id, Task.user_id)):
+            task_ids.setdefault(user_id, []).append(task_id)
+    users = sorted(task_ids)
+    tokens = {user_id: {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"} for user_id in users}
+    latencies: Dict[str, List[float]] = {"read": [], "write": []}
+    errors = {"read": 0, "write": 0}
+
+    def record(kind: str, response: "httpx.Response", start: float, expected: tuple) -> None:
+        if response.status_code >= 500:
+            errors[kind] += 1
+        else:
+            assert response.status_code in expected, response.text
+            latencies[kind].append(time.perf_counter() - start)
+
+    async def reader(http: "httpx.AsyncClient", rng: random.Random, deadline: float):
+        while time.perf_counter() < deadline:
+            headers = tokens[rng.choice(users)]
+            start = time.perf_counter()
+            response = await http.get(f"/api/v1/tasks/?size=20&page={rng.randint(1, 50)}", headers=headers)
+            record("read", response, start, (200,))
+
+    async def writer(http: "httpx.AsyncClient", rng: random.Random, deadline: float):
+        while time.perf_counter() < deadline:
+            user_id = rng.choice(users)
+            start = time.perf_counter()
+            if rng.random() < 0.5:
+                response = await http.post("/api/v1/tasks/", json={"title": "nova"}, headers=tokens[user_id])
+            else:
+                task_id = rng.choice(task_ids[user_id])
+                response = await http.put(
+                    f"/api/v1/tasks/{task_id}", json={"title": "editada"}, headers=tokens[user_id]
+                )
+            record("write", response, start, (200, 201))
+
+    async def main() -> float:
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+            for headers in tokens.values():  # aquecimento (cache de usuários, pools)
+                await http.get("/api/v1/tasks/", headers=headers)
+            # Pronto: espera o sinal para todos os workers começarem juntos
+            print("ready", flush=True)
+            await asyncio.to_thread(sys.stdin.readline)
+            start = time.perf_counter()
+            deadline = start + args.duration
+            seed = os.getpid()
+            await asyncio.gather(
+                *(reader(http, random.Random(seed + i), deadline) for i in range(args.readers)),
+                *(writer(http, random.Random(-seed - i), deadline) for i in range(args.writers)),
+            )
+            return time.perf_counter() - start
+
+    elapsed = asyncio.run(main())
+    return {"elapsed": elapsed, "latencies": latencies, "errors": errors}
+
+
+def run_profile(args, profile: Dict[str, str]) -> dict:
+    env = dict(
+        os.environ,
+        SECRET_KEY="benchmark",
+        DATABASE_URL=f"sqlite:///{tempfile.mkdtemp(prefix='bench_rw_mix_')}/bench.db",
+        **profile,
+    )
+    common = [
+        "--readers", str(args.readers), "--writers", str(args.writers), "--duration", str(args.duration),
+        "--users", str(args.users), "--tasks-per-user", str(args.tasks_per_user),
+    ]
+    command = [sys.executable, "-m", "benchmarks.bench_rw_mix"]
+    subprocess.run(command + ["--prepare"] + common, env=env, check=True, capture_output=True)
+
+    workers = [
+        subprocess.Popen(
+            command + ["--worker"] + common, env=env, text=True,
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+        )
+        for _ in range(args.processes)
+    ]
+    for worker in workers:
+        assert worker.stdout.readline().strip() == "ready"
+    for worker in workers:
+        worker.stdin.write("go\n")
+        worker.stdin.flush()
+
+    results = []
+    for worker in workers:
+        output, _ = worker.communicate()
+        assert worker.returncode == 0, f"worker saiu com código {worker.returncode}"
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    elapsed = max(result["elapsed"] for result in results)
+    return {
+        kind: summarize(
+            [value for result in results for value in result["latencies"][kind]],
+            sum(result["errors"][kind] for result in results),
+            elapsed,
+        )
+        for kind in ("read", "write")
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--tasks-per-user", type=int, default=5000)
+    parser.add_argument("--prepare", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.prepare:
+        prepare(args)
+        return
+    if args.worker:
+        print(json.dumps(run_worker(args)))
+        return
+
+    print(
+        f"{args.processes} processos × ({args.readers} leitores + {args.writers} escritores), "
+        f"{args.duration:.0f}s por perfil"
+    )
+    print(f"{'perfil':>10} {'tipo':>8} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'erros':>6}")
+    for name, profile in PROFILES.items():
+        result = run_profile(args, profile)
+        for kind, label in (("read", "leitura"), ("write", "escrita")):
+            stats = result[kind]
+            print(
+                f"{name:>10} {label:>8} {stats['req_per_s']:8.1f} {stats['p50_ms']:8.1f} "
+                f"{stats['p99_ms']:8.1f} {stats['errors']:6d}"
+            )
+
+
+if __name__ == "__main__":
+    main()
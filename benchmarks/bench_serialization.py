@@ -0,0 +1,93 @@
+"""
+Microbenchmark: serialização de páginas de 100 tarefas em GET /tasks.
+
+Compara, sobre as mesmas tarefas já carregadas do banco:
+- pydantic: PaginatedTaskResponse(items=tasks) validando cada Task via
+  from_attributes, seguido do tratamento do response_model pelo FastAPI
+  (validação + serialização);
+- orjson: página montada uma vez como dicts (task_response_dict) e
+  renderizada pelo ORJSONResponse.
+
+Use: python -m benchmarks.bench_serialization [--size 100] [--repeat 2000]
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+_tmpdir = tempfile.mkdtemp(prefix="bench_serialization_")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_tmpdir}/bench.db")
+
+from fastapi.routing import serialize_response  # noqa: E402
+from app.api.routes.tasks import router  # noqa: E402
+from app.core.responses import ORJSONResponse  # noqa: E402
+from app.db.database import SessionLocal, engine  # noqa: E402
+from app.db.migrations import run_migrations  # noqa: E402
+from app.modules.tasks.model import Task, TaskPriority, TaskStatus  # noqa: E402
+from app.modules.tasks.schema import PaginatedTaskResponse  # noqa: E402
+from app.modules.tasks.service import task_response_dict  # noqa: E402
+from app.modules.user.model import User  # noqa: E402
+
+
+def load_tasks(size: int):
+    run_migrations(engine)
+    with engine.begin() as conn:
+        user_id = conn.execute(
+            User.__table__.insert().values(user="bench", email="bench@example.com", hashed_password="x")
+        ).inserted_primary_key[0]
+        conn.execute(Task.__table__.insert(), [
+            {
+                "title": f"task {i}",
+                "description": "serialization benchmark",
+                "priority": list(TaskPriority)[i % 3],
+                "status": list(TaskStatus)[i % 3],
+                "user_id": user_id,
+            }
+            for i in range(size)
+        ])
+    db = SessionLocal()
+    return db.query(Task).filter(Task.user_id == user_id).all()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    tasks = load_tasks(args.size)
+    response_field = next(r for r in router.routes if r.path == "/" and "GET" in r.methods).response_field
+    loop = asyncio.new_event_loop()
+    meta = {"total": args.size, "page": 1, "pages": 1, "size": args.size, "next_cursor": None}
+
+    def pydantic_path() -> bytes:
+        page = PaginatedTaskResponse(items=tasks, **meta)
+        return loop.run_until_complete(serialize_response(
+            field=response_field, response_content=page, dump_json=True, is_coroutine=True
+        ))
+
+    def orjson_path() -> bytes:
+        page = {"items": [task_response_dict(task) for task in tasks], **meta}
+        return ORJSONResponse(page).body
+
+    if json.loads(pydantic_path()) != json.loads(orjson_path()):
+        raise SystemExit("as duas serializações produzem JSON diferente")
+
+    results = {}
+    for name, fn in (("pydantic", pydantic_path), ("orjson", orjson_path)):
+        for _ in range(50):
+            fn()
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            fn()
+        results[name] = (time.perf_counter() - start) / args.repeat * 1e6
+        print(f"{name:>8}: {results[name]:8.1f} µs/página de {args.size}")
+
+    print(f"ganho: {results['pydantic'] / results['orjson']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
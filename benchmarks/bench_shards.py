@@ -0,0 +1,146 @@
+"""
+Benchmark: vazão de escrita de tarefas conforme o número de shards
+(DATABASE_SHARD_URLS) em arquivos SQLite locais.
+
+Para cada número de shards, um banco principal (usuários) e N arquivos de
+shard novos; --processes subprocessos, como os workers do uvicorn, criam
+tarefas (TaskRepository.create, um commit por tarefa) para usuários
+sorteados por --duration segundos. No SQLite cada arquivo aceita um
+escritor por vez: com um shard, todos os processos disputam o mesmo lock;
+com N, escritas de usuários em shards diferentes correm em paralelo. Roda
+com SQLITE_SYNCHRONOUS=FULL (fsync em todo commit, com o lock preso) e
+NORMAL (padrão do perfil WAL). A configuração é lida na importação do app,
+por isso tudo roda em subprocessos.
+
+O ganho depende de haver CPU e disco livres para os escritores paralelos:
+com um único núcleo, o modo NORMAL (limitado por CPU) quase não muda.
+
+Use: python -m benchmarks.bench_shards [--shards 1,2,4] [--processes 4]
+         [--duration 5] [--users 100]
+"""
+import argparse
+import importlib
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def prepare(users: int) -> None:
+    from app.db.database import engine, shard_writer_engines, writer_engines
+    from app.db.migrations import run_migrations
+    from app.db.sharding import assign_id_ranges
+    from app.modules.user.model import User
+
+    for writer in writer_engines():
+        run_migrations(writer)
+    assign_id_ranges(shard_writer_engines())
+    with engine.begin() as conn:
+        conn.execute(User.__table__.insert(), [
+            {"user": f"bench{i}", "email": f"bench{i}@example.com", "hashed_password": "x"} for i in range(users)
+        ])
+
+
+def run_worker(users: int, duration: float) -> dict:
+    """Um "worker": cria tarefas até o fim de `duration`, após o sinal do processo pai."""
+    from app.db.database import SessionLocal
+    from app.modules.tasks.model import TaskPriority, TaskStatus
+    from app.modules.tasks.repository import TaskRepository
+
+    importlib.import_module("app.modules.user.model")  # FK de tasks.user_id
+
+    rng = random.Random(os.getpid())
+    # Aquecimento: conexões de todos os shards abertas antes da medição
+    with SessionLocal() as db:
+        for user_id in range(1, users + 1):
+            TaskRepository(db).get_version(user_id)
+    print("ready", flush=True)
+    sys.stdin.readline()
+
+    latencies = []
+    start = time.perf_counter()
+    deadline = start + duration
+    while time.perf_counter() < deadline:
+        begin = time.perf_counter()
+        with SessionLocal() as db:
+            TaskRepository(db).create({
+                "title": "bench", "user_id": rng.randint(1, users),
+                "status": TaskStatus.PENDING, "priority": TaskPriority.MEDIUM,
+            })
+        latencies.append(time.perf_counter() - begin)
+    return {"elapsed": time.perf_counter() - start, "latencies": latencies}
+
+
+def run_config(args, shards: int, synchronous: str) -> dict:
+    directory = tempfile.mkdtemp(prefix="bench_shards_")
+    env = dict(
+        os.environ,
+        SECRET_KEY="benchmark",
+        DATABASE_URL=f"sqlite:///{directory}/main.db",
+        DATABASE_SHARD_URLS=json.dumps([f"sqlite:///{directory}/shard{i}.db" for i in range(shards)]),
+        SQLITE_SYNCHRONOUS=synchronous,
+    )
+    command = [sys.executable, "-m", "benchmarks.bench_shards", "--users", str(args.users)]
+    subprocess.run(command + ["--prepare"], env=env, check=True, capture_output=True)
+
+    workers = [
+        subprocess.Popen(
+            command + ["--worker", "--duration", str(args.duration)],
+            env=env, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True,
+        )
+        for _ in range(args.processes)
+    ]
+    for worker in workers:
+        assert worker.stdout.readline().strip() == "ready"
+    for worker in workers:  # todos começam juntos
+        worker.stdin.write("\n")
+        worker.stdin.flush()
+    results = []
+    for worker in workers:
+        output, _ = worker.communicate()
+        assert worker.returncode == 0
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    latencies = sorted(latency for result in results for latency in result["latencies"])
+    elapsed = max(result["elapsed"] for result in results)
+    return {
+        "inserts_per_s": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1e3,
+        "p99_ms": latencies[max(int(len(latencies) * 0.99) - 1, 0)] * 1e3,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--shards", default="1,2,4")
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--prepare", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.prepare:
+        prepare(args.users)
+        return
+    if args.worker:
+        print(json.dumps(run_worker(args.users, args.duration)))
+        return
+
+    print(f"{args.processes} processos criando tarefas por {args.duration:.0f} s ({args.users} usuários)")
+    print(f"{'synchronous':>11} {'shards':>6} {'inserts/s':>10} {'p50 ms':>8} {'p99 ms':>8}")
+    for synchronous in ("FULL", "NORMAL"):
+        for shards in (int(value) for value in args.shards.split(",")):
+            result = run_config(args, shards, synchronous)
+            print(
+                f"{synchronous:>11} {shards:6d} {result['inserts_per_s']:10.1f} "
+                f"{result['p50_ms']:8.2f} {result['p99_ms']:8.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Benchmark: custo de subida do processo.
+
+- importação de app.main em processos novos (mediana de --runs), contando
+  conexões e statements SQL durante a importação (tem que ser zero: schema
+  e aquecimento ficam no lifespan / serve.py);
+- run_migrations num banco novo e num banco já migrado (o que cada worker
+  pagaria se aplicasse o schema na subida);
+- warm_up() (conexões, consultas compiladas e pool do bcrypt);
+- com --serve, tempo do `python serve.py` até o primeiro 200 em /health.
+
+Sai com código 1 se a importação passar de --import-budget-ms ou abrir
+conexões/rodar SQL, para uso em CI.
+
+Use: python -m benchmarks.bench_startup [--runs 5] [--import-budget-ms 1500]
+         [--importtime] [--serve --workers 2]
+"""
+import argparse
+import importlib
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+
+def child_import() -> dict:
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    counts = {"connects": 0, "statements": 0}
+
+    def on_connect(*args):
+        counts["connects"] += 1
+
+    def on_execute(*args):
+        counts["statements"] += 1
+
+    # Listeners na classe valem para todos os engines criados na importação
+    event.listen(Engine, "connect", on_connect)
+    event.listen(Engine, "before_cursor_execute", on_execute)
+    start = time.perf_counter()
+    importlib.import_module("app.main")
+    counts["import_ms"] = (time.perf_counter() - start) * 1e3
+    return counts
+
+
+def child_startup() -> dict:
+    import asyncio
+    from app.core.security import password_hasher
+    from app.core.warmup import warm_up
+    from app.db.database import engine
+    from app.db.migrations import run_migrations
+
+    start = time.perf_counter()
+    run_migrations(engine)
+    fresh_ms = (time.perf_counter() - start) * 1e3
+    start = time.perf_counter()
+    run_migrations(engine)
+    current_ms = (time.perf_counter() - start) * 1e3
+    start = time.perf_counter()
+    asyncio.run(warm_up())
+    warm_up_ms = (time.perf_counter() - start) * 1e3
+    password_hasher.shutdown()
+    return {"migrate_fresh_ms": fresh_ms, "migrate_current_ms": current_ms, "warm_up_ms": warm_up_ms}
+
+
+def run_child(mode: str, env: dict) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_startup", "--child", mode],
+        env=env, capture_output=True, text=True, check=True,
+    )
+
+
+def child_json(process: subprocess.CompletedProcess) -> dict:
+    return json.loads(process.stdout.strip().splitlines()[-1])
+
+
+def fresh_env() -> dict:
+    return dict(
+        os.environ,
+        SECRET_KEY="benchmark",
+        DATABASE_URL=f"sqlite:///{tempfile.mkdtemp(prefix='bench_startup_')}/bench.db",
+    )
+
+
+def top_imports(stderr: str, limit: int = 15) -> list:
+    """Módulos com maior tempo próprio (sem os submódulos) na saída de `python -X importtime`."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        rows.append((int(self_us), name.strip()))
+    return sorted(rows, reverse=True)[:limit]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def time_to_first_request(workers: int, timeout: float = 60.0) -> float:
+    port = free_port()
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "serve.py", "--workers", str(workers), "--host", "127.0.0.1",
+         "--port", str(port), "--log-level", "warning"],
+        env=fresh_env(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                    if response.status == 200:
+                        return (time.perf_counter() - start) * 1e3
+            except OSError:
+                time.sleep(0.02)
+        raise TimeoutError(f"serve.py não respondeu em {timeout:.0f} s")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--import-budget-ms", type=float, default=None)
+    parser.add_argument("--importtime", action="store_true", help="mostra os módulos mais caros (-X importtime)")
+    parser.add_argument("--serve", action="store_true", help="mede o serve.py até o primeiro 200")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--child", choices=("import", "startup"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child == "import":
+        print(json.dumps(child_import()))
+        return
+    if args.child == "startup":
+        print(json.dumps(child_startup()))
+        return
+
+    imports = [child_json(run_child("import", fresh_env())) for _ in range(args.runs)]
+    import_ms = statistics.median(result["import_ms"] for result in imports)
+    connects = max(result["connects"] for result in imports)
+    statements = max(result["statements"] for result in imports)
+    print(f"importação de app.main (mediana de {args.runs}): {import_ms:8.1f} ms")
+    print(f"  conexões / statements SQL na importação:   {connects} / {statements}")
+
+    startup = child_json(run_child("startup", fresh_env()))
+    print(f"run_migrations, banco novo:                 {startup['migrate_fresh_ms']:8.1f} ms")
+    print(f"run_migrations, banco já migrado:           {startup['migrate_current_ms']:8.1f} ms")
+    print(f"warm_up (conexões, consultas, bcrypt):      {startup['warm_up_ms']:8.1f} ms")
+
+    if args.importtime:
+        stderr = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import app.main"],
+            env=fresh_env(), capture_output=True, text=True, check=True,
+        ).stderr
+        print("módulos mais caros na importação (tempo próprio):")
+        for us, name in top_imports(stderr):
+            print(f"  {us / 1000:8.1f} ms  {name}")
+
+    if args.serve:
+        ready_ms = time_to_first_request(args.workers)
+        print(f"serve.py ({args.workers} workers) até o primeiro 200:  {ready_ms:8.1f} ms")
+
+    failed = connects or statements
+    if args.import_budget_ms is not None and import_ms > args.import_budget_ms:
+        print(f"FALHOU: importação acima do orçamento de {args.import_budget_ms:.0f} ms")
+        failed = True
+    if connects or statements:
+        print("FALHOU: a importação de app.main abriu conexões ou executou SQL")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Benchmark: widget do dashboard com os totais por status × prioridade.
+
+Compara, por renderização do widget:
+- listagem: 9 chamadas GET /tasks?status=..&priority=..&size=1 lendo só `total`;
+- stats: uma chamada GET /tasks/stats (matriz + série diária de 30 dias),
+  sem cache (cache limpo antes de cada chamada), com cache e com 304.
+
+As tarefas são distribuídas pelos últimos 90 dias, um terço concluídas.
+As requisições vão direto via ASGI, como em bench_etag.
+
+Use: python -m benchmarks.bench_stats [--tasks 100000] [--renders 300]
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+_tmpdir = tempfile.mkdtemp(prefix="bench_stats_")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_tmpdir}/bench.db")
+
+from app.core.security import create_access_token  # noqa: E402
+from app.db.database import engine  # noqa: E402
+from app.db.migrations import run_migrations  # noqa: E402
+from app.main import app  # noqa: E402
+from app.modules.tasks.counters import rebuild_counters  # noqa: E402
+from app.modules.tasks.model import Task, TaskPriority, TaskStatus  # noqa: E402
+from app.modules.tasks.page_cache import stats_cache  # noqa: E402
+from app.modules.user.model import User  # noqa: E402
+
+
+def load_tasks(n_tasks: int) -> int:
+    rng = random.Random(15)
+    now = datetime.utcnow().replace(microsecond=0)
+    statuses, priorities = list(TaskStatus), list(TaskPriority)
+    run_migrations(engine)
+    with engine.begin() as conn:
+        user_id = conn.execute(
+            User.__table__.insert().values(user="bench", email="bench@example.com", hashed_password="x")
+        ).inserted_primary_key[0]
+        rows = []
+        for i in range(n_tasks):
+            created_at = now - timedelta(seconds=rng.randrange(90 * 86400))
+            status = statuses[i % 3]
+            rows.append({
+                "title": f"task {i}",
+                "priority": priorities[rng.randrange(3)],
+                "status": status,
+                "user_id": user_id,
+                "created_at": created_at,
+                "completed_at": created_at + timedelta(hours=rng.randrange(48))
+                if status == TaskStatus.DONE else None,
+            })
+        conn.execute(Task.__table__.insert(), rows)
+        rebuild_counters(conn)
+    return user_id
+
+
+async def get(path: str, query: bytes, request_headers: list) -> int:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": query,
+        "root_path": "", "headers": request_headers,
+        "client": ("127.0.0.1", 0), "server": ("bench", 80),
+    }
+    result = {}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            result["status"] = message["status"]
+            result["headers"] = dict(message["headers"])
+
+    await app(scope, receive, send)
+    assert result["status"] in (200, 304), result["status"]
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=100_000)
+    parser.add_argument("--renders", type=int, default=300)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    user_id = load_tasks(args.tasks)
+    print(f"{args.tasks} tarefas geradas em {time.perf_counter() - start:.1f}s")
+    auth = [(b"authorization", f"Bearer {create_access_token({'sub': str(user_id)})}".encode())]
+
+    list_queries = [
+        f"status={status.value}&priority={priority.value}&size=1".encode()
+        for status in TaskStatus for priority in TaskPriority
+    ]
+    stats = ("/api/v1/tasks/stats", b"days=30")
+
+    async def render_list():
+        for query in list_queries:
+            await get("/api/v1/tasks/", query, auth)
+
+    async def render_stats_uncached():
+        stats_cache.clear()
+        await get(*stats, auth)
+
+    async def render_stats():
+        await get(*stats, auth)
+
+    async def setup_etag():
+        return (await get(*stats, auth))["headers"][b"etag"]
+
+    etag = asyncio.run(setup_etag())
+
+    async def render_stats_304():
+        await get(*stats, auth + [(b"if-none-match", etag)])
+
+    def measure(render) -> float:
+        async def run() -> float:
+            for _ in range(10):
+                await render()
+            begin = time.perf_counter()
+            for _ in range(args.renders):
+                await render()
+            return (time.perf_counter() - begin) / args.renders * 1e3
+
+        return asyncio.run(run())
+
+    results = [
+        ("9x listagem", measure(render_list)),
+        ("stats", measure(render_stats_uncached)),
+        ("stats cache", measure(render_stats)),
+        ("stats 304", measure(render_stats_304)),
+    ]
+    baseline = results[0][1]
+    print(f"{'cenário':>12} {'ms/widget':>10} {'ganho':>8}")
+    for name, value in results:
+        print(f"{name:>12} {value:>10.2f} {baseline / value:>7.1f}x")
+    print(f"cache de stats: {stats_cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
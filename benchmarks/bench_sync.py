@@ -0,0 +1,95 @@
+"""
+Benchmark: sincronização incremental (GET /tasks/changes) vs. baixar a lista inteira.
+
+Para usuários com totais de tarefas diferentes, aplica o mesmo número de
+alterações e mede TaskService.get_changes(since=<revisão anterior>). O custo
+deve acompanhar o número de alterações e ficar estável com o total; o
+download completo cresce com o total.
+
+Use: python -m benchmarks.bench_sync [--totals 10000,100000,500000] [--changes 10,1000]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+_tmpdir = tempfile.mkdtemp(prefix="bench_sync_")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_tmpdir}/bench.db")
+
+from sqlalchemy import select  # noqa: E402
+
+from app.db.database import SessionLocal, engine  # noqa: E402
+from app.db.migrations import run_migrations  # noqa: E402
+from app.modules.tasks.model import Task, TaskPriority, TaskStatus, TaskVersion  # noqa: E402
+from app.modules.tasks.repository import CHANGE_COLUMNS  # noqa: E402
+from app.modules.tasks.service import TaskService  # noqa: E402
+from app.modules.user.model import User  # noqa: E402
+
+
+def seed(n_tasks: int) -> int:
+    """Usuário com `n_tasks` tarefas na revisão 1 (como depois de uma sincronização completa)."""
+    run_migrations(engine)
+    with engine.begin() as conn:
+        user_id = conn.execute(
+            User.__table__.insert().values(user=f"bench{n_tasks}", email=f"bench{n_tasks}@example.com", hashed_password="x")
+        ).inserted_primary_key[0]
+        for start in range(0, n_tasks, 50_000):
+            conn.execute(Task.__table__.insert(), [
+                {
+                    "title": f"task {i}",
+                    "priority": TaskPriority.MEDIUM,
+                    "status": TaskStatus.PENDING,
+                    "user_id": user_id,
+                    "revision": 1,
+                }
+                for i in range(start, min(start + 50_000, n_tasks))
+            ])
+        conn.execute(TaskVersion.__table__.insert().values(user_id=user_id, version=1))
+    return user_id
+
+
+def timed(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--totals", default="10000,100000,500000")
+    parser.add_argument("--changes", default="10,1000")
+    args = parser.parse_args()
+    totals = [int(value) for value in args.totals.split(",")]
+    changes = [int(value) for value in args.changes.split(",")]
+
+    header = "".join(f"{f'{k} alter. (ms)':>18}" for k in changes)
+    print(f"{'tarefas':>10}{header}{'lista inteira (ms)':>20}")
+    for total in totals:
+        user_id = seed(total)
+        db = SessionLocal()
+        service = TaskService(db)
+        user = db.get(User, user_id)
+        task_ids = db.execute(select(Task.id).where(Task.user_id == user_id).limit(max(changes))).scalars().all()
+
+        results = []
+        for k in changes:
+            since = service.repo.get_version(user_id)
+            rows = [{"id": task_id, "status": TaskStatus.DONE} for task_id in task_ids[:k]]
+            service.repo.bulk_update(user_id, rows)
+
+            page = service.get_changes(user, since, limit=k)
+            assert len(page["items"]) == k and not page["has_more"], (len(page["items"]), page["has_more"])
+            results.append(timed(lambda: service.get_changes(user, since, limit=k)))
+            db.rollback()
+
+        full = timed(lambda: db.execute(select(*CHANGE_COLUMNS).where(Task.user_id == user_id)).all(), repeat=3)
+        db.close()
+        print(f"{total:>10}" + "".join(f"{ms:>18.2f}" for ms in results) + f"{full:>20.1f}")
+
+
+if __name__ == "__main__":
+    main()
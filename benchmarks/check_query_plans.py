@@ -0,0 +1,156 @@
+"""
+Verifica, via EXPLAIN QUERY PLAN (SQLite), que toda consulta emitida pelo
+TaskRepository usa índice em vez de varrer as tabelas `tasks`,
+`tasks_archive` e `task_tombstones` inteiras.
+
+Use: python -m benchmarks.check_query_plans
+Sai com código 1 se alguma consulta fizer full scan ou ordenar em B-tree
+temporária. GROUP BY em B-tree temporária é aceito: o agrupamento (só em
+daily_stats) recebe apenas as linhas já restritas pelos índices; na busca,
+a ordenação por relevância recebe só os resultados do usuário, o que a
+verificação de escopo da busca confere (o plano de uma tabela FTS5 não
+mostra quantas linhas o MATCH percorre).
+"""
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+_tmpdir = tempfile.mkdtemp(prefix="check_query_plans_")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_tmpdir}/plans.db")
+
+from sqlalchemy import event, func, select  # noqa: E402
+
+from app.db.database import Base, SessionLocal, engine  # noqa: E402
+from app.db.migrations import run_migrations  # noqa: E402
+from app.modules.tasks.model import Task, TaskPriority, TaskStatus  # noqa: E402
+from app.modules.tasks.repository import TaskRepository  # noqa: E402
+from app.modules.tasks.search import FTS5, search_backend, search_matches  # noqa: E402
+from app.modules.user.model import User  # noqa: E402
+
+# Verificação de escopo da busca: um termo presente nas tarefas de todos
+SEARCH_USERS = 50
+SEARCH_TASKS_PER_USER = 20
+
+FILTERS = [
+    {},
+    {"status": TaskStatus.PENDING},
+    {"priority": TaskPriority.HIGH},
+    {"status": TaskStatus.PENDING, "priority": TaskPriority.HIGH},
+]
+
+
+def exercise_repository(repo: TaskRepository, user_id: int) -> None:
+    """Chama cada consulta do repositório com todas as combinações de filtro."""
+    task = repo.create({"title": "t", "user_id": user_id, "status": TaskStatus.PENDING, "priority": TaskPriority.HIGH})
+    for filters in FILTERS:
+        repo.get_by_user_with_filters(user_id, skip=20, limit=10, **filters)
+        repo.get_by_user_with_filters(user_id, limit=10, after=(datetime(2024, 1, 1), 100), **filters)
+        repo.list_rows(user_id, skip=20, limit=10, **filters)
+        repo.list_rows(user_id, limit=10, after=(datetime(2024, 1, 1), 100), **filters)
+        repo.count_user_tasks(user_id, **filters)
+    repo.get_by_id(task.id, user_id)
+    repo.update(task.id, user_id, {"title": "t2"})
+    repo.update(task.id, user_id, {"status": TaskStatus.DONE})
+    repo.get_owner_id(task.id, user_id)
+    repo.get_ownership([task.id], user_id)
+    repo.bulk_update(user_id, [{"id": task.id, "title": "t3"}, {"id": task.id + 1000, "title": "t3"}])
+    new_rows = [{"title": "t", "status": TaskStatus.PENDING, "priority": TaskPriority.LOW}]
+    repo.bulk_delete(user_id, [new.id for new in repo.bulk_create(user_id, new_rows)])
+    repo.delete(task.id, user_id)
+    repo.get_changes(user_id, since=0, limit=10)
+    repo.get_changes(user_id, since=0, limit=10, after=(1, 0, task.id))
+    repo.get_changes(user_id, since=0, limit=10, after=(1, 1, task.id))
+    for filters in FILTERS:
+        repo.search(user_id, ["t"], skip=0, limit=10, **filters)
+    repo.daily_stats(user_id, since=datetime(2024, 1, 1))
+
+    # Arquivamento: duas tarefas concluídas
+    done = [
+        repo.create({"title": "t", "user_id": user_id, "status": TaskStatus.DONE, "priority": TaskPriority.HIGH})
+        for _ in range(2)
+    ]
+    repo.archive_done(datetime.utcnow() + timedelta(days=1), limit=10)
+    for filters in FILTERS + [{"status": TaskStatus.DONE}]:
+        repo.list_rows(user_id, skip=20, limit=10, include_archived=True, **filters)
+        repo.list_rows(user_id, limit=10, after=(datetime(2024, 1, 1), 100), include_archived=True, **filters)
+        repo.count_archived(user_id, **filters)
+    repo.get_archived_owner_id(done[0].id, user_id)
+    repo.restore(done[0].id, user_id)
+
+
+def check_search_scope(db) -> int:
+    """
+    Termo frequente nas tarefas de muitos usuários: o MATCH do FTS5 tem de
+    devolver só as tarefas do usuário da busca. Retorna 1 se não devolver.
+    """
+    if search_backend(db) != FTS5:
+        return 0
+    users = [User(user=f"search{i}", email=f"search{i}@example.com", hashed_password="x") for i in range(SEARCH_USERS)]
+    db.add_all(users)
+    db.commit()
+    db.execute(Task.__table__.insert(), [
+        {"title": "relatório comum", "user_id": user.id, "status": TaskStatus.PENDING, "priority": TaskPriority.LOW}
+        for user in users for _ in range(SEARCH_TASKS_PER_USER)
+    ])
+    db.commit()
+
+    matches = search_matches(["comum"], users[0].id, ranked=False).subquery()
+    scanned = db.execute(select(func.count()).select_from(matches)).scalar()
+    ok = scanned == SEARCH_TASKS_PER_USER
+    print(
+        f"[{'ok' if ok else 'FAIL'}] busca de termo comum a {SEARCH_USERS} usuários: MATCH devolve "
+        f"{scanned} linhas (esperado: as {SEARCH_TASKS_PER_USER} do usuário)"
+    )
+    return 0 if ok else 1
+
+
+def main() -> int:
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+
+    captured = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "WITH", "UPDATE", "DELETE")) and (
+            "tasks" in statement or "task_tombstones" in statement
+        ):
+            captured.append((statement, parameters))
+
+    db = SessionLocal()
+    user = User(user="plans", email="plans@example.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+    exercise_repository(TaskRepository(db), user.id)
+    event.remove(engine, "before_cursor_execute", capture)
+    scope_failures = check_search_scope(db)
+    db.close()
+
+    failures = 0
+    with engine.connect() as conn:
+        raw = conn.connection.dbapi_connection
+        for statement, parameters in captured:
+            plan = [row[-1] for row in raw.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+            ranked_search = "search_matches" in statement
+            bad = [
+                step for step in plan
+                if (
+                    step.startswith(("SCAN tasks", "SCAN task_tombstones"))
+                    and "USING" not in step and "VIRTUAL TABLE" not in step
+                )
+                or ("TEMP B-TREE" in step and "GROUP BY" not in step and not ranked_search)
+            ]
+            status = "FAIL" if bad else "ok"
+            failures += bool(bad)
+            print(f"[{status}] {' '.join(statement.split())[:110]}")
+            for step in plan:
+                print(f"        {step}")
+
+    print(f"\n{len(captured)} consultas verificadas, {failures} sem índice adequado")
+    return 1 if failures or scope_failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
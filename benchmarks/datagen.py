@@ -0,0 +1,89 @@
+"""
+Dados sintéticos para os benchmarks: N usuários × M tarefas cada.
+
+As tarefas são inseridas em lote pelo Core (executemany), sem passar pelo
+TaskRepository; contadores, versões e revisões ficam no mesmo estado que a
+API deixaria. Todos os usuários têm a mesma senha (um único hash bcrypt).
+Com a mesma semente, os dados gerados são sempre os mesmos.
+"""
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import List
+from sqlalchemy.engine import Engine
+from app.core.hashing import hash_password
+from app.db.migrations import run_migrations
+from app.modules.tasks.counters import rebuild_counters
+from app.modules.tasks.model import Task, TaskPriority, TaskStatus, TaskVersion
+from app.modules.user.model import User
+
+PASSWORD = "benchmark-password"
+
+_WORDS = (
+    "relatório", "reunião", "cliente", "deploy", "revisar", "contrato", "orçamento", "bug",
+    "planejamento", "documentação", "entrega", "backup", "fatura", "treinamento", "migração",
+)
+
+
+@dataclass(frozen=True)
+class SyntheticUser:
+    id: int
+    user: str
+
+
+def generate(
+    engine: Engine,
+    users: int,
+    tasks_per_user: int,
+    seed: int = 0,
+    days: int = 90,
+    batch_size: int = 10_000
+) -> List[SyntheticUser]:
+    """
+    Cria o schema (migrações) e insere `users` usuários com `tasks_per_user`
+    tarefas cada, criadas ao longo dos últimos `days` dias.
+
+    Status e prioridade são sorteados (um terço concluídas). Retorna os
+    usuários criados; a senha de todos é PASSWORD.
+    """
+    rng = random.Random(seed)
+    now = datetime.utcnow().replace(microsecond=0)
+    statuses, priorities = list(TaskStatus), list(TaskPriority)
+    hashed_password = hash_password(PASSWORD)
+    run_migrations(engine)
+
+    created = []
+    with engine.begin() as conn:
+        for index in range(users):
+            name = f"bench{index}"
+            user_id = conn.execute(
+                User.__table__.insert().values(user=name, email=f"{name}@example.com", hashed_password=hashed_password)
+            ).inserted_primary_key[0]
+            created.append(SyntheticUser(user_id, name))
+
+            rows = []
+            for number in range(tasks_per_user):
+                created_at = now - timedelta(seconds=rng.randrange(days * 86400))
+                status = rng.choice(statuses)
+                rows.append({
+                    "title": f"{rng.choice(_WORDS)} {rng.choice(_WORDS)} {number}",
+                    "description": " ".join(rng.choices(_WORDS, k=4)),
+                    "priority": rng.choice(priorities),
+                    "status": status,
+                    "user_id": user_id,
+                    "created_at": created_at,
+                    "completed_at": min(created_at + timedelta(hours=rng.randrange(1, 72)), now)
+                    if status == TaskStatus.DONE else None,
+                    "revision": 1,
+                })
+                if len(rows) == batch_size:
+                    conn.execute(Task.__table__.insert(), rows)
+                    rows = []
+            if rows:
+                conn.execute(Task.__table__.insert(), rows)
+
+        if created:
+            conn.execute(TaskVersion.__table__.insert(), [{"user_id": user.id, "version": 1} for user in created])
+        rebuild_counters(conn)
+
+    return created
@@ -0,0 +1,376 @@
+"""
+Suíte de benchmarks da API: cenários de carga em processo, com latência
+(p50/p95/p99), req/s e consultas SQL por requisição.
+
+Os dados vêm do benchmarks.datagen (N usuários × M tarefas, mesma semente
+sempre) e as requisições vão direto para o app via ASGI, sem servidor nem
+cliente HTTP no meio. Cenários, na ordem em que rodam:
+
+- login: POST /auth/login (bcrypt; roda 1/10 das requisições);
+- list: GET /tasks com as combinações de filtros de status/prioridade;
+- deep_pagination: GET /tasks em páginas no último décimo da lista (OFFSET alto);
+- create: POST /tasks;
+- update: PUT /tasks/{id}, alternando status e título;
+- delete: DELETE /tasks/{id}.
+
+Com --output, grava os resultados em JSON; com --baseline, compara com um
+JSON salvo antes e sai com código 1 se algum cenário piorar além de
+--threshold (latência ou req/s) ou fizer mais consultas por requisição.
+
+Use: python -m benchmarks.suite [--users 20] [--tasks-per-user 5000] [--requests 500]
+         [--concurrency 1] [--scenarios list,create] [--output results.json]
+         [--baseline baseline.json] [--threshold 0.2]
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+_tmpdir = tempfile.mkdtemp(prefix="bench_suite_")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_tmpdir}/bench.db")
+
+import sqlalchemy  # noqa: E402
+from sqlalchemy import event, select  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+from app.db import database  # noqa: E402
+from app.main import app  # noqa: E402
+from app.modules.tasks.model import Task, TaskPriority, TaskStatus  # noqa: E402
+from benchmarks.datagen import PASSWORD, SyntheticUser, generate  # noqa: E402
+
+PAGE_SIZE = 20
+
+# (método, caminho, query string, corpo JSON, status esperado)
+Request = Tuple[str, str, bytes, Optional[bytes], int]
+
+# Métricas comparadas com o baseline: maior é pior (latência) ou menor é pior (req/s)
+LATENCY_METRICS = ("p50_ms", "p95_ms", "p99_ms")
+
+
+@dataclass
+class Context:
+    users: List[SyntheticUser]
+    headers: Dict[int, List[Tuple[bytes, bytes]]]
+    task_ids: Dict[int, List[int]]
+    tasks_per_user: int
+    rng: random.Random
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    build: Callable[[Context, int], List[Tuple[int, Request]]]  # -> (user_id, requisição)
+    weight: float = 1.0
+
+
+def _json(data: dict) -> bytes:
+    return json.dumps(data).encode()
+
+
+def _login(ctx: Context, n: int) -> List[Tuple[int, Request]]:
+    return [
+        (0, ("POST", "/api/v1/auth/login", b"", _json({"username": user.user, "password": PASSWORD}), 200))
+        for user in (ctx.users[i % len(ctx.users)] for i in range(n))
+    ]
+
+
+def _list(ctx: Context, n: int) -> List[Tuple[int, Request]]:
+    filters = (
+        [""]
+        + [f"status={s.value}&" for s in TaskStatus]
+        + [f"priority={p.value}&" for p in TaskPriority]
+        + [f"status={s.value}&priority={p.value}&" for s in TaskStatus for p in TaskPriority]
+    )
+    requests = []
+    for i in range(n):
+        query = f"{filters[i % len(filters)]}size={PAGE_SIZE}".encode()
+        requests.append((ctx.users[i % len(ctx.users)].id, ("GET", "/api/v1/tasks/", query, None, 200)))
+    return requests
+
+
+def _deep_pagination(ctx: Context, n: int) -> List[Tuple[int, Request]]:
+    pages = max(1, ctx.tasks_per_user // PAGE_SIZE)
+    requests = []
+    for i in range(n):
+        page = pages - ctx.rng.randrange(max(1, pages // 10))
+        query = f"page={page}&size={PAGE_SIZE}".encode()
+        requests.append((ctx.users[i % len(ctx.users)].id, ("GET", "/api/v1/tasks/", query, None, 200)))
+    return requests
+
+
+def _create(ctx: Context, n: int) -> List[Tuple[int, Request]]:
+    priorities = [p.value for p in TaskPriority]
+    return [
+        (ctx.users[i % len(ctx.users)].id, (
+            "POST", "/api/v1/tasks/", b"",
+            _json({"title": f"suite {i}", "description": "criada pelo benchmark", "priority": priorities[i % 3]}),
+            201,
+        ))
+        for i in range(n)
+    ]
+
+
+def _update(ctx: Context, n: int) -> List[Tuple[int, Request]]:
+    statuses = [s.value for s in TaskStatus]
+    requests = []
+    for i in range(n):
+        user = ctx.users[i % len(ctx.users)]
+        task_id = ctx.task_ids[user.id][(i // len(ctx.users)) % len(ctx.task_ids[user.id])]
+        body = {"status": statuses[i % 3]} if i % 2 else {"title": f"atualizada {i}"}
+        requests.append((user.id, ("PUT", f"/api/v1/tasks/{task_id}", b"", _json(body), 200)))
+    return requests
+
+
+def _delete(ctx: Context, n: int) -> List[Tuple[int, Request]]:
+    # Do fim da lista de cada usuário (o update usa o início)
+    requests = []
+    for i in range(n):
+        user = ctx.users[i % len(ctx.users)]
+        task_id = ctx.task_ids[user.id].pop()
+        requests.append((user.id, ("DELETE", f"/api/v1/tasks/{task_id}", b"", None, 200)))
+    return requests
+
+
+SCENARIOS = [
+    Scenario("login", _login, weight=0.1),
+    Scenario("list", _list),
+    Scenario("deep_pagination", _deep_pagination),
+    Scenario("create", _create),
+    Scenario("update", _update),
+    Scenario("delete", _delete),
+]
+
+
+async def send_request(request: Request, headers: List[Tuple[bytes, bytes]]) -> int:
+    """Executa uma requisição direto no app ASGI e retorna o status HTTP."""
+    method, path, query, body, _ = request
+    if body is not None:
+        headers = headers + [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method,
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": query,
+        "root_path": "", "headers": headers,
+        "client": ("127.0.0.1", 0), "server": ("bench", 80),
+    }
+    result = {}
+
+    async def receive():
+        return {"type": "http.request", "body": body or b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            result["status"] = message["status"]
+
+    await app(scope, receive, send)
+    return result["status"]
+
+
+class QueryCounter:
+    """Conta os statements SQL executados pelos engines do app."""
+
+    def __init__(self):
+        self.count = 0
+        self.engines = [database.engine] + database.read_engines
+        if database.async_engine is not None:
+            self.engines.append(database.async_engine.sync_engine)
+            self.engines += [read_engine.sync_engine for read_engine in database.async_read_engines]
+        for engine in self.engines:
+            event.listen(engine, "before_cursor_execute", self._count)
+
+    def _count(self, *args) -> None:
+        self.count += 1
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Percentil pelo método nearest-rank."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(len(ordered) * pct) - 1)] if ordered else 0.0
+
+
+def run_scenario(
+    scenario: Scenario, ctx: Context, n_requests: int, concurrency: int, counter: QueryCounter
+) -> dict:
+    requests = scenario.build(ctx, max(1, int(n_requests * scenario.weight)))
+    latencies: List[float] = []
+    errors = 0
+
+    async def worker(queue: List[Tuple[int, Request]]) -> None:
+        nonlocal errors
+        while queue:
+            user_id, request = queue.pop()
+            start = time.perf_counter()
+            status = await send_request(request, ctx.headers.get(user_id, []))
+            latencies.append(time.perf_counter() - start)
+            errors += status != request[4]
+
+    async def run() -> float:
+        queue = list(reversed(requests))
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(queue) for _ in range(concurrency)))
+        return time.perf_counter() - start
+
+    queries_before = counter.count
+    elapsed = asyncio.run(run())
+    return {
+        "requests": len(requests),
+        "errors": errors,
+        "mean_ms": sum(latencies) / len(latencies) * 1e3,
+        "p50_ms": percentile(latencies, 0.50) * 1e3,
+        "p95_ms": percentile(latencies, 0.95) * 1e3,
+        "p99_ms": percentile(latencies, 0.99) * 1e3,
+        "req_per_s": len(requests) / elapsed,
+        "queries_per_request": (counter.count - queries_before) / len(requests),
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> List[str]:
+    """Regressões de `results` em relação ao `baseline` (cenários ausentes em um dos dois são ignorados)."""
+    regressions = []
+    for name, current in results["scenarios"].items():
+        base = baseline["scenarios"].get(name)
+        if base is None:
+            continue
+        for metric in LATENCY_METRICS:
+            if current[metric] > base[metric] * (1 + threshold):
+                regressions.append(f"{name}: {metric} {base[metric]:.2f} -> {current[metric]:.2f}")
+        if current["req_per_s"] < base["req_per_s"] * (1 - threshold):
+            regressions.append(f"{name}: req/s {base['req_per_s']:.1f} -> {current['req_per_s']:.1f}")
+        # Consultas por requisição são determinísticas: qualquer aumento é regressão
+        if current["queries_per_request"] > base["queries_per_request"] + 0.01:
+            regressions.append(
+                f"{name}: consultas/req {base['queries_per_request']:.2f} -> {current['queries_per_request']:.2f}"
+            )
+        if current["errors"] > base["errors"]:
+            regressions.append(f"{name}: erros {base['errors']} -> {current['errors']}")
+    return regressions
+
+
+def print_results(results: dict, baseline: Optional[dict] = None) -> None:
+    print(
+        f"{'cenário':>16} {'req':>6} {'erros':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+        f"{'req/s':>8} {'sql/req':>8}"
+    )
+    for name, r in results["scenarios"].items():
+        line = (
+            f"{name:>16} {r['requests']:>6} {r['errors']:>6} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} "
+            f"{r['p99_ms']:>8.2f} {r['req_per_s']:>8.1f} {r['queries_per_request']:>8.2f}"
+        )
+        base = (baseline or {}).get("scenarios", {}).get(name)
+        if base:
+            line += f"   p50 {(r['p50_ms'] / base['p50_ms'] - 1) * 100:+.0f}%"
+            line += f", req/s {(r['req_per_s'] / base['req_per_s'] - 1) * 100:+.0f}%"
+        print(line)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Suíte de benchmarks da API")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--tasks-per-user", type=int, default=5000)
+    parser.add_argument("--requests", type=int, default=500, help="Requisições por cenário")
+    parser.add_argument("--concurrency", type=int, default=1, help="Clientes simultâneos")
+    parser.add_argument("--scenarios", help="Cenários separados por vírgula (padrão: todos)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Grava os resultados neste arquivo JSON")
+    parser.add_argument("--baseline", help="JSON de uma execução anterior para comparar")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Piora relativa tolerada (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    selected = SCENARIOS
+    if args.scenarios:
+        names = args.scenarios.split(",")
+        unknown = set(names) - {scenario.name for scenario in SCENARIOS}
+        if unknown:
+            parser.error(f"cenários desconhecidos: {', '.join(sorted(unknown))}")
+        selected = [scenario for scenario in SCENARIOS if scenario.name in names]
+
+    start = time.perf_counter()
+    users = generate(database.engine, args.users, args.tasks_per_user, seed=args.seed)
+    with database.engine.connect() as conn:
+        task_ids: Dict[int, List[int]] = {user.id: [] for user in users}
+        for task_id, user_id in conn.execute(select(Task.id, Task.user_id).order_by(Task.id)):
+            task_ids[user_id].append(task_id)
+    print(f"{args.users} usuários × {args.tasks_per_user} tarefas gerados em {time.perf_counter() - start:.1f}s")
+
+    ctx = Context(
+        users=users,
+        headers={
+            user.id: [(b"authorization", f"Bearer {create_access_token({'sub': str(user.id)})}".encode())]
+            for user in users
+        },
+        task_ids=task_ids,
+        tasks_per_user=args.tasks_per_user,
+        rng=random.Random(args.seed),
+    )
+    counter = QueryCounter()
+
+    # Aquecimento: imports tardios, pool de hashing, caches de autenticação e de statements
+    run_scenario(Scenario("warm-up", _login), ctx, 2, 1, counter)
+    run_scenario(Scenario("warm-up", _list), ctx, 50, 1, counter)
+
+    results = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git_commit": _git_commit(),
+            "users": args.users,
+            "tasks_per_user": args.tasks_per_user,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+            "database": database.engine.dialect.name,
+            "db_async": settings.DB_ASYNC,
+            "python": platform.python_version(),
+            "sqlalchemy": sqlalchemy.__version__,
+        },
+        "scenarios": {
+            scenario.name: run_scenario(scenario, ctx, args.requests, args.concurrency, counter)
+            for scenario in selected
+        },
+    }
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"resultados gravados em {args.output}")
+
+    if baseline is None:
+        return 0
+    keys = ("users", "tasks_per_user", "requests", "concurrency", "database", "db_async")
+    different = [key for key in keys if baseline["meta"].get(key) != results["meta"][key]]
+    if different:
+        print(f"aviso: baseline com parâmetros diferentes ({', '.join(different)})")
+    regressions = compare(results, baseline, args.threshold)
+    for regression in regressions:
+        print(f"REGRESSÃO {regression}")
+    print(f"{len(regressions)} regressões acima de {args.threshold:.0%} em relação a {args.baseline}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
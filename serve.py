@@ -0,0 +1,116 @@
+"""
+Arquivo para rodar a aplicação em produção: N workers pré-forkados
+compartilhando o mesmo socket.
+
+O processo pai aplica o schema/migrações uma única vez, importa o app e
+abre o socket; cada worker é um fork do pai (não reimporta nada), aquece
+conexões, consultas e o bcrypt (STARTUP_WARM_UP) e só então começa a
+aceitar conexões. Workers que morrem são recriados; SIGTERM/SIGINT
+encerram todos.
+
+Use: python serve.py [--workers 4] [--host 0.0.0.0] [--port 8000]
+"""
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import time
+
+# Nos workers: sem DDL na subida (o pai já aplicou) e com aquecimento
+os.environ["DB_AUTO_MIGRATE"] = "false"
+os.environ.setdefault("STARTUP_WARM_UP", "true")
+
+logger = logging.getLogger("serve")
+
+
+def bind_socket(host: str, port: int, backlog: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--backlog", type=int, default=2048)
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+    logging.basicConfig(level=args.log_level.upper(), format="%(asctime)s %(name)s %(message)s")
+
+    import uvicorn
+    from app.db import database
+    from app.db.migrations import run_migrations
+    from app.db.sharding import assign_id_ranges
+    from app.main import app
+
+    start = time.perf_counter()
+    applied = [run_migrations(engine) for engine in database.writer_engines()]
+    assign_id_ranges(database.shard_writer_engines())
+    logger.info("Schema pronto em %.0f ms (migrações aplicadas: %s)", (time.perf_counter() - start) * 1e3, applied)
+    # Conexões abertas pelo pai não podem ser herdadas pelos workers
+    for engine in database.writer_engines():
+        engine.dispose()
+
+    sock = bind_socket(args.host, args.port, args.backlog)
+    config = uvicorn.Config(app, log_level=args.log_level, lifespan="on")
+
+    workers = {}
+    stopping = False
+
+    def spawn() -> None:
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            try:
+                uvicorn.Server(config).run(sockets=[sock])
+            finally:
+                os._exit(0)
+        workers[pid] = time.monotonic()
+
+    def stop(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+        for pid in list(workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    # Tudo que o pai criou até aqui é compartilhado (copy-on-write): fora do
+    # GC, as coletas dos workers não tocam nessas páginas
+    gc.freeze()
+    for _ in range(args.workers):
+        spawn()
+    logger.info("%d workers em http://%s:%d", args.workers, args.host, args.port)
+
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        started = workers.pop(pid, None)
+        if started is None or stopping:
+            continue
+        logger.warning("Worker %d saiu (status %d); recriando", pid, os.waitstatus_to_exitcode(status))
+        # Worker que morre logo na subida: espera um pouco para não recriar em loop
+        if time.monotonic() - started < 1:
+            time.sleep(1)
+        spawn()
+
+    sock.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Testes no processo: um SQLite novo em um diretório temporário. As
+variáveis de ambiente são definidas antes de qualquer import do app (a
+configuração é lida na importação).
+"""
+import os
+import tempfile
+from itertools import count
+
+import pytest
+
+_tmpdir = tempfile.mkdtemp(prefix="tests_")
+os.environ["SECRET_KEY"] = "test"
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmpdir}/tests.db"
+os.environ.pop("DATABASE_SHARD_URLS", None)
+
+_user_ids = count(1)
+
+
+@pytest.fixture(scope="session")
+def migrated():
+    from app.db.database import engine
+    from app.db.migrations import run_migrations
+
+    run_migrations(engine)
+
+
+@pytest.fixture
+def db(migrated):
+    from app.db.database import SessionLocal
+
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def make_user(db):
+    """Cria um usuário novo a cada chamada (cada teste vê só os próprios dados)."""
+    from app.modules.user.model import User
+
+    def make():
+        number = next(_user_ids)
+        user = User(user=f"user{number}", email=f"user{number}@example.com", hashed_password="x")
+        db.add(user)
+        db.commit()
+        return user
+
+    return make
@@ -0,0 +1,64 @@
+"""Arquivamento e restauração de tarefas concluídas (TaskRepository)."""
+from datetime import datetime, timedelta
+
+from app.modules.tasks.model import Task, TaskPriority, TaskStatus
+from app.modules.tasks.repository import TaskRepository
+
+
+def _done_task(repo, user_id, completed_days_ago):
+    task = repo.create({"title": "t", "user_id": user_id, "status": TaskStatus.DONE, "priority": TaskPriority.LOW})
+    old = datetime.utcnow() - timedelta(days=completed_days_ago)
+    repo.db.execute(Task.__table__.update().where(Task.id == task.id).values(completed_at=old, updated_at=old))
+    repo.db.commit()
+    repo.db.expunge_all()
+    return task.id
+
+
+def _archive_pass(repo):
+    return repo.archive_done(datetime.utcnow() - timedelta(days=30), limit=100)
+
+
+def test_archive_moves_old_done_tasks_and_keeps_ids(db, make_user):
+    repo = TaskRepository(db)
+    user = make_user()
+    old_id = _done_task(repo, user.id, completed_days_ago=60)
+    recent_id = _done_task(repo, user.id, completed_days_ago=1)
+
+    assert _archive_pass(repo) >= 1
+    assert repo.get_by_id(old_id, user.id) is None
+    assert repo.get_archived_owner_id(old_id, user.id) == user.id
+    assert repo.get_by_id(recent_id, user.id) is not None
+    assert repo.count_user_tasks(user.id) == 1
+
+    # Tarefa nova depois do arquivamento não reusa o ID arquivado
+    newest = repo.create({"title": "n", "user_id": user.id, "status": TaskStatus.PENDING, "priority": TaskPriority.LOW})
+    ids = [row[3] for row in repo.list_rows(user.id, skip=0, limit=100, include_archived=True)]
+    assert newest.id not in (old_id, recent_id)
+    assert sorted(ids) == sorted({old_id, recent_id, newest.id})
+
+
+def test_restored_task_stays_active_after_next_archive_pass(db, make_user):
+    repo = TaskRepository(db)
+    user = make_user()
+    task_id = _done_task(repo, user.id, completed_days_ago=60)
+    assert _archive_pass(repo) >= 1
+    db.expunge_all()
+
+    restored = repo.restore(task_id, user.id)
+    assert restored.id == task_id
+    db.expunge_all()
+
+    _archive_pass(repo)
+    assert repo.get_by_id(task_id, user.id) is not None
+    assert repo.get_archived_owner_id(task_id, user.id) is None
+    assert repo.count_user_tasks(user.id, status=TaskStatus.DONE) == 1
+
+
+def test_restore_of_other_users_task_returns_none(db, make_user):
+    repo = TaskRepository(db)
+    owner, other = make_user(), make_user()
+    task_id = _done_task(repo, owner.id, completed_days_ago=60)
+    assert _archive_pass(repo) >= 1
+
+    assert repo.restore(task_id, other.id) is None
+    assert repo.get_archived_owner_id(task_id, owner.id) == owner.id
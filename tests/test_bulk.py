@@ -0,0 +1,77 @@
+"""Atualização e exclusão em lote (TaskService): resultado por item e contadores."""
+from app.modules.tasks.counters import sum_counters
+from app.modules.tasks.model import TaskPriority, TaskStatus
+from app.modules.tasks.repository import TaskRepository
+from app.modules.tasks.schema import TaskBulkUpdateItem
+from app.modules.tasks.service import TaskService
+
+
+def _create(repo, user_id, count):
+    rows = [{"title": "t", "status": TaskStatus.PENDING, "priority": TaskPriority.LOW} for _ in range(count)]
+    return [task.id for task in repo.bulk_create(user_id, rows)]
+
+
+def _assert_counters_match(repo, user_id):
+    for status in TaskStatus:
+        assert sum_counters(repo.db, user_id, status=status) == repo.count_user_tasks(user_id, status=status)
+
+
+def _delete_after_ownership_check(service, db, user_id, task_id):
+    """Simula outra requisição apagando `task_id` entre a validação e a escrita."""
+    check = service.repo.get_ownership
+
+    def get_ownership(task_ids, owner_id):
+        owners = check(task_ids, owner_id)
+        assert TaskRepository(db).delete(task_id, user_id)
+        return owners
+
+    service.repo.get_ownership = get_ownership
+
+
+def test_bulk_update_reports_each_item(db, make_user):
+    service = TaskService(db)
+    user, other = make_user(), make_user()
+    own = _create(service.repo, user.id, 2)
+    foreign = _create(service.repo, other.id, 1)
+
+    items = [TaskBulkUpdateItem(id=task_id, status=TaskStatus.DONE) for task_id in own + foreign + [10 ** 9]]
+    results = service.bulk_update_tasks(items, user).results
+
+    assert [result.status_code for result in results] == [200, 200, 403, 404]
+    assert all(result.task.status == TaskStatus.DONE for result in results[:2])
+    assert service.repo.get_by_id(foreign[0], other.id).status == TaskStatus.PENDING
+    _assert_counters_match(service.repo, user.id)
+    _assert_counters_match(service.repo, other.id)
+
+
+def test_bulk_update_of_task_deleted_concurrently_is_404(db, make_user):
+    service = TaskService(db)
+    user = make_user()
+    kept, vanished = _create(service.repo, user.id, 2)
+    _delete_after_ownership_check(service, db, user.id, vanished)
+
+    items = [TaskBulkUpdateItem(id=task_id, status=TaskStatus.DONE) for task_id in (kept, vanished)]
+    results = service.bulk_update_tasks(items, user).results
+
+    assert [result.status_code for result in results] == [200, 404]
+    assert service.repo.count_user_tasks(user.id, status=TaskStatus.DONE) == 1
+    _assert_counters_match(service.repo, user.id)
+
+
+def test_bulk_delete_of_task_deleted_concurrently_is_404(db, make_user):
+    service = TaskService(db)
+    user, other = make_user(), make_user()
+    kept, deleted, vanished = _create(service.repo, user.id, 3)
+    foreign = _create(service.repo, other.id, 1)
+    _delete_after_ownership_check(service, db, user.id, vanished)
+
+    results = service.bulk_delete_tasks([deleted, vanished, foreign[0]], user).results
+
+    assert [result.status_code for result in results] == [200, 404, 403]
+    assert service.repo.get_by_id(kept, user.id) is not None
+    assert service.repo.get_by_id(foreign[0], other.id) is not None
+    assert service.repo.count_user_tasks(user.id) == 1
+    _assert_counters_match(service.repo, user.id)
+    # Cada exclusão deixa um tombstone para GET /tasks/changes
+    changes = service.repo.get_changes(user.id, since=0, limit=100)
+    assert sorted(changes[1]) == sorted([deleted, vanished])
@@ -0,0 +1,63 @@
+"""GET /tasks/changes: paginação por cursor e tombstones (TaskService.get_changes)."""
+import pytest
+from fastapi import HTTPException
+
+from app.modules.tasks.cursor import decode_changes_cursor
+from app.modules.tasks.model import TaskPriority, TaskStatus
+from app.modules.tasks.repository import TaskRepository
+from app.modules.tasks.service import TaskService
+
+
+def _sync(service, user, since=0, limit=10):
+    """Todas as páginas a partir de `since`: (páginas, revisão final)."""
+    pages = [service.get_changes(user, since, limit)]
+    while pages[-1]["has_more"]:
+        pages.append(service.get_changes(user, since, limit, decode_changes_cursor(pages[-1]["cursor"])))
+    return pages, pages[-1]["revision"]
+
+
+def _rows(count, title="t"):
+    return [{"title": title, "status": TaskStatus.PENDING, "priority": TaskPriority.LOW} for _ in range(count)]
+
+
+def test_revision_larger_than_limit_is_paged(db, make_user):
+    service = TaskService(db)
+    user = make_user()
+    # Uma revisão com 25 tarefas (como um lote do import ou a migração 4)
+    created = service.repo.bulk_create(user.id, _rows(25))
+    assert len({task.revision for task in created}) == 1
+
+    pages, revision = _sync(service, user, limit=10)
+    assert [len(page["items"]) for page in pages] == [10, 10, 5]
+    ids = [item["id"] for page in pages for item in page["items"]]
+    assert sorted(ids) == sorted(task.id for task in created)
+    assert revision == service.repo.get_version(user.id)
+    assert service.get_changes(user, revision, 10) == {
+        "items": [], "deleted": [], "revision": revision, "has_more": False, "cursor": None,
+    }
+
+
+def test_deletes_and_updates_after_since(db, make_user):
+    service = TaskService(db)
+    repo = TaskRepository(db)
+    user = make_user()
+    tasks = repo.bulk_create(user.id, _rows(12))
+    _, since = _sync(service, user, limit=5)
+
+    deleted_ids = repo.bulk_delete(user.id, [task.id for task in tasks[:7]])
+    repo.bulk_update(user.id, [{"id": tasks[8].id, "title": "changed"}])
+
+    pages, revision = _sync(service, user, since=since, limit=3)
+    assert all(len(page["items"]) + len(page["deleted"]) <= 3 for page in pages)
+    assert sorted(task_id for page in pages for task_id in page["deleted"]) == sorted(deleted_ids)
+    assert [item["title"] for page in pages for item in page["items"]] == ["changed"]
+    assert revision == service.repo.get_version(user.id)
+
+
+def test_unknown_revision_is_a_conflict(db, make_user):
+    service = TaskService(db)
+    user = make_user()
+    service.repo.bulk_create(user.id, _rows(1))
+    with pytest.raises(HTTPException) as error:
+        service.get_changes(user, since=1000, limit=10)
+    assert error.value.status_code == 409
@@ -0,0 +1,29 @@
+"""
+Roda benchmarks.bench_export em um subprocesso e exige que GET /tasks/export
+de 100 mil tarefas não cresça o RSS além do orçamento. mmap e cache de
+páginas do SQLite ficam pequenos para que o crescimento medido seja o do
+export, não o das páginas do banco.
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_export_memory_stays_within_budget(tmp_path):
+    env = dict(
+        os.environ,
+        SECRET_KEY="test",
+        DATABASE_URL=f"sqlite:///{tmp_path}/export.db",
+        SQLITE_MMAP_SIZE="0",
+        SQLITE_CACHE_SIZE_KB="2048",
+    )
+    env.pop("DATABASE_SHARD_URLS", None)
+    result = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_export", "--tasks", "100000", "--budget-mb", "16"],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert "status 200: 100000 linhas" in result.stdout
@@ -0,0 +1,31 @@
+"""/health só com liveness; estado dos caches só para administradores."""
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.main import app
+
+client = TestClient(app)
+
+
+def _headers(user):
+    return {"Authorization": f"Bearer {create_access_token({'sub': str(user.id)})}"}
+
+
+def test_health_is_liveness_only():
+    response = client.get("/health")
+
+    assert response.status_code == 200
+    assert response.json() == {"status": "ok"}
+
+
+def test_cache_stats_require_an_admin(make_user, monkeypatch):
+    user, admin = make_user(), make_user()
+    monkeypatch.setattr(settings, "ADMIN_USERS", [admin.user])
+    url = f"{settings.API_V1_STR}/admin/caches"
+
+    assert client.get(url).status_code in (401, 403)
+    assert client.get(url, headers=_headers(user)).status_code == 403
+    response = client.get(url, headers=_headers(admin))
+    assert response.status_code == 200
+    assert set(response.json()) == {"auth_cache", "task_page_cache", "task_stats_cache", "admission"}
@@ -0,0 +1,48 @@
+"""Log de consultas lentas do profiler: valores dos parâmetros só com opt-in, sem dados sensíveis."""
+import logging
+
+import pytest
+
+from app.core.config import settings
+from app.db import profiler
+
+_INSERT_USER = "INSERT INTO users (user, email, hashed_password) VALUES (?, ?, ?)"
+_INSERT_TASK = "INSERT INTO tasks (title, user_id) VALUES (?, ?)"
+_HASH = "$2b$12$abcdefghijklmnopqrstuv"
+
+
+@pytest.fixture
+def slow_log(monkeypatch, caplog):
+    monkeypatch.setattr(settings, "SLOW_QUERY_MS", 0.0)
+    caplog.set_level(logging.WARNING, logger=profiler.__name__)
+
+    def record(statement, parameters):
+        caplog.clear()
+        profiler._record(None, statement, parameters, False, 0.2)
+        return caplog.text
+
+    yield record
+    profiler.reset_profiler()
+
+
+def test_values_are_not_logged_by_default(slow_log):
+    text = slow_log(_INSERT_TASK, ("secret plans", 7))
+
+    assert "(str, int)" in text
+    assert "secret plans" not in text
+
+
+def test_opt_in_logs_values_without_sensitive_ones(slow_log, monkeypatch):
+    monkeypatch.setattr(settings, "QUERY_PROFILER_LOG_PARAMETERS", True)
+
+    assert "('groceries', 7)" in slow_log(_INSERT_TASK, ("groceries", 7))
+    # E-mail e hash bcrypt são reconhecidos mesmo fora das colunas sensíveis
+    assert "(<redacted>, 7)" in slow_log(_INSERT_TASK, ("someone@example.com", 7))
+    assert "(<redacted>, 7)" in slow_log(_INSERT_TASK, (_HASH, 7))
+
+    text = slow_log(_INSERT_USER, ("alice", "alice@example.com", _HASH))
+    assert "(<redacted>, <redacted>, <redacted>)" in text
+    # Parâmetros nomeados: o nome também conta
+    text = slow_log("INSERT INTO credentials (secret, owner) VALUES (:new_password, :owner)",
+                    {"new_password": "x", "owner": 3})
+    assert "{new_password: <redacted>, owner: 3}" in text
@@ -0,0 +1,22 @@
+"""
+Roda benchmarks.check_query_plans em um subprocesso (a configuração é lida
+na importação do app) contra um SQLite novo e exige zero consultas sem
+índice adequado.
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_repository_queries_use_indexes(tmp_path):
+    env = dict(os.environ, SECRET_KEY="test", DATABASE_URL=f"sqlite:///{tmp_path}/plans.db")
+    env.pop("DATABASE_SHARD_URLS", None)
+    result = subprocess.run(
+        [sys.executable, "-m", "benchmarks.check_query_plans"],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert "0 sem índice adequado" in result.stdout
@@ -0,0 +1,100 @@
+"""Shards das tarefas: faixas de IDs por shard, movimento de usuários e 403 entre shards."""
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.migrations import run_migrations
+from app.db.sharding import ID_RANGE_BITS, RoutingSession, assign_id_ranges, move_user, shard_for
+from app.modules.tasks.model import TaskPriority, TaskStatus
+from app.modules.tasks.schema import TaskUpdate
+from app.modules.tasks.service import TaskService
+
+
+@pytest.fixture
+def shards(tmp_path, migrated):
+    engines = [create_engine(f"sqlite:///{tmp_path}/shard{index}.db") for index in range(2)]
+    for engine in engines:
+        run_migrations(engine)
+    yield engines
+    for engine in engines:
+        engine.dispose()
+
+
+@pytest.fixture
+def routing(shards):
+    from app.db.database import engine
+
+    assign_id_ranges(shards)
+    factories = [sessionmaker(autoflush=False, expire_on_commit=False, bind=shard) for shard in shards]
+    session = RoutingSession(bind=engine, shards=factories)
+    yield session, factories
+    session.close()
+
+
+def _user_in_shard(make_user, index):
+    while True:
+        user = make_user()
+        if shard_for(user.id, 2) == index:
+            return user
+
+
+def _create(service, user, count=1):
+    rows = [{"title": "t", "status": TaskStatus.PENDING, "priority": TaskPriority.LOW} for _ in range(count)]
+    return [task.id for task in service.repo.bulk_create(user.id, rows)]
+
+
+def test_assign_id_ranges_is_disjoint_and_idempotent(shards):
+    ranges = assign_id_ranges(shards)
+
+    assert len(set(ranges)) == 2
+    assert assign_id_ranges(shards) == ranges
+
+
+def test_new_ids_come_from_the_shard_range(routing, make_user):
+    session, _ = routing
+    service = TaskService(session)
+    first, second = _user_in_shard(make_user, 0), _user_in_shard(make_user, 1)
+
+    first_ids, second_ids = _create(service, first, 3), _create(service, second, 3)
+
+    assert len({task_id >> ID_RANGE_BITS for task_id in first_ids}) == 1
+    assert len({task_id >> ID_RANGE_BITS for task_id in second_ids}) == 1
+    assert first_ids[0] >> ID_RANGE_BITS != second_ids[0] >> ID_RANGE_BITS
+
+
+def test_task_in_another_shard_gets_403(routing, make_user):
+    session, _ = routing
+    service = TaskService(session)
+    user, other = _user_in_shard(make_user, 0), _user_in_shard(make_user, 1)
+    foreign = _create(service, other)[0]
+
+    for action in (
+        lambda: service.update_task(foreign, TaskUpdate(title="x"), user),
+        lambda: service.delete_task(foreign, user),
+    ):
+        with pytest.raises(HTTPException) as error:
+            action()
+        assert error.value.status_code == 403
+    with pytest.raises(HTTPException) as error:
+        service.delete_task(foreign + 1, user)
+    assert error.value.status_code == 404
+
+
+def test_move_keeps_ids(routing, make_user):
+    session, factories = routing
+    service = TaskService(session)
+    owner, other = _user_in_shard(make_user, 0), _user_in_shard(make_user, 1)
+    task_ids = _create(service, owner, 3)
+    _create(service, other, 3)
+    session.close()
+
+    assert move_user(owner.id, factories[0], factories[1]) == 3
+
+    with factories[1]() as target:
+        moved = TaskService(target)
+        assert [task.id for task in moved.repo.get_many(task_ids, owner.id)] == task_ids
+        # Tarefas novas no destino seguem na faixa dele, sem reusar os IDs movidos
+        new_id = _create(moved, owner)[0]
+        assert new_id not in task_ids
+        assert new_id >> ID_RANGE_BITS == _create(moved, other)[0] >> ID_RANGE_BITS